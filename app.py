@@ -5,9 +5,13 @@ import json
 import os
 from PIL import Image
 import plotly.express as px
-from helpers.data_loader import load_data
+from helpers.data_loader import describe_load, get_shared_data, session_memory_bytes
 from helpers.text_processor import preprocess_text
 from helpers.similarity_calculator import calculate_similarity
+from helpers.lazy_imports import start_warmup
+
+# Importa as dependências pesadas em segundo plano enquanto a página carrega
+start_warmup()
 
 # Set page configuration
 st.set_page_config(
@@ -34,21 +38,19 @@ st.markdown("""
 # Main dashboard
 st.markdown("## Dashboard Principal")
 
-# Load data
-if 'data_loaded' not in st.session_state:
-    with st.spinner("Carregando dados... Por favor, aguarde."):
-        try:
-            vagas_df, prospects_df, applicants_df = load_data()
-            st.session_state['vagas_df'] = vagas_df
-            st.session_state['prospects_df'] = prospects_df
-            st.session_state['applicants_df'] = applicants_df
-            st.session_state['data_loaded'] = True
-        except Exception as e:
-            st.error(f"Erro ao carregar os dados: {e}")
-else:
-    vagas_df = st.session_state['vagas_df']
-    prospects_df = st.session_state['prospects_df']
-    applicants_df = st.session_state['applicants_df']
+# Dados compartilhados por todas as sessões (snapshot somente leitura)
+with st.spinner("Carregando dados... Por favor, aguarde."):
+    try:
+        data = get_shared_data()
+        vagas_df, prospects_df, applicants_df = data
+    except Exception as e:
+        st.error(f"Erro ao carregar os dados: {e}")
+        st.stop()
+
+# Uso de memória: o snapshot é único no processo; cada sessão só guarda o próprio estado
+st.sidebar.metric("Memória desta sessão", f"{session_memory_bytes(st.session_state) / 1e6:.2f} MB")
+st.sidebar.metric("Dados compartilhados", f"{data.nbytes / 1e6:.1f} MB",
+                  help=f"Versão {data.version}. {describe_load(data.load_stats)}")
 
 # Show key metrics
 col1, col2, col3 = st.columns(3)
@@ -64,9 +66,8 @@ with col3:
 
 # Show recent job postings
 st.markdown("### Vagas Recentes")
-if 'vagas_df' in st.session_state:
-    # Extract a subset of recent vacancies for display
-    recent_vagas = vagas_df.head(5)
+# Extract a subset of recent vacancies for display
+recent_vagas = vagas_df.head(5)
     
 # Debug para ver as colunas disponíveis
 st.write("Colunas disponíveis:", list(recent_vagas.columns))
@@ -0,0 +1,352 @@
+import os
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional
+from helpers.batch_scorer import CandidateFeatures, top_k_indices
+
+# Corpus size from which find_matching_candidates retrieves through the index by default
+ANN_MIN_CANDIDATES = 500_000
+
+# The app runs from the repository root, next to applicants.csv
+DEFAULT_INDEX_PATH = 'applicants_ivf.npz'
+
+# Guards the index attached to a CandidateFeatures and the saved file: sessions
+# asking for it at once must not each train and save one
+_index_lock = threading.Lock()
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) index for approximate maximum inner product search.
+
+    Vectors are clustered with k-means; each query only scans the lists of
+    its n_probe closest centroids. More lists make each scan cheaper, more
+    probes raise recall at the cost of latency. Embeddings are expected to be
+    L2-normalized, so inner product equals cosine similarity.
+    """
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8, random_state: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.random_state = random_state
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.vectors: Optional[np.ndarray] = None
+        self.version: Optional[str] = None
+        self._list_order: Optional[np.ndarray] = None
+        self._list_offsets: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.assignments)
+
+    def fit(self, vectors: np.ndarray, sample_size: int = 100_000) -> 'IVFIndex':
+        """
+        Train the centroids and assign every vector to its list.
+
+        Args:
+            vectors: Matrix of normalized embeddings (it is referenced, not copied)
+            sample_size: Maximum number of vectors used to train k-means
+
+        Returns:
+            The fitted index
+        """
+        from sklearn.cluster import MiniBatchKMeans
+
+        n = len(vectors)
+        n_lists = self.n_lists or max(1, min(int(4 * np.sqrt(n)), 4096))
+        n_lists = min(n_lists, n) if n else 1
+
+        rng = np.random.default_rng(self.random_state)
+        sample = np.sort(rng.choice(n, size=min(n, sample_size), replace=False))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=self.random_state, n_init=3,
+                                 batch_size=4096)
+        kmeans.fit(np.asarray(vectors[sample], dtype=np.float32))
+
+        centroids = kmeans.cluster_centers_.astype(np.float32)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = np.divide(centroids, norms, out=np.zeros_like(centroids), where=norms > 0)
+        self.n_lists = n_lists
+        self.vectors = vectors
+        self.assignments = self._assign(vectors)
+        self._invalidate_lists()
+        return self
+
+    def _assign(self, vectors: np.ndarray, batch_size: int = 65_536) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), batch_size):
+            block = np.asarray(vectors[start:start + batch_size], dtype=np.float32)
+            assignments[start:start + batch_size] = np.argmax(block @ self.centroids.T, axis=1)
+        return assignments
+
+    def _invalidate_lists(self) -> None:
+        self._list_order = None
+        self._list_offsets = None
+
+    def _lists(self):
+        if self._list_order is None:
+            self._list_order = np.argsort(self.assignments, kind='stable').astype(np.int64)
+            counts = np.bincount(self.assignments, minlength=self.n_lists)
+            self._list_offsets = np.concatenate([[0], np.cumsum(counts)])
+        return self._list_order, self._list_offsets
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Insert new vectors without retraining the centroids.
+
+        Args:
+            vectors: Normalized embeddings to append
+
+        Returns:
+            Row ids assigned to the inserted vectors
+        """
+        if self.centroids is None:
+            raise ValueError("The index must be fitted before adding vectors")
+
+        first_id = len(self.assignments)
+        self.assignments = np.concatenate([self.assignments, self._assign(vectors)])
+        self.vectors = vectors if self.vectors is None or len(self.vectors) == 0 else np.vstack([self.vectors, vectors])
+        self._invalidate_lists()
+        return np.arange(first_id, first_id + len(vectors))
+
+    def update(self, kept: np.ndarray, changed: np.ndarray, vectors: np.ndarray) -> 'IVFIndex':
+        """
+        Index of a corpus updated by key, without retraining the centroids.
+
+        The corpus holds the indexed rows at the kept positions, in order,
+        followed by appended rows. Kept rows stay in their lists; replaced
+        rows are reassigned and appended ones are added (see add()). The
+        index itself is not modified.
+
+        Args:
+            kept: Positions of the indexed rows kept, in order
+            changed: Rows whose vector is new (replaced or appended)
+            vectors: Normalized embeddings of the updated corpus
+
+        Returns:
+            New IVFIndex over vectors
+        """
+        if self.centroids is None:
+            raise ValueError("The index must be fitted before updating it")
+
+        index = IVFIndex(n_lists=self.n_lists, n_probe=self.n_probe, random_state=self.random_state)
+        index.centroids = self.centroids
+        index.assignments = self.assignments[kept]
+        replaced = changed[changed < len(kept)]
+        if len(replaced):
+            index.assignments[replaced] = self._assign(np.asarray(vectors[replaced]))
+        index.add(vectors[len(kept):])
+        # add() only saw the appended rows; the index searches the whole matrix
+        index.vectors = vectors
+        return index
+
+    def candidate_ids(self, query: np.ndarray, n_probe: Optional[int] = None) -> np.ndarray:
+        """
+        Row ids stored in the lists closest to the query.
+
+        Args:
+            query: Normalized query vector
+            n_probe: Number of lists to scan (default: the index setting)
+
+        Returns:
+            Array of row ids
+        """
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probes = top_k_indices(self.centroids @ np.asarray(query, dtype=np.float32), n_probe)
+        order, offsets = self._lists()
+        return np.concatenate([order[offsets[probe]:offsets[probe + 1]] for probe in probes])
+
+    def search(self, query: np.ndarray, k: int, n_probe: Optional[int] = None):
+        """
+        Approximate top-k rows by inner product with the query.
+
+        When the probed lists hold fewer than k rows, the number of probes
+        is doubled until they do; probing every list is an exact search.
+
+        Args:
+            query: Normalized query vector
+            k: Number of neighbours to return
+            n_probe: Number of lists to scan (default: the index setting)
+
+        Returns:
+            Tuple (ids, scores) ordered by descending score, with min(k, len(index)) rows
+        """
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        ids = self.candidate_ids(query, n_probe)
+        while len(ids) < min(k, len(self)) and n_probe < self.n_lists:
+            n_probe = min(2 * n_probe, self.n_lists)
+            ids = self.candidate_ids(query, n_probe)
+
+        # Sorted ids give sequential reads on a memory-mapped matrix
+        ids = np.sort(ids)
+        scores = np.asarray(self.vectors[ids] @ query)
+        best = top_k_indices(scores, k)
+        return ids[best], scores[best]
+
+    def save(self, path: str) -> None:
+        """
+        Save centroids and list assignments (the vectors live in the embedding store).
+
+        Args:
+            path: Destination .npz file
+        """
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, centroids=self.centroids, assignments=self.assignments,
+                 n_probe=self.n_probe, version=self.version or '')
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, vectors: np.ndarray) -> 'IVFIndex':
+        """
+        Load an index saved with save() and attach it to its vectors.
+
+        Args:
+            path: Source .npz file
+            vectors: The embedding matrix the index was built on
+
+        Returns:
+            The loaded index
+        """
+        with np.load(path) as data:
+            index = cls(n_lists=len(data['centroids']), n_probe=int(data['n_probe']))
+            index.centroids = data['centroids']
+            index.assignments = data['assignments']
+            index.version = str(data['version']) or None
+
+        if len(index.assignments) != len(vectors):
+            raise ValueError("Saved index does not match the embedding matrix")
+        index.vectors = vectors
+        return index
+
+def _load_saved_index(features: CandidateFeatures, path: str) -> Optional[IVFIndex]:
+    # Only an index built on the same version of the embedding store is valid
+    if features.embedding_version is None or not os.path.exists(path):
+        return None
+    try:
+        index = IVFIndex.load(path, features.embeddings)
+    except (OSError, ValueError, KeyError):
+        return None
+    return index if index.version == features.embedding_version else None
+
+def get_ann_index(features: CandidateFeatures, path: str = DEFAULT_INDEX_PATH,
+                  n_probe: int = 8) -> IVFIndex:
+    """
+    Load the IVF index of a featurized corpus from disk, training it if needed.
+
+    The saved index is reused only if it was built on the same version of
+    the embedding store.
+
+    Args:
+        features: Candidate features whose embeddings are indexed
+        path: Location of the saved index
+        n_probe: Number of lists scanned per query
+
+    Returns:
+        IVFIndex over features.embeddings
+    """
+    with _index_lock:
+        index = getattr(features, '_ann_index', None)
+        if index is not None:
+            return index
+
+        index = _load_saved_index(features, path)
+        if index is None:
+            index = IVFIndex(n_probe=n_probe).fit(features.embeddings)
+            index.version = features.embedding_version
+            if index.version is not None:
+                try:
+                    index.save(path)
+                except OSError:
+                    pass
+
+        index.n_probe = n_probe
+        features._ann_index = index
+        return index
+
+def update_ann_index(old_features: CandidateFeatures, features: CandidateFeatures, kept: np.ndarray,
+                     changed: np.ndarray, path: str = DEFAULT_INDEX_PATH) -> Optional[IVFIndex]:
+    """
+    Carry the IVF index of a corpus over to its version updated by key.
+
+    The index of old_features (in memory, or saved for its embedding
+    version) is extended with IVFIndex.update, saved for the new embedding
+    version and attached to features, so get_ann_index does not retrain.
+
+    Args:
+        old_features: Features of the previous version of the corpus
+        features: Features of the updated corpus (see update_candidate_features)
+        kept: Rows of old_features kept, in order, before the appended rows
+        changed: Rows of features whose embedding is new
+        path: Location of the saved index
+
+    Returns:
+        The updated index, or None if the previous version had none
+    """
+    with _index_lock:
+        index = getattr(old_features, '_ann_index', None) or _load_saved_index(old_features, path)
+        if index is None:
+            return None
+
+        updated = index.update(kept, changed, features.embeddings)
+        updated.version = features.embedding_version
+        if updated.version is not None:
+            try:
+                updated.save(path)
+            except OSError:
+                pass
+        features._ann_index = updated
+        return updated
+
+def evaluate_recall(index: IVFIndex, queries: np.ndarray, k: int = 10,
+                    n_probe_values: Optional[List[int]] = None) -> List[Dict[str, float]]:
+    """
+    Measure recall@k and latency of the index against exact search.
+
+    Args:
+        index: Fitted IVF index
+        queries: Matrix of normalized query vectors (e.g. job embeddings)
+        k: Number of neighbours compared
+        n_probe_values: Probe settings to evaluate (default: the index setting)
+
+    Returns:
+        One dict per n_probe with recall, mean latency (ms) of the approximate
+        and of the exact search, and the fraction of the corpus scanned
+    """
+    report = []
+    for n_probe in n_probe_values or [index.n_probe]:
+        recalls, approx_times, exact_times, scanned = [], [], [], []
+        for query in queries:
+            start = time.perf_counter()
+            approx_ids, _ = index.search(query, k, n_probe)
+            approx_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            exact_ids = top_k_indices(np.asarray(index.vectors @ query), k)
+            exact_times.append(time.perf_counter() - start)
+
+            expected = min(k, len(exact_ids))
+            recalls.append(len(np.intersect1d(approx_ids, exact_ids)) / expected if expected else 1.0)
+            scanned.append(len(index.candidate_ids(query, n_probe)) / max(len(index), 1))
+
+        report.append({
+            'n_probe': n_probe,
+            'recall': float(np.mean(recalls)) if recalls else 1.0,
+            'ann_ms': 1000 * float(np.mean(approx_times)) if approx_times else 0.0,
+            'exact_ms': 1000 * float(np.mean(exact_times)) if exact_times else 0.0,
+            'scanned_fraction': float(np.mean(scanned)) if scanned else 0.0
+        })
+    return report
+
+if __name__ == '__main__':
+    from helpers.data_loader import load_data
+    from helpers.batch_scorer import get_candidate_features, job_embedding
+
+    vagas_df, _, applicants_df = load_data()
+    features = get_candidate_features(applicants_df)
+    index = get_ann_index(features)
+    queries = np.array([job_embedding(row) for _, row in vagas_df.head(200).iterrows()])
+
+    print(f"Índice IVF: {len(index)} vetores em {index.n_lists} listas")
+    for row in evaluate_recall(index, queries, k=10, n_probe_values=[1, 2, 4, 8, 16, 32]):
+        print(f"n_probe={row['n_probe']:>3}  recall@10={row['recall']:.3f}  "
+              f"ann={row['ann_ms']:.2f} ms  exact={row['exact_ms']:.2f} ms  "
+              f"varredura={row['scanned_fraction']:.1%}")
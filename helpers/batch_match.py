@@ -0,0 +1,251 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+from helpers.batch_scorer import SCORE_WEIGHTS, get_candidate_features
+from helpers.data_cache import source_fingerprint
+from helpers.data_loader import APPLICANTS_PATH, CACHE_DIR, PROSPECTS_PATH, VAGAS_PATH, load_data
+from helpers.data_store import lookup_rows, normalize_keys
+from helpers.embedders import get_embedder
+from helpers.skill_extractor import DEFAULT_TAXONOMY_PATH
+from helpers.similarity_calculator import find_matching_candidates
+
+# Bump when the layout of the output table changes
+BATCH_FORMAT_VERSION = 1
+
+# The app runs from the repository root, next to vagas.json
+DEFAULT_OUTPUT_PATH = 'vaga_matches.parquet'
+
+# Number of candidates kept per vaga
+DEFAULT_TOP_K = 100
+
+# Vagas per shard: the unit of work of the pool and of resuming
+DEFAULT_SHARD_SIZE = 100
+
+def batch_fingerprint() -> Dict[str, Any]:
+    """
+    Identify the inputs a precomputed ranking depends on.
+
+    Returns:
+        Dictionary with the source file fingerprints, the score weights, the
+        embedding backend, the skill taxonomy and the output format version
+    """
+    return {
+        'format': BATCH_FORMAT_VERSION,
+        'sources': source_fingerprint([VAGAS_PATH, PROSPECTS_PATH, APPLICANTS_PATH]),
+        'weights': SCORE_WEIGHTS,
+        'embedder': get_embedder().name,
+        'taxonomy': source_fingerprint([DEFAULT_TAXONOMY_PATH])
+    }
+
+def _version(fingerprint: Dict[str, Any], top_k: int) -> str:
+    version_key = json.dumps([fingerprint, top_k], sort_keys=True)
+    return hashlib.blake2b(version_key.encode('utf-8'), digest_size=8).hexdigest()
+
+def rank_vagas(vagas_df: pd.DataFrame, applicants_df: pd.DataFrame, vaga_ids: List[str],
+               top_k: int = DEFAULT_TOP_K) -> pd.DataFrame:
+    """
+    Top-k candidates of each vaga, as find_matching_candidates returns them.
+
+    Args:
+        vagas_df: DataFrame with job vacancies
+        applicants_df: DataFrame with applicant data
+        vaga_ids: Vagas to rank
+        top_k: Candidates kept per vaga
+
+    Returns:
+        DataFrame with 'vaga_id' and 'rank' (1 = best) followed by the
+        find_matching_candidates columns
+    """
+    frames = []
+    for vaga_id in vaga_ids:
+        # The batch is already spread over processes: score each vaga in-process
+        # (the rankings go to the batch table, not to the ranking cache), and
+        # only the candidates that can reach the top_k
+        ranking = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=top_k, workers=1,
+                                           use_cache=False, prune=True)
+        if ranking.empty:
+            continue
+        # Keys as normalized strings, so the table does not depend on how they were parsed
+        ranking['codigo'] = normalize_keys(ranking['codigo'])
+        ranking.insert(0, 'rank', range(1, len(ranking) + 1))
+        ranking.insert(0, 'vaga_id', normalize_keys(pd.Series([vaga_id] * len(ranking))))
+        frames.append(ranking)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+# Data of each worker process, loaded once by the pool initializer
+_worker_data: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None
+
+def _init_worker() -> None:
+    global _worker_data
+    vagas_df, _, applicants_df = load_data()
+    # Reopens the embeddings and skill matrix saved by the parent process
+    get_candidate_features(applicants_df)
+    _worker_data = (vagas_df, applicants_df)
+
+def _rank_shard(shard: int, vaga_ids: List[str], top_k: int) -> Tuple[int, pd.DataFrame]:
+    vagas_df, applicants_df = _worker_data
+    return shard, rank_vagas(vagas_df, applicants_df, vaga_ids, top_k)
+
+def _shard_path(shard_dir: str, shard: int) -> str:
+    return os.path.join(shard_dir, f'shard_{shard:05d}.parquet')
+
+def _write_parquet(df: pd.DataFrame, path: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata is not None:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               b'batch_match': json.dumps(metadata).encode('utf-8')})
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+def run_batch(output_path: str = DEFAULT_OUTPUT_PATH, top_k: int = DEFAULT_TOP_K,
+              shard_size: int = DEFAULT_SHARD_SIZE, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Precompute the top-k candidates of every vaga and write them to Parquet.
+
+    Vagas are split into shards scored in a process pool. Each finished
+    shard is saved under the cache directory, so an interrupted run resumes
+    by skipping the shards already on disk (as long as the inputs did not
+    change). The final table replaces output_path atomically.
+
+    Args:
+        output_path: Destination Parquet file
+        top_k: Candidates kept per vaga
+        shard_size: Vagas per shard
+        workers: Worker processes (default: one per CPU; 0 runs in-process)
+
+    Returns:
+        Dictionary with the number of vagas, shards, resumed shards, rows
+        and elapsed seconds
+    """
+    start = time.perf_counter()
+    fingerprint = batch_fingerprint()
+    version = _version(fingerprint, top_k)
+
+    vagas_df, _, applicants_df = load_data()
+    # Build (or refresh) the saved corpus features once, before the workers reopen them
+    get_candidate_features(applicants_df)
+
+    vaga_ids = vagas_df['vaga_id'].tolist()
+    shards = [vaga_ids[i:i + shard_size] for i in range(0, len(vaga_ids), shard_size)]
+
+    batch_dir = os.path.join(CACHE_DIR, 'batch_match')
+    shard_dir = os.path.join(batch_dir, version)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    pending = [shard for shard in range(len(shards)) if not os.path.exists(_shard_path(shard_dir, shard))]
+    resumed = len(shards) - len(pending)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if pending and workers == 0:
+        for shard in pending:
+            ranking = rank_vagas(vagas_df, applicants_df, shards[shard], top_k)
+            _write_parquet(ranking, _shard_path(shard_dir, shard))
+    elif pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), initializer=_init_worker) as pool:
+            futures = [pool.submit(_rank_shard, shard, shards[shard], top_k) for shard in pending]
+            for done, future in enumerate(as_completed(futures), start=1):
+                shard, ranking = future.result()
+                _write_parquet(ranking, _shard_path(shard_dir, shard))
+                print(f"Shard {shard + 1}/{len(shards)} concluído ({done}/{len(pending)})")
+
+    import pyarrow.parquet as pq
+
+    frames = [pq.read_table(_shard_path(shard_dir, shard)).to_pandas() for shard in range(len(shards))]
+    frames = [frame for frame in frames if not frame.empty]
+    matches_df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    _write_parquet(matches_df, output_path, {**fingerprint, 'top_k': top_k, 'version': version})
+
+    # Shards are only needed to resume; drop them with any stale runs
+    shutil.rmtree(batch_dir, ignore_errors=True)
+
+    return {
+        'vagas': len(vaga_ids),
+        'shards': len(shards),
+        'resumed_shards': resumed,
+        'rows': len(matches_df),
+        'seconds': time.perf_counter() - start
+    }
+
+_table_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any], pd.DataFrame]] = {}
+_table_lock = threading.Lock()
+
+def _load_table(path: str) -> Optional[Tuple[Dict[str, Any], pd.DataFrame]]:
+    import pyarrow.parquet as pq
+
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    file_id = (stat.st_size, stat.st_mtime_ns)
+    with _table_lock:
+        cached = _table_cache.get(path)
+        if cached is not None and cached[0] == file_id:
+            return cached[1], cached[2]
+
+        try:
+            table = pq.read_table(path)
+            metadata = json.loads((table.schema.metadata or {}).get(b'batch_match', b'{}'))
+        except (OSError, ValueError):
+            return None
+
+        matches_df = table.to_pandas()
+        _table_cache[path] = (file_id, metadata, matches_df)
+        return metadata, matches_df
+
+def get_precomputed_matches(vaga_id: str, top_n: int,
+                            path: str = DEFAULT_OUTPUT_PATH) -> Optional[pd.DataFrame]:
+    """
+    Top candidates of a vaga from the precomputed table, if it is fresh.
+
+    The table is fresh when it was built from the current source files with
+    the current score weights, embedding backend and skill taxonomy and kept
+    at least top_n candidates per vaga.
+
+    Args:
+        vaga_id: ID of the job vacancy
+        top_n: Number of candidates wanted
+        path: Parquet file written by run_batch
+
+    Returns:
+        DataFrame with the find_matching_candidates columns, or None when
+        the table is missing or stale (the caller scores on demand)
+    """
+    loaded = _load_table(path)
+    if loaded is None:
+        return None
+
+    metadata, matches_df = loaded
+    if (metadata.get('top_k', 0) < top_n
+            or {key: metadata.get(key) for key in ('format', 'sources', 'weights', 'embedder', 'taxonomy')}
+            != batch_fingerprint()):
+        return None
+
+    if matches_df.empty:
+        return pd.DataFrame()
+    ranking = lookup_rows(matches_df, 'vaga_id', vaga_id).head(top_n)
+    return ranking.drop(columns=['vaga_id', 'rank']).reset_index(drop=True)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pré-calcula os melhores candidatos de todas as vagas.")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_PATH, help="Arquivo Parquet de saída")
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K, help="Candidatos guardados por vaga")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help="Vagas por shard")
+    parser.add_argument('--workers', type=int, default=None, help="Processos (padrão: um por CPU; 0 = sem pool)")
+    args = parser.parse_args()
+
+    stats = run_batch(args.output, args.top_k, args.shard_size, args.workers)
+    print(f"{stats['vagas']} vagas em {stats['shards']} shards ({stats['resumed_shards']} retomados), "
+          f"{stats['rows']} linhas gravadas em {args.output} em {stats['seconds']:.1f} s")
@@ -0,0 +1,555 @@
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Any, Dict, List, Optional, Tuple, Union
+from helpers.text_processor import (
+    encode_texts,
+    extract_skills,
+    education_level_to_int,
+    language_level_to_int,
+    levels_to_ordinal,
+)
+from helpers.data_store import frame_version
+from helpers.embedding_store import EmbeddingStore
+from helpers.skill_matrix import (
+    DEFAULT_SKILL_MATRIX_PATH,
+    SkillMatrix,
+    load_or_build_skill_matrix,
+    save_updated_skill_matrix,
+)
+from helpers.projection import ProjectedEmbeddings
+from helpers.quantization import QuantizedEmbeddings
+from helpers.text_index import SparseTextIndex
+
+# Weights used to combine the individual scores into the overall score
+SCORE_WEIGHTS = {
+    'text_similarity': 0.35,
+    'skill_match': 0.35,
+    'education_match': 0.1,
+    'english_match': 0.1,
+    'spanish_match': 0.1
+}
+
+SCORE_COMPONENTS = list(SCORE_WEIGHTS.keys())
+
+def resolve_weights(weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Complete and validate a weighting of the score components.
+
+    Args:
+        weights: Weight per component; components left out weigh 0
+            (default: SCORE_WEIGHTS). Weights summing to 1 keep the overall
+            score between 0 and 1.
+
+    Returns:
+        Dictionary with one weight per component, in SCORE_COMPONENTS order
+    """
+    if weights is None:
+        return dict(SCORE_WEIGHTS)
+    unknown = set(weights) - set(SCORE_COMPONENTS)
+    if unknown:
+        raise ValueError(f"Unknown score components: {', '.join(sorted(unknown))} "
+                         f"(available: {', '.join(SCORE_COMPONENTS)})")
+    resolved = {name: float(weights.get(name, 0.0)) for name in SCORE_COMPONENTS}
+    if any(not np.isfinite(weight) or weight < 0 for weight in resolved.values()):
+        raise ValueError("Score weights must be finite and non-negative")
+    return resolved
+
+def weight_vector(weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    Weights as a float32 vector aligned with the columns of component_matrix.
+
+    Args:
+        weights: Weight per component (see resolve_weights)
+
+    Returns:
+        Array with one weight per component
+    """
+    resolved = resolve_weights(weights)
+    return np.array([resolved[name] for name in SCORE_COMPONENTS], dtype=np.float32)
+
+def component_matrix(scores: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Component scores of score_job as a compact candidates x components matrix.
+
+    Args:
+        scores: Dictionary returned by score_job
+
+    Returns:
+        float32 array of shape (n, len(SCORE_COMPONENTS))
+    """
+    n = len(scores['overall_score'])
+    matrix = np.empty((n, len(SCORE_COMPONENTS)), dtype=np.float32)
+    for column, name in enumerate(SCORE_COMPONENTS):
+        matrix[:, column] = scores[name]
+    return matrix
+
+class CandidateFeatures:
+    """
+    Pre-computed features for every applicant of a corpus, aligned by row position.
+
+    Scoring a job against the whole corpus only needs these arrays, so the
+    expensive per-candidate work (text encoding, skill extraction, level
+    parsing) is done once instead of once per job/candidate pair.
+    """
+
+    def __init__(self, embeddings: np.ndarray, skill_matrix: SkillMatrix,
+                 education_levels: np.ndarray, english_levels: np.ndarray,
+                 spanish_levels: np.ndarray, embedding_version: Optional[str] = None):
+        self.embeddings = embeddings
+        self.skill_matrix = skill_matrix
+        self.education_levels = education_levels
+        self.english_levels = english_levels
+        self.spanish_levels = spanish_levels
+        # Version of the persisted embeddings (None when computed in memory)
+        self.embedding_version = embedding_version
+
+    def __len__(self) -> int:
+        return len(self.education_levels)
+
+    def subset(self, positions: np.ndarray) -> 'CandidateFeatures':
+        """
+        Features of the candidates at the given row positions, in that order.
+
+        Args:
+            positions: Row positions to keep
+
+        Returns:
+            New CandidateFeatures with only the selected rows
+        """
+        return CandidateFeatures(
+            embeddings=self.embeddings[positions],
+            skill_matrix=self.skill_matrix.subset(positions),
+            education_levels=self.education_levels[positions],
+            english_levels=self.english_levels[positions],
+            spanish_levels=self.spanish_levels[positions]
+        )
+
+def _column_values(df: pd.DataFrame, column: str) -> List[Any]:
+    if column in df.columns:
+        return df[column].tolist()
+    return [''] * len(df)
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix, dtype=float), where=norms > 0)
+
+def _ordinal_levels(df: pd.DataFrame, column: str, to_int) -> np.ndarray:
+    # Use the codes computed at load time when available
+    if f'{column}_ord' in df.columns:
+        return df[f'{column}_ord'].to_numpy()
+    return levels_to_ordinal(pd.Series(_column_values(df, column), dtype=object), to_int)
+
+def _job_level(job_data: pd.Series, column: str, to_int) -> int:
+    level = job_data.get(f'{column}_ord')
+    if level is None or pd.isna(level):
+        return to_int(job_data.get(column, ''))
+    return int(level)
+
+def build_candidate_features(applicants_df: pd.DataFrame,
+                             embedding_store: Optional[EmbeddingStore] = None,
+                             skill_matrix_path: Optional[str] = None) -> CandidateFeatures:
+    """
+    Featurize an applicant corpus for batch scoring.
+
+    Args:
+        applicants_df: DataFrame with applicant data (including 'profile_text')
+        embedding_store: Store used to reuse previously computed profile
+            embeddings (if None, every profile is encoded in memory)
+        skill_matrix_path: File used to persist the skill matrix (if None,
+            skills are extracted in memory)
+
+    Returns:
+        CandidateFeatures aligned with the rows of applicants_df
+    """
+    profiles = [text if isinstance(text, str) else '' for text in _column_values(applicants_df, 'profile_text')]
+
+    # The version of a DataStore frame identifies its rows and their order, so
+    # the stores recognize an unchanged corpus at once
+    source = frame_version(applicants_df)
+    embedding_version = None
+    if embedding_store is not None:
+        embeddings = embedding_store.get_embeddings(profiles, source)
+        embedding_version = embedding_store.version
+    else:
+        embeddings = _normalize_rows(encode_texts(profiles))
+
+    if skill_matrix_path is not None:
+        skill_matrix = load_or_build_skill_matrix(profiles, skill_matrix_path, source=source)
+    else:
+        skill_matrix = SkillMatrix.from_texts(profiles)
+
+    return CandidateFeatures(
+        embeddings=embeddings,
+        skill_matrix=skill_matrix,
+        education_levels=_ordinal_levels(applicants_df, 'nivel_academic', education_level_to_int),
+        english_levels=_ordinal_levels(applicants_df, 'nivel_ingles', language_level_to_int),
+        spanish_levels=_ordinal_levels(applicants_df, 'nivel_espanhol', language_level_to_int),
+        embedding_version=embedding_version
+    )
+
+def update_candidate_features(features: CandidateFeatures, old_df: pd.DataFrame, new_df: pd.DataFrame,
+                              kept: np.ndarray, changed: np.ndarray,
+                              embedding_store: Optional[EmbeddingStore] = None,
+                              skill_matrix_path: Optional[str] = None) -> CandidateFeatures:
+    """
+    Features of a new version of an applicant corpus, reusing the old version's rows.
+
+    new_df is old_df updated by key (see data_refresher.apply_frame_diff):
+    the rows at the kept positions of old_df, in order, followed by the
+    appended rows, where the changed rows (replaced in place or appended)
+    come from the new version of the source. Every other row keeps its
+    embedding and skill row without being compared, and changed rows keep
+    theirs when the profile text did not change, so only inserted and
+    edited profiles are encoded and run through the skill extractor. Levels
+    are re-read from new_df (they are cheap, vectorized columns).
+
+    With a store and a matrix path the result is saved as a new version,
+    hashing only the re-encoded rows, so embedding_version is set and the
+    next process (and the ANN index, see update_ann_index) reuses it.
+
+    Args:
+        features: Features aligned with old_df
+        old_df: Previous applicant DataFrame
+        new_df: Updated applicant DataFrame
+        kept: Positions of old_df kept in new_df, in order, before the appended rows
+        changed: Positions of new_df read from the new version of the source
+        embedding_store: Store the updated embeddings are saved to
+        skill_matrix_path: File the updated skill matrix is saved to
+
+    Returns:
+        CandidateFeatures aligned with the rows of new_df
+    """
+    kept = np.asarray(kept, dtype=np.int64)
+    changed = np.asarray(changed, dtype=np.int64)
+    profiles = np.array([text if isinstance(text, str) else '' for text in _column_values(new_df, 'profile_text')],
+                        dtype=object)
+
+    # Rows replaced in place keep their features when only other columns changed
+    replaced = changed[changed < len(kept)]
+    unchanged = np.zeros(len(replaced), dtype=bool)
+    if 'profile_text' in old_df.columns and len(replaced):
+        old_profiles = old_df['profile_text'].to_numpy(dtype=object)[kept[replaced]]
+        unchanged = old_profiles == profiles[replaced]
+    encoded = np.sort(np.concatenate([replaced[~unchanged], changed[changed >= len(kept)]]))
+
+    skill_matrix = SkillMatrix.from_texts(profiles[encoded].tolist())
+    if skill_matrix.skills != features.skill_matrix.skills:
+        # The taxonomy changed: no stored skill row is valid
+        return build_candidate_features(new_df, embedding_store, skill_matrix_path)
+
+    embeddings = np.zeros((len(new_df), features.embeddings.shape[1]))
+    embeddings[:len(kept)] = features.embeddings[kept]
+    if len(encoded):
+        embeddings[encoded] = _normalize_rows(encode_texts(profiles[encoded].tolist()))
+
+    # Kept rows first, then the new ones, gathered back into corpus order
+    source_rows = np.arange(len(new_df))
+    source_rows[encoded] = len(kept) + np.arange(len(encoded))
+    matrix = sparse.vstack([features.skill_matrix.matrix[kept], skill_matrix.matrix], format='csr')[source_rows]
+    skill_matrix = SkillMatrix(matrix, skill_matrix.skills)
+
+    embedding_version = None
+    if embedding_store is not None:
+        saved = embedding_store.save_update(features.embedding_version, kept, encoded, profiles.tolist(),
+                                            embeddings, frame_version(new_df))
+        if saved is not None:
+            embeddings, embedding_version = saved, embedding_store.version
+    if skill_matrix_path is not None:
+        save_updated_skill_matrix(skill_matrix, profiles.tolist(), kept, encoded, skill_matrix_path,
+                                  frame_version(old_df), frame_version(new_df))
+
+    return CandidateFeatures(
+        embeddings=embeddings,
+        skill_matrix=skill_matrix,
+        education_levels=_ordinal_levels(new_df, 'nivel_academic', education_level_to_int),
+        english_levels=_ordinal_levels(new_df, 'nivel_ingles', language_level_to_int),
+        spanish_levels=_ordinal_levels(new_df, 'nivel_espanhol', language_level_to_int),
+        embedding_version=embedding_version
+    )
+
+_features_cache: Dict[int, Tuple[weakref.ref, CandidateFeatures]] = {}
+_features_lock = threading.Lock()
+
+def _cache_features(applicants_df: pd.DataFrame, features: CandidateFeatures) -> None:
+    key = id(applicants_df)
+    ref = weakref.ref(applicants_df, lambda _, key=key: _features_cache.pop(key, None))
+    _features_cache[key] = (ref, features)
+
+def cached_candidate_features(applicants_df: pd.DataFrame) -> Optional[CandidateFeatures]:
+    """
+    Features of an applicant DataFrame if they were already built (never builds them).
+
+    Args:
+        applicants_df: DataFrame with applicant data
+
+    Returns:
+        The cached CandidateFeatures, or None
+    """
+    with _features_lock:
+        cached = _features_cache.get(id(applicants_df))
+        if cached is not None and cached[0]() is applicants_df:
+            return cached[1]
+        return None
+
+def set_candidate_features(applicants_df: pd.DataFrame, features: CandidateFeatures) -> None:
+    """
+    Make get_candidate_features return the given features for a DataFrame.
+
+    Used when the features were derived incrementally from another version
+    of the corpus (see update_candidate_features).
+
+    Args:
+        applicants_df: DataFrame with applicant data
+        features: Features aligned with its rows
+    """
+    with _features_lock:
+        _cache_features(applicants_df, features)
+
+def get_candidate_features(applicants_df: pd.DataFrame,
+                           embedding_store: Optional[EmbeddingStore] = None) -> CandidateFeatures:
+    """
+    Return the features of an applicant DataFrame, building them on first use.
+
+    Features are cached for as long as the DataFrame object is alive, and
+    profile embeddings and skills are persisted next to applicants.csv so
+    that only new or changed profiles are featurized after a restart.
+
+    Args:
+        applicants_df: DataFrame with applicant data
+        embedding_store: Store for profile embeddings (default: next to applicants.csv)
+
+    Returns:
+        CandidateFeatures aligned with the rows of applicants_df
+    """
+    key = id(applicants_df)
+    with _features_lock:
+        cached = _features_cache.get(key)
+        if cached is not None and cached[0]() is applicants_df:
+            return cached[1]
+
+        features = build_candidate_features(
+            applicants_df, embedding_store or EmbeddingStore(), DEFAULT_SKILL_MATRIX_PATH
+        )
+        _cache_features(applicants_df, features)
+        return features
+
+def level_match(job_level: int, candidate_levels: np.ndarray) -> np.ndarray:
+    """
+    Vectorized level match (education or language) of one job against many candidates.
+
+    Args:
+        job_level: Ordinal level required by the job (0 = no requirement)
+        candidate_levels: Ordinal levels of the candidates
+
+    Returns:
+        Array of match scores between 0 and 1
+    """
+    if job_level == 0:
+        return np.ones(len(candidate_levels))
+
+    # Levels are small ordinal codes: build the score of each possible level
+    # once and gather it for every candidate
+    levels = np.arange(max(int(candidate_levels.max(initial=0)), job_level) + 1)
+    scores_by_level = np.where(levels >= job_level, 1.0, levels / job_level)
+    return scores_by_level[candidate_levels]
+
+def _job_description(job_data: pd.Series) -> str:
+    job_description = job_data.get('descricao_completa', '')
+    return job_description if isinstance(job_description, str) else ''
+
+def job_embedding(job_data: pd.Series) -> np.ndarray:
+    """
+    Normalized embedding of a job description.
+
+    Args:
+        job_data: Series containing job data
+
+    Returns:
+        L2-normalized job vector (all zeros for an empty description)
+    """
+    return _normalize_rows(encode_texts([_job_description(job_data)]))[0]
+
+def score_job(job_data: pd.Series, features: CandidateFeatures,
+              positions: Optional[np.ndarray] = None,
+              text_index: Optional[SparseTextIndex] = None,
+              approximate: Optional[Union[QuantizedEmbeddings, ProjectedEmbeddings]] = None,
+              weights: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+    """
+    Score one job against every candidate of a featurized corpus.
+
+    Produces the same values as calling calculate_similarity for each
+    candidate, but as arrays computed in a single pass.
+
+    Args:
+        job_data: Series containing job data
+        features: Pre-computed candidate features
+        positions: Optional row positions to score (default: every candidate)
+        text_index: Sparse TF-IDF/BM25 index of the same corpus used for
+            text_similarity instead of the embeddings (default: embeddings)
+        approximate: Quantized or projected copy of the corpus embeddings
+            used for text_similarity instead of the full matrix
+        weights: Weight per component of the overall score (default: SCORE_WEIGHTS)
+
+    Returns:
+        Dictionary with one score array per category plus 'overall_score',
+        aligned with positions when given
+    """
+    job_description = _job_description(job_data)
+
+    if text_index is not None:
+        # Text similarity: one sparse mat-vec over the whole corpus
+        text_similarity = text_index.score(job_description)
+        if positions is not None:
+            text_similarity = text_similarity[positions]
+    elif approximate is not None:
+        # Approximate cosine on the smaller matrix (the full one is not read)
+        text_similarity = approximate.dot(job_embedding(job_data), positions)
+
+    if positions is not None:
+        features = features.subset(positions)
+
+    if text_index is None and approximate is None:
+        # Text similarity: cosine against the normalized candidate matrix
+        text_similarity = features.embeddings @ job_embedding(job_data)
+
+    scores = {'text_similarity': text_similarity, **cheap_scores(job_data, features)}
+    scores['overall_score'] = combine_scores(scores, weights)
+
+    return scores
+
+def cheap_scores(job_data: pd.Series, features: CandidateFeatures) -> Dict[str, np.ndarray]:
+    """
+    Every score component except text similarity, for every candidate.
+
+    These only need the skill matrix and the ordinal levels, so they cost a
+    sparse mat-vec and a few gathers; text similarity reads the embeddings.
+
+    Args:
+        job_data: Series containing job data
+        features: Pre-computed candidate features
+
+    Returns:
+        Dictionary with the 'skill_match', 'education_match', 'english_match'
+        and 'spanish_match' arrays
+    """
+    return _prepared_cheap_scores(prepare_job(job_data, features.skill_matrix, with_vector=False), features)
+
+def _prepared_cheap_scores(query: 'JobQuery', features: CandidateFeatures) -> Dict[str, np.ndarray]:
+    return {
+        # Skill overlap: matched job skills / number of job skills (sparse mat-vec)
+        'skill_match': features.skill_matrix.mask_overlap(query.skill_mask, query.n_skills),
+        'education_match': level_match(query.education_level, features.education_levels),
+        'english_match': level_match(query.english_level, features.english_levels),
+        'spanish_match': level_match(query.spanish_level, features.spanish_levels)
+    }
+
+class JobQuery:
+    """
+    Everything score_job needs from a job, computed once per job.
+
+    Encoding the description and extracting its skills is the per-job cost
+    of scoring; what is left is a mat-vec and a few gathers per candidate.
+    A JobQuery only holds small arrays and ints, so it is cheap to send to
+    worker processes that score shards of a corpus.
+    """
+
+    def __init__(self, vector: Optional[np.ndarray], skill_mask: np.ndarray, n_skills: int,
+                 education_level: int, english_level: int, spanish_level: int):
+        # Normalized job embedding (None when only the cheap scores are needed)
+        self.vector = vector
+        # Job skills over the vocabulary of the corpus skill matrix
+        self.skill_mask = skill_mask
+        self.n_skills = n_skills
+        self.education_level = education_level
+        self.english_level = english_level
+        self.spanish_level = spanish_level
+
+def prepare_job(job_data: pd.Series, skill_matrix: SkillMatrix, with_vector: bool = True) -> JobQuery:
+    """
+    Encode a job once for scoring against a corpus (or shards of it).
+
+    Args:
+        job_data: Series containing job data
+        skill_matrix: Skill matrix of the corpus (its vocabulary sets the mask)
+        with_vector: Also encode the job description
+
+    Returns:
+        JobQuery of the job
+    """
+    job_skills = set(extract_skills(_job_description(job_data)))
+    return JobQuery(
+        vector=job_embedding(job_data) if with_vector else None,
+        skill_mask=skill_matrix.job_mask(job_skills),
+        n_skills=len(job_skills),
+        education_level=_job_level(job_data, 'nivel_academico', education_level_to_int),
+        english_level=_job_level(job_data, 'nivel_ingles', language_level_to_int),
+        spanish_level=_job_level(job_data, 'nivel_espanhol', language_level_to_int)
+    )
+
+def score_prepared_job(query: JobQuery, features: CandidateFeatures,
+                       weights: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+    """
+    score_job of a job already encoded with prepare_job.
+
+    Runs the same operations as score_job over the dense embeddings, so the
+    arrays are identical.
+
+    Args:
+        query: prepare_job() of the job, with its vector
+        features: Pre-computed candidate features
+        weights: Weight per component of the overall score (default: SCORE_WEIGHTS)
+
+    Returns:
+        Dictionary with one score array per category plus 'overall_score'
+    """
+    scores = {'text_similarity': features.embeddings @ query.vector, **_prepared_cheap_scores(query, features)}
+    scores['overall_score'] = combine_scores(scores, weights)
+    return scores
+
+def combine_scores(scores: Dict[str, np.ndarray], weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """
+    Weighted overall score of the component arrays.
+
+    Components are added in SCORE_COMPONENTS order, so the same inputs
+    always round the same way.
+
+    Args:
+        scores: One array per component of SCORE_COMPONENTS
+        weights: Weight per component (default: SCORE_WEIGHTS)
+
+    Returns:
+        Array with the overall score of every candidate
+    """
+    weights = resolve_weights(weights)
+    overall_score = np.zeros(len(scores[SCORE_COMPONENTS[0]]))
+    for category in SCORE_COMPONENTS:
+        overall_score = overall_score + scores[category] * weights[category]
+    return overall_score
+
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k largest values, best first.
+
+    Ties are broken by position so the result equals the head of a full
+    stable descending sort. Uses a partial partition, so it is O(n) for small k.
+
+    Args:
+        values: Scores to rank
+        k: Number of positions to return (<= 0 returns every position)
+
+    Returns:
+        Array of row positions ordered by descending value
+    """
+    n = len(values)
+    if k <= 0 or k >= n:
+        return np.argsort(-values, kind='stable')
+
+    kth_value = np.partition(values, n - k)[n - k]
+    above = np.flatnonzero(values > kth_value)
+    ties = np.flatnonzero(values == kth_value)[:k - len(above)]
+    selected = np.concatenate([above, ties])
+
+    return selected[np.argsort(-values[selected], kind='stable')]
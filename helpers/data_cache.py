@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+# Bump when the prepared DataFrames change shape (new derived columns, etc.)
+CACHE_FORMAT_VERSION = 2
+
+def source_fingerprint(paths: List[str]) -> Dict[str, Dict]:
+    """
+    Identify the current state of the source files.
+
+    Args:
+        paths: Source files
+
+    Returns:
+        Dictionary {path: {'size', 'mtime_ns'}}
+    """
+    fingerprint = {}
+    for path in paths:
+        stat = os.stat(path)
+        fingerprint[os.path.abspath(path)] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    return fingerprint
+
+def arrow_compatible(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Frame whose object columns Arrow can store.
+
+    Object columns mixing types (e.g. codes read as numbers in some rows and
+    as text in others) are rejected by Arrow; their non-missing values are
+    converted to str. Join keys are compared normalized (see
+    data_store.normalize_key), so '123' still matches 123.
+
+    Args:
+        df: Frame to cache
+
+    Returns:
+        df itself when every column converts, otherwise a copy with the mixed
+        columns as strings
+    """
+    import pyarrow as pa
+
+    mixed = []
+    for column in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[column], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            mixed.append(column)
+    if not mixed:
+        return df
+
+    df = df.copy()
+    for column in mixed:
+        values = df[column]
+        df[column] = values.where(values.isna(), values.astype(str))
+    return df
+
+class DataCache:
+    """
+    Columnar (Arrow/Feather) cache of the prepared DataFrames.
+
+    Frames are stored uncompressed so they can be reopened memory-mapped.
+    load() converts them to pandas, which copies the data into the
+    DataFrames (the mapping only spares reading the file into a buffer
+    first); frame_path() gives the file to callers that read it in record
+    batches straight from the mapping.
+
+    A JSON manifest records the fingerprint of the source files the frames
+    were built from; the cache is only used while that fingerprint matches.
+    Load options (the 'options' entry of the fingerprint, e.g. lean) get
+    their own manifest and files, so caches of different options coexist.
+    Each cached version uses its own file names and the manifest is replaced
+    atomically, so readers never see a mix of old and new frames.
+
+    Frames that are not in the order of a fresh parse (a snapshot updated by
+    key, see DataRefresher) are saved with their data version, which the
+    manifest records and load_versioned() returns.
+    """
+
+    def __init__(self, directory: str = '.cache'):
+        self.directory = directory
+
+    def _manifest_path(self, options_key: str) -> str:
+        return os.path.join(self.directory, f'data_manifest.{options_key}.json')
+
+    def _frame_path(self, name: str, options_key: str, version: str) -> str:
+        return os.path.join(self.directory, f'{name}.{options_key}.{version}.feather')
+
+    def load(self, fingerprint: Dict[str, Dict]) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Reopen the cached frames if they were built from the given sources.
+
+        Args:
+            fingerprint: Current fingerprint of the source files
+
+        Returns:
+            Dictionary {name: DataFrame}, or None on a cache miss
+        """
+        loaded = self.load_versioned(fingerprint)
+        return None if loaded is None else loaded[0]
+
+    def load_versioned(self, fingerprint: Dict[str, Dict]) -> Optional[Tuple[Dict[str, pd.DataFrame], Optional[str]]]:
+        """
+        load(), plus the data version the frames were saved with.
+
+        Args:
+            fingerprint: Current fingerprint of the source files
+
+        Returns:
+            Tuple ({name: DataFrame}, data version or None for frames in the
+            order of a fresh parse), or None on a cache miss
+        """
+        import pyarrow.feather as feather
+
+        manifest = self._manifest(fingerprint)
+        if manifest is None:
+            return None
+        options_key = _options_key(fingerprint)
+        try:
+            frames = {
+                name: feather.read_table(self._frame_path(name, options_key, manifest['version']),
+                                         memory_map=True).to_pandas()
+                for name in manifest['frames']
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        return frames, manifest.get('data_version')
+
+    def frame_path(self, fingerprint: Dict[str, Dict], name: str) -> Optional[str]:
+        """
+        File of one cached frame, if the cache was built from the given sources.
+
+        Lets a caller read the frame in record batches instead of all at once.
+        Only frames in the order of a fresh parse are given out (file order).
+
+        Args:
+            fingerprint: Current fingerprint of the source files
+            name: Frame name (e.g. 'applicants')
+
+        Returns:
+            Path of the Arrow/Feather file, or None on a cache miss
+        """
+        manifest = self._manifest(fingerprint)
+        if (manifest is None or 'version' not in manifest or name not in manifest.get('frames', [])
+                or manifest.get('data_version') is not None):
+            return None
+        path = self._frame_path(name, _options_key(fingerprint), manifest['version'])
+        return path if os.path.exists(path) else None
+
+    def _manifest(self, fingerprint: Dict[str, Dict]) -> Optional[Dict]:
+        try:
+            with open(self._manifest_path(_options_key(fingerprint)), 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('format') != CACHE_FORMAT_VERSION or manifest.get('sources') != fingerprint:
+            return None
+        return manifest
+
+    def save(self, fingerprint: Dict[str, Dict], frames: Dict[str, pd.DataFrame],
+             data_version: Optional[str] = None) -> bool:
+        """
+        Write the frames and point the manifest at them.
+
+        Args:
+            fingerprint: Fingerprint of the sources the frames were built from
+            frames: Dictionary {name: DataFrame}
+            data_version: Version of frames that are not in the order of a
+                fresh parse (see data_loader.data_version), None for frames
+                parsed from the sources
+
+        Returns:
+            True if the cache was written; False if a frame cannot be
+            represented in Arrow even after arrow_compatible() or the
+            directory is not writable
+        """
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        tmp_suffix = f'.{os.getpid()}.tmp'
+        try:
+            tables = {name: pa.Table.from_pandas(arrow_compatible(df), preserve_index=True)
+                      for name, df in frames.items()}
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            return False
+
+        options_key = _options_key(fingerprint)
+        manifest_path = self._manifest_path(options_key)
+        version_key = json.dumps([CACHE_FORMAT_VERSION, fingerprint], sort_keys=True)
+        version = hashlib.blake2b(version_key.encode('utf-8'), digest_size=8).hexdigest()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            for name, table in tables.items():
+                path = self._frame_path(name, options_key, version)
+                feather.write_feather(table, path + tmp_suffix, compression='uncompressed')
+                os.replace(path + tmp_suffix, path)
+
+            manifest = {
+                'format': CACHE_FORMAT_VERSION,
+                'version': version,
+                'sources': fingerprint,
+                'frames': list(frames),
+                'data_version': data_version
+            }
+            with open(manifest_path + tmp_suffix, 'w', encoding='utf-8') as file:
+                json.dump(manifest, file)
+            os.replace(manifest_path + tmp_suffix, manifest_path)
+        except OSError:
+            return False
+
+        self._remove_stale_versions(options_key, version)
+        return True
+
+    def _remove_stale_versions(self, options_key: str, current_version: str) -> None:
+        # Only older versions of the same options, plus the files of the first
+        # cache layout (one manifest, '<name>.<version>.feather'); processes
+        # that still have them memory-mapped keep reading the unlinked file
+        for file_name in os.listdir(self.directory):
+            parts = file_name.split('.')
+            stale = (len(parts) == 4 and parts[3] == 'feather' and parts[1] == options_key
+                     and parts[2] != current_version)
+            legacy = (len(parts) == 3 and parts[2] == 'feather') or file_name == 'data_manifest.json'
+            if stale or legacy:
+                try:
+                    os.remove(os.path.join(self.directory, file_name))
+                except OSError:
+                    pass
+
+def _options_key(fingerprint: Dict[str, Dict]) -> str:
+    # Short identifier of the load options recorded in a fingerprint
+    options = json.dumps(fingerprint.get('options', {}), sort_keys=True)
+    return hashlib.blake2b(options.encode('utf-8'), digest_size=4).hexdigest()
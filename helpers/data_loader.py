@@ -1,14 +1,58 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import hashlib
 import json
 import os
-from typing import Tuple, Dict, List, Any
-from sklearn.metrics.pairwise import cosine_similarity
-from sentence_transformers import SentenceTransformer
+import sys
+import time
+from typing import Tuple, Dict, List, Any, Optional
+from helpers.text_processor import education_level_to_int, language_level_to_int, levels_to_ordinal
+from helpers.data_cache import DataCache, source_fingerprint
+from helpers.json_stream import iter_object_items, peak_rss_bytes, stream_to_frame
+from helpers.data_store import DataStore, lookup_row, lookup_rows
+from helpers.lazy_imports import get_sentence_transformer, import_module
 
-# Carregar modelo de embeddings
-model = SentenceTransformer('all-MiniLM-L6-v2')
+# Arquivos de dados (a aplicação roda a partir da raiz do repositório)
+VAGAS_PATH = 'vagas.json'
+PROSPECTS_PATH = 'prospects.json'
+APPLICANTS_PATH = 'applicants.csv'
+
+# Diretório do cache colunar dos DataFrames preparados
+CACHE_DIR = '.cache'
+
+# Colunas de nível convertidas em códigos ordinais (int8) no carregamento
+APPLICANT_LEVEL_COLUMNS = {
+    'nivel_academic': education_level_to_int,
+    'nivel_ingles': language_level_to_int,
+    'nivel_espanhol': language_level_to_int
+}
+
+VAGA_LEVEL_COLUMNS = {
+    'nivel_academico': education_level_to_int,
+    'nivel_ingles': language_level_to_int,
+    'nivel_espanhol': language_level_to_int
+}
+
+# Colunas de candidatos usadas pela aplicação no modo enxuto (as demais, como
+# o currículo completo, não são carregadas)
+APPLICANT_COLUMNS = [
+    'codigo_profissional', 'nome', 'titulo_profissional', 'area_atuacao',
+    'conhecimentos_tecnicos', 'certificacoes', 'qualificacoes',
+    'nivel_academic', 'nivel_ingles', 'nivel_espanhol', 'local'
+]
+
+# Colunas concatenadas, nesta ordem, em 'profile_text'
+PROFILE_TEXT_COLUMNS = [
+    'nome', 'titulo_profissional', 'area_atuacao',
+    'conhecimentos_tecnicos', 'certificacoes', 'qualificacoes'
+]
+
+# Colunas de baixa cardinalidade guardadas como categóricas no modo enxuto
+APPLICANT_CATEGORY_COLUMNS = ['nivel_academic', 'nivel_ingles', 'nivel_espanhol', 'area_atuacao', 'local']
+
+# Textos longos que só alimentam 'profile_text' (podem ser descartados após a featurização)
+RAW_TEXT_COLUMNS = ['conhecimentos_tecnicos', 'certificacoes', 'qualificacoes']
 
 # --- Funções auxiliares ---
 def preprocess_text(text):
@@ -17,91 +61,256 @@ def preprocess_text(text):
     return str(text).lower().strip()
 
 def compute_embedding(text):
-    return model.encode([text])[0]
+    # O modelo (e o torch) só é carregado no primeiro uso
+    return get_sentence_transformer().encode([text])[0]
 
 def match_score(text1, text2):
     emb1 = compute_embedding(preprocess_text(text1))
     emb2 = compute_embedding(preprocess_text(text2))
+    cosine_similarity = import_module('sklearn.metrics.pairwise').cosine_similarity
     return cosine_similarity([emb1], [emb2])[0][0]
 
-def load_data() -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    vagas_path = 'vagas.json'
-    prospects_path = 'prospects.json'
-    applicants_path = 'applicants.csv'
-
-    with open(vagas_path, 'r', encoding='utf-8') as file:
-        vagas_json = json.load(file)
-
-    vagas_records = []
-    for vaga_id, vaga_data in vagas_json.items():
-        if 'informacoes_basicas' in vaga_data and 'perfil_vaga' in vaga_data:
-            vaga_record = {
-                'vaga_id': vaga_id,
-                'titulo_vaga': vaga_data['informacoes_basicas'].get('titulo_vaga', ''),
-                'cliente': vaga_data['informacoes_basicas'].get('cliente', ''),
-                'tipo_contratacao': vaga_data['informacoes_basicas'].get('tipo_contratacao', ''),
-                'nivel_profissional': vaga_data['perfil_vaga'].get('nivel profissional', ''),
-                'nivel_academico': vaga_data['perfil_vaga'].get('nivel_academico', ''),
-                'nivel_ingles': vaga_data['perfil_vaga'].get('nivel_ingles', ''),
-                'nivel_espanhol': vaga_data['perfil_vaga'].get('nivel_espanhol', ''),
-                'pais': vaga_data['perfil_vaga'].get('pais', ''),
-                'estado': vaga_data['perfil_vaga'].get('estado', ''),
-                'cidade': vaga_data['perfil_vaga'].get('cidade', ''),
-                'areas_atuacao': vaga_data['perfil_vaga'].get('areas_atuacao', ''),
-                'principais_atividades': vaga_data['perfil_vaga'].get('principais_atividades', ''),
-                'competencia_tecnicas': vaga_data['perfil_vaga'].get('competencia_tecnicas_e_comportamentais', ''),
-                'descricao_completa': f"{vaga_data['perfil_vaga'].get('principais_atividades', '')} {vaga_data['perfil_vaga'].get('competencia_tecnicas_e_comportamentais', '')}"
-            }
-            vagas_records.append(vaga_record)
-
-    vagas_df = pd.DataFrame(vagas_records)
-
-    with open(prospects_path, 'r', encoding='utf-8') as file:
-        prospects_json = json.load(file)
-
-    prospects_rows = []
-    for vaga_id, vaga_info in prospects_json.items():
-        titulo = vaga_info.get('titulo', '')
-        modalidade = vaga_info.get('modalidade', '')
-        prospects_list = vaga_info.get('prospects', [])
-
-        for prospect in prospects_list:
-            prospect_row = {
-                'vaga_id': vaga_id,
-                'titulo_vaga': titulo,
-                'modalidade': modalidade,
-                'nome': prospect.get('nome', ''),
-                'codigo': prospect.get('codigo', ''),
-                'situacao_candidado': prospect.get('situacao_candidado', ''),
-                'data_candidatura': prospect.get('data_candidatura', ''),
-                'ultima_atualizacao': prospect.get('ultima_atualizacao', ''),
-                'comentario': prospect.get('comentario', ''),
-                'recrutador': prospect.get('recrutador', '')
-            }
-            prospects_rows.append(prospect_row)
-
-    prospects_df = pd.DataFrame(prospects_rows)
-
-    applicants_df = pd.read_csv(applicants_path, encoding='utf-8', index_col=0, low_memory=False)
+def add_ordinal_levels(df: pd.DataFrame, level_columns: Dict[str, Any]) -> pd.DataFrame:
+    # Adiciona '<coluna>_ord' com o nível ordinal de cada coluna de nível existente
+    for column, to_int in level_columns.items():
+        if column in df.columns:
+            df[f'{column}_ord'] = levels_to_ordinal(df[column], to_int)
+    return df
+
+def source_paths() -> Dict[str, str]:
+    # Arquivos de origem de cada DataFrame
+    return {'vagas': VAGAS_PATH, 'prospects': PROSPECTS_PATH, 'applicants': APPLICANTS_PATH}
+
+def data_version(fingerprint: Dict[str, Any], options: Dict[str, Any]) -> str:
+    # Identifica o conteúdo e a ordem das linhas dos DataFrames: os arquivos de
+    # origem lidos na ordem do arquivo com estas opções de carregamento. Os
+    # stores de embeddings e de competências confiam nela para reconhecer um
+    # corpus sem reler os textos, então frames em outra ordem não podem reusá-la
+    # (frames atualizados por chave incluem a versão de origem nas opções, ver
+    # DataRefresher)
+    return hashlib.blake2b(json.dumps(dict(fingerprint, options=options), sort_keys=True).encode('utf-8'),
+                           digest_size=8).hexdigest()
+
+def load_data(use_cache: bool = True, lean: bool = False, drop_raw_text: bool = False,
+              paths: Optional[Dict[str, str]] = None) -> DataStore:
+    # Devolve os DataFrames com índices de hash nas chaves; o DataStore também
+    # pode ser desempacotado como (vagas_df, prospects_df, applicants_df).
+    # lean=True é opcional: só APPLICANT_COLUMNS e categóricas (ver read_applicants)
+    frames, version, stats = load_frames(use_cache, lean, drop_raw_text, paths)
+    return DataStore(*frames, version=version, load_stats=stats)
+
+@st.cache_resource(show_spinner=False)
+def get_data_refresher():
+    from helpers.data_refresher import DataRefresher
+
+    # Carrega o primeiro snapshot e passa a observar os arquivos de origem; a
+    # aplicação só usa APPLICANT_COLUMNS, então carrega no modo enxuto
+    refresher = DataRefresher(lean=True)
+    refresher.start()
+    return refresher
+
+def get_shared_data() -> DataStore:
+    # Snapshot único por processo, compartilhado (somente leitura) por todas as
+    # sessões. Quando os arquivos de origem mudam, o DataRefresher aplica só as
+    # inserções, alterações e remoções e troca o snapshot por uma nova versão
+    return get_data_refresher().store
+
+def object_nbytes(value: Any) -> int:
+    # Memória aproximada de um objeto guardado na sessão
+    if isinstance(value, DataStore):
+        # Referência ao snapshot compartilhado: os DataFrames não pertencem à sessão
+        return sys.getsizeof(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(object_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(object_nbytes(k) + object_nbytes(v) for k, v in value.items())
+    if isinstance(getattr(value, 'nbytes', None), int):
+        # Objetos que informam a própria memória (ex.: VagaRanking)
+        return value.nbytes
+    return sys.getsizeof(value)
+
+def session_memory_bytes(session_state) -> int:
+    # Bytes mantidos por uma sessão em st.session_state
+    return sum(object_nbytes(value) for value in session_state.to_dict().values())
+
+def load_frames(use_cache: bool = True, lean: bool = False, drop_raw_text: bool = False,
+                paths: Optional[Dict[str, str]] = None
+                ) -> Tuple[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame], str, Dict[str, Any]]:
+    # Devolve os DataFrames, a sua versão (ver data_version) e as estatísticas
+    # do carregamento (ver describe_load). Reutiliza os DataFrames preparados
+    # do cache enquanto os arquivos de origem não mudarem
+    start = time.perf_counter()
+    paths = paths or source_paths()
+    fingerprint = source_fingerprint([paths['vagas'], paths['prospects'], paths['applicants']])
+    options = {'lean': lean, 'drop_raw_text': drop_raw_text}
+    version = data_version(fingerprint, options)
+
+    cache = DataCache(CACHE_DIR)
+    # O modo de carregamento muda as colunas, então também identifica o cache
+    cache_fingerprint = dict(fingerprint, options=options)
+    cached = cache.load_versioned(cache_fingerprint) if use_cache else None
+    if cached is not None:
+        # Frames gravados pelo DataRefresher estão na ordem da atualização e
+        # trazem a própria versão
+        frames, cached_version = cached
+        stats = {'source': 'cache', 'seconds': time.perf_counter() - start, 'peak_rss_bytes': peak_rss_bytes()}
+        return (frames['vagas'], frames['prospects'], frames['applicants']), cached_version or version, stats
+
+    (vagas_df, prospects_df, applicants_df), file_stats = parse_data(lean, drop_raw_text, paths)
+    if use_cache:
+        cache.save(cache_fingerprint, {'vagas': vagas_df, 'prospects': prospects_df, 'applicants': applicants_df})
+    stats = {'source': 'files', 'seconds': time.perf_counter() - start, 'peak_rss_bytes': peak_rss_bytes(),
+             **file_stats}
+    return (vagas_df, prospects_df, applicants_df), version, stats
+
+def describe_load(stats: Dict[str, Any]) -> str:
+    # Resumo das estatísticas de carregamento de um DataStore (ver load_frames)
+    if not stats:
+        return ''
+    sources = {'cache': 'Carregado do cache colunar', 'files': 'Lido dos arquivos', 'refresh': 'Atualizado por chave'}
+    summary = f"{sources.get(stats.get('source'), 'Carregado')} em {stats['seconds']:.2f} s"
+    streamed = [f"{name}: {stats[name]['rows']} linhas em {stats[name]['chunks']} blocos"
+                for name in ('vagas', 'prospects') if name in stats]
+    if streamed:
+        summary += f" ({'; '.join(streamed)})"
+    return f"{summary}; pico de RSS do processo {stats['peak_rss_bytes'] / 1e6:.0f} MB"
+
+def vaga_rows(vaga_id: str, vaga_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Linha do DataFrame de vagas (vagas sem informações básicas ou perfil são ignoradas)
+    if 'informacoes_basicas' not in vaga_data or 'perfil_vaga' not in vaga_data:
+        return []
+
+    return [{
+        'vaga_id': vaga_id,
+        'titulo_vaga': vaga_data['informacoes_basicas'].get('titulo_vaga', ''),
+        'cliente': vaga_data['informacoes_basicas'].get('cliente', ''),
+        'tipo_contratacao': vaga_data['informacoes_basicas'].get('tipo_contratacao', ''),
+        'nivel_profissional': vaga_data['perfil_vaga'].get('nivel profissional', ''),
+        'nivel_academico': vaga_data['perfil_vaga'].get('nivel_academico', ''),
+        'nivel_ingles': vaga_data['perfil_vaga'].get('nivel_ingles', ''),
+        'nivel_espanhol': vaga_data['perfil_vaga'].get('nivel_espanhol', ''),
+        'pais': vaga_data['perfil_vaga'].get('pais', ''),
+        'estado': vaga_data['perfil_vaga'].get('estado', ''),
+        'cidade': vaga_data['perfil_vaga'].get('cidade', ''),
+        'areas_atuacao': vaga_data['perfil_vaga'].get('areas_atuacao', ''),
+        'principais_atividades': vaga_data['perfil_vaga'].get('principais_atividades', ''),
+        'competencia_tecnicas': vaga_data['perfil_vaga'].get('competencia_tecnicas_e_comportamentais', ''),
+        'descricao_completa': f"{vaga_data['perfil_vaga'].get('principais_atividades', '')} {vaga_data['perfil_vaga'].get('competencia_tecnicas_e_comportamentais', '')}"
+    }]
+
+def prospect_rows(vaga_id: str, vaga_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Uma linha por prospect da vaga
+    titulo = vaga_info.get('titulo', '')
+    modalidade = vaga_info.get('modalidade', '')
+    prospects_list = vaga_info.get('prospects', [])
+
+    return [{
+        'vaga_id': vaga_id,
+        'titulo_vaga': titulo,
+        'modalidade': modalidade,
+        'nome': prospect.get('nome', ''),
+        'codigo': prospect.get('codigo', ''),
+        'situacao_candidado': prospect.get('situacao_candidado', ''),
+        'data_candidatura': prospect.get('data_candidatura', ''),
+        'ultima_atualizacao': prospect.get('ultima_atualizacao', ''),
+        'comentario': prospect.get('comentario', ''),
+        'recrutador': prospect.get('recrutador', '')
+    } for prospect in prospects_list]
+
+def parse_data(lean: bool = False, drop_raw_text: bool = False, paths: Optional[Dict[str, str]] = None
+               ) -> Tuple[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame], Dict[str, Dict[str, Any]]]:
+    # Os JSONs são lidos em streaming, uma vaga por vez, e as linhas vão para
+    # buffers colunares em blocos de tamanho fixo (pico de memória limitado);
+    # devolve também as estatísticas da leitura de cada JSON (ver stream_to_frame)
+    paths = paths or source_paths()
+    vagas_df, vagas_stats = stream_vagas(paths['vagas'])
+    prospects_df, prospects_stats = stream_prospects(paths['prospects'])
+    applicants_df = read_applicants(paths['applicants'], lean, drop_raw_text)
+
+    return (vagas_df, prospects_df, applicants_df), {'vagas': vagas_stats, 'prospects': prospects_stats}
+
+def stream_vagas(path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    vagas_df, stats = stream_to_frame(iter_object_items(path), vaga_rows)
+    return add_ordinal_levels(vagas_df, VAGA_LEVEL_COLUMNS), stats
+
+def stream_prospects(path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    return stream_to_frame(iter_object_items(path), prospect_rows)
+
+def read_vagas(path: str) -> pd.DataFrame:
+    return stream_vagas(path)[0]
+
+def read_prospects(path: str) -> pd.DataFrame:
+    return stream_prospects(path)[0]
+
+def applicant_usecols(path: str) -> List[int]:
+    # Só as colunas usadas pela aplicação, mais a coluna de índice (posição 0)
+    header = pd.read_csv(path, encoding='utf-8', nrows=0).columns
+    return [0] + [i for i, column in enumerate(header) if i > 0 and column in APPLICANT_COLUMNS]
+
+def read_applicants(path: str, lean: bool = False, drop_raw_text: bool = False) -> pd.DataFrame:
+    # Modo enxuto (opcional): só APPLICANT_COLUMNS, colunas de baixa cardinalidade
+    # como categóricas e, com drop_raw_text, sem RAW_TEXT_COLUMNS
+    usecols = applicant_usecols(path) if lean else None
+    applicants_df = pd.read_csv(path, encoding='utf-8', index_col=0, usecols=usecols, low_memory=False)
+    return prepare_applicants(applicants_df, lean, drop_raw_text)
+
+def prepare_applicants(applicants_df: pd.DataFrame, lean: bool = False, drop_raw_text: bool = False) -> pd.DataFrame:
+    # Colunas derivadas ('profile_text', níveis ordinais); também usada bloco a
+    # bloco pela leitura em streaming (helpers.streaming_match)
     applicants_df = applicants_df.fillna('')
-    applicants_df['profile_text'] = applicants_df.apply(
-        lambda row: f"{row.get('nome', '')} {row.get('titulo_profissional', '')} {row.get('area_atuacao', '')} {row.get('conhecimentos_tecnicos', '')} {row.get('certificacoes', '')} {row.get('qualificacoes', '')}",
-        axis=1
-    )
+    applicants_df['profile_text'] = concat_text_columns(applicants_df, PROFILE_TEXT_COLUMNS)
+    applicants_df = add_ordinal_levels(applicants_df, APPLICANT_LEVEL_COLUMNS)
+
+    if lean:
+        for column in APPLICANT_CATEGORY_COLUMNS:
+            if column in applicants_df.columns:
+                applicants_df[column] = applicants_df[column].astype('category')
+        if drop_raw_text:
+            applicants_df = applicants_df.drop(columns=[c for c in RAW_TEXT_COLUMNS if c in applicants_df.columns])
 
-    return vagas_df, prospects_df, applicants_df
+    return applicants_df
 
+def concat_text_columns(df: pd.DataFrame, columns: List[str]) -> pd.Series:
+    # Concatenação vetorizada, separada por espaços (colunas ausentes contam como "")
+    text = None
+    for column in columns:
+        values = df[column].astype(str) if column in df.columns else pd.Series('', index=df.index)
+        text = values if text is None else text + ' ' + values
+    return text if text is not None else pd.Series('', index=df.index)
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    # Memória por coluna (em bytes, incluindo o conteúdo das strings) antes e depois
+    report = pd.DataFrame({
+        'antes': before.memory_usage(index=True, deep=True),
+        'depois': after.memory_usage(index=True, deep=True)
+    }).fillna(0).astype(np.int64)
+    report.loc['total'] = report.sum()
+    report['dtype_antes'] = before.dtypes.astype(str).reindex(report.index).fillna('')
+    report['dtype_depois'] = after.dtypes.astype(str).reindex(report.index).fillna('')
+    return report
+
+# Buscas O(1) pelos índices de hash (construídos no load_data ou no primeiro uso)
 def get_applicant_by_code(applicants_df: pd.DataFrame, codigo: str) -> pd.Series:
-    matches = applicants_df[applicants_df['codigo_profissional'] == codigo]
-    if not matches.empty:
-        return matches.iloc[0]
-    return None
+    return lookup_row(applicants_df, 'codigo_profissional', codigo)
 
 def get_vaga_by_id(vagas_df: pd.DataFrame, vaga_id: str) -> pd.Series:
-    matches = vagas_df[vagas_df['vaga_id'] == vaga_id]
-    if not matches.empty:
-        return matches.iloc[0]
-    return None
+    return lookup_row(vagas_df, 'vaga_id', vaga_id)
 
 def get_prospects_by_vaga(prospects_df: pd.DataFrame, vaga_id: str) -> pd.DataFrame:
-    return prospects_df[prospects_df['vaga_id'] == vaga_id]
+    return lookup_rows(prospects_df, 'vaga_id', vaga_id)
+
+if __name__ == '__main__':
+    full_df = read_applicants(APPLICANTS_PATH, lean=False)
+    lean_df = read_applicants(APPLICANTS_PATH, lean=True, drop_raw_text='--drop-raw-text' in sys.argv)
+    report = memory_report(full_df, lean_df)
+
+    with pd.option_context('display.max_rows', None, 'display.width', 120):
+        print(report.assign(antes=report['antes'] / 1e6, depois=report['depois'] / 1e6)
+                    .rename(columns={'antes': 'antes (MB)', 'depois': 'depois (MB)'})
+                    .round(2))
@@ -0,0 +1,352 @@
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, List, Optional
+from helpers.ann_index import update_ann_index
+from helpers.batch_scorer import cached_candidate_features, set_candidate_features, update_candidate_features
+from helpers.data_cache import DataCache, source_fingerprint
+from helpers.data_loader import (
+    CACHE_DIR,
+    data_version,
+    load_frames,
+    read_applicants,
+    source_paths,
+    stream_prospects,
+    stream_vagas,
+)
+from helpers.data_store import DataStore, KeyIndex, normalize_keys, set_key_index
+from helpers.embedding_store import EmbeddingStore
+from helpers.json_stream import peak_rss_bytes
+from helpers.lazy_imports import import_module
+from helpers.skill_matrix import DEFAULT_SKILL_MATRIX_PATH
+
+# Seconds without new file events before a refresh starts (writers touch files several times)
+DEFAULT_DEBOUNCE_SECONDS = 1.0
+
+# Seconds between checks when watchdog is not available
+DEFAULT_POLL_SECONDS = 5.0
+
+def diff_frames(old_df: pd.DataFrame, new_df: pd.DataFrame, key: str) -> Dict[str, List[str]]:
+    """
+    Keys inserted, updated and deleted between two versions of a frame.
+
+    Rows are compared through their content hashes; when a key has several
+    rows (e.g. the prospects of a vaga) they are compared as an ordered group.
+
+    Args:
+        old_df: Previous version
+        new_df: Current version
+        key: Key column
+
+    Returns:
+        Dictionary with the 'inserted', 'updated' and 'deleted' keys
+        (normalized strings)
+    """
+    return _diff_hashes(_key_hashes(old_df, key), _key_hashes(new_df, key))
+
+def _diff_hashes(old_hashes: Dict[str, int], new_hashes: Dict[str, int]) -> Dict[str, List[str]]:
+    return {
+        'inserted': [k for k in new_hashes if k not in old_hashes],
+        'updated': [k for k, h in new_hashes.items() if k in old_hashes and old_hashes[k] != h],
+        'deleted': [k for k in old_hashes if k not in new_hashes]
+    }
+
+def _key_hashes(df: pd.DataFrame, key: str, normalized: Optional[np.ndarray] = None) -> Dict[str, int]:
+    if key not in df.columns or df.empty:
+        return {}
+    columns = sorted(column for column in df.columns if column != key)
+    # Values as strings, so a column read as category or object hashes the same
+    row_hashes = pd.util.hash_pandas_object(df[columns].astype(str), index=False).to_numpy(dtype=np.uint64)
+    codes, keys = pd.factorize(normalized if normalized is not None else normalize_keys(df[key]))
+    # Ordered combination of the row hashes of each key (wraps around modulo 2**64)
+    rank = pd.Series(codes).groupby(codes).cumcount().to_numpy(dtype=np.uint64) + np.uint64(1)
+    group_hashes = np.zeros(len(keys), dtype=np.uint64)
+    np.add.at(group_hashes, codes, row_hashes * (rank * np.uint64(0x9E3779B97F4A7C15)))
+    return dict(zip(keys.tolist(), group_hashes.tolist()))
+
+def apply_frame_diff(old_df: pd.DataFrame, old_index: KeyIndex, new_df: pd.DataFrame,
+                     new_keys: np.ndarray, diff: Dict[str, List[str]]):
+    """
+    Apply the diff of a frame by key to its current version.
+
+    Rows of deleted keys are dropped, updated keys are replaced in place
+    (or dropped and appended when their number of rows changed) and rows of
+    inserted keys are appended, so unchanged rows keep their relative
+    order and only the changed keys are looked up.
+
+    Args:
+        old_df: Current version of the frame
+        old_index: KeyIndex of old_df on the key column
+        new_df: New version, as read from the source file
+        new_keys: Normalized keys of new_df (see normalize_keys)
+        diff: diff_frames(old_df, new_df, key)
+
+    Returns:
+        Tuple (frame, kept, changed, index): the updated frame, the positions
+        of old_df it keeps (its first rows, in order), its rows taken from
+        new_df and its KeyIndex (see KeyIndex.updated)
+    """
+    changed_keys = diff['inserted'] + diff['updated']
+    new_positions = np.flatnonzero(pd.Series(new_keys, dtype=object).isin(changed_keys).to_numpy())
+    # Rows of each changed key, in source order
+    new_groups: Dict[str, List[int]] = {}
+    for position in new_positions.tolist():
+        new_groups.setdefault(new_keys[position], []).append(position)
+
+    def old_rows(key: str) -> np.ndarray:
+        return np.arange(len(old_df))[old_index.rows(key)]
+
+    resized = [k for k in diff['updated'] if len(old_rows(k)) != len(new_groups[k])]
+    resized_set = set(resized)
+    in_place = [k for k in diff['updated'] if k not in resized_set]
+    appended_keys = set(diff['inserted']) | resized_set
+
+    dropped = np.zeros(len(old_df), dtype=bool)
+    for k in diff['deleted'] + resized:
+        dropped[old_rows(k)] = True
+    kept = np.flatnonzero(~dropped)
+    kept_position = np.cumsum(~dropped) - 1
+
+    targets = [kept_position[old_rows(k)] for k in in_place]
+    sources = [np.array(new_groups[k], dtype=np.int64) for k in in_place]
+    appended = np.array([position for position in new_positions.tolist() if new_keys[position] in appended_keys],
+                        dtype=np.int64)
+    targets = np.concatenate(targets).astype(np.int64) if targets else np.zeros(0, dtype=np.int64)
+    sources = np.concatenate(sources + [appended]).astype(np.int64)
+
+    # One gather from the current rows plus the new ones
+    combined = _concat_rows([old_df, new_df.iloc[sources]])
+    selector = kept.copy()
+    selector[targets] = len(old_df) + np.arange(len(targets))
+    selector = np.concatenate([selector, len(old_df) + len(targets) + np.arange(len(appended))])
+    frame = combined.take(selector)
+    if isinstance(old_df.index, pd.RangeIndex):
+        frame = frame.reset_index(drop=True)
+
+    changed = np.sort(np.concatenate([targets, len(kept) + np.arange(len(appended))]))
+    index = old_index.updated(kept, new_keys[appended])
+    return frame, kept, changed, index
+
+def _concat_rows(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    # Categorical columns (lean mode) get the union of the categories, so they stay categorical
+    dtypes = {}
+    for column in frames[0].columns:
+        if any(isinstance(df[column].dtype, pd.CategoricalDtype) for df in frames):
+            categories = pd.Index([], dtype=object)
+            for df in frames:
+                values = df[column]
+                categories = categories.union(values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype)
+                                              else pd.Index(values.unique()))
+            dtypes[column] = pd.CategoricalDtype(categories)
+    if dtypes:
+        frames = [df.astype(dtypes) for df in frames]
+    return pd.concat(frames)
+
+class DataRefresher:
+    """
+    Keeps a DataStore in sync with the source files.
+
+    The first snapshot is loaded on creation. After start(), file events
+    (watchdog, or polling when it is not installed) trigger a refresh that
+    re-reads only the changed files, diffs them by key against the current
+    snapshot and applies the diff to everything built on it: the frames and
+    their key indexes drop, replace or append the changed keys, and the
+    candidate features, the persisted embeddings and skill matrix and the
+    ANN index are extended the same way, so a new applicant costs one
+    encoding and one skill extraction. The new DataStore is then swapped in
+    with a single assignment, so readers see either the old or the new
+    version, never a mix.
+    """
+
+    def __init__(self, paths: Optional[Dict[str, str]] = None,
+                 debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS,
+                 poll_seconds: float = DEFAULT_POLL_SECONDS,
+                 lean: bool = False, drop_raw_text: bool = False):
+        self.paths = paths or source_paths()
+        # Load options of the applicants (see read_applicants)
+        self.options = {'lean': lean, 'drop_raw_text': drop_raw_text}
+        self.debounce_seconds = debounce_seconds
+        self.poll_seconds = poll_seconds
+        self.last_refresh: Dict[str, Any] = {}
+        self.listeners: List[Callable[[DataStore], None]] = []
+
+        self._refresh_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._timer_lock = threading.Lock()
+        self._observer = None
+        self._poller: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+        # Key hashes of the current snapshot, so a refresh only hashes the new files
+        self._hashes: Dict[str, Dict[str, int]] = {}
+
+        self._fingerprint = self._current_fingerprint()
+        frames, version, stats = load_frames(lean=lean, drop_raw_text=drop_raw_text, paths=self.paths)
+        self.store = DataStore(*frames, version=version, load_stats=stats)
+
+    def _current_fingerprint(self) -> Dict[str, Dict]:
+        return source_fingerprint(list(self.paths.values()))
+
+    def refresh(self) -> Optional[Dict[str, Any]]:
+        """
+        Apply the changes of the source files and swap in the new snapshot.
+
+        Returns:
+            Statistics of the refresh (new version, changed files, inserted/
+            updated/deleted counts per file, seconds), or None when nothing changed
+        """
+        with self._refresh_lock:
+            start = time.perf_counter()
+            try:
+                fingerprint = self._current_fingerprint()
+            except OSError:
+                # A file is being replaced; the next event retries
+                return None
+            if fingerprint == self._fingerprint:
+                return None
+
+            changed = [name for name, path in self.paths.items()
+                       if fingerprint.get(os.path.abspath(path)) != self._fingerprint.get(os.path.abspath(path))]
+            old = self.store
+            old_frames = {'vagas': old.vagas_df, 'prospects': old.prospects_df, 'applicants': old.applicants_df}
+            frames = dict(old_frames)
+            # The JSONs are streamed (see json_stream); their parse statistics go to the new store
+            readers = {'vagas': stream_vagas, 'prospects': stream_prospects,
+                       'applicants': lambda path: (read_applicants(path, **self.options), None)}
+            file_stats = {}
+            try:
+                for name in changed:
+                    frames[name], stats = readers[name](self.paths[name])
+                    if stats is not None:
+                        file_stats[name] = stats
+            except (OSError, ValueError) as error:
+                # Half-written file: keep serving the current snapshot
+                self.last_refresh = {'error': str(error), 'changed': changed}
+                return None
+
+            keys = {'vagas': 'vaga_id', 'prospects': 'vaga_id', 'applicants': 'codigo_profissional'}
+            indexes = {'vagas': old.vaga_index, 'prospects': old.prospect_index, 'applicants': old.applicant_index}
+            diffs, updates = {}, {}
+            for name in changed:
+                old_df, new_df, key = old_frames[name], frames[name], keys[name]
+                if key not in new_df.columns or list(new_df.columns) != list(old_df.columns):
+                    # Different layout: the new file replaces the frame as read
+                    diffs[name] = diff_frames(old_df, new_df, key)
+                    self._hashes.pop(name, None)
+                    continue
+                new_keys = normalize_keys(new_df[key])
+                new_hashes = _key_hashes(new_df, key, new_keys)
+                old_hashes = self._hashes.get(name)
+                if old_hashes is None:
+                    old_hashes = _key_hashes(old_df, key)
+                diffs[name] = _diff_hashes(old_hashes, new_hashes)
+                frame, kept, rows, index = apply_frame_diff(old_df, indexes[name], new_df, new_keys, diffs[name])
+                set_key_index(frame, key, index)
+                frames[name] = frame
+                updates[name] = (kept, rows)
+                self._hashes[name] = new_hashes
+
+            # The updated frames keep the order of the previous snapshot, not the
+            # file order: their version derives from the previous one, so it
+            # never equals the version of a fresh parse of the same files
+            version = data_version(fingerprint, dict(self.options, base=old.version))
+            load_stats = {'source': 'refresh', 'seconds': time.perf_counter() - start,
+                          'peak_rss_bytes': peak_rss_bytes(), **file_stats}
+            store = DataStore(frames['vagas'], frames['prospects'], frames['applicants'], version=version,
+                              load_stats=load_stats)
+
+            # Features of unchanged applicants carry over; if they were never
+            # built, get_candidate_features builds them on first use as usual
+            old_features = cached_candidate_features(old.applicants_df)
+            if 'applicants' in updates and old_features is not None:
+                kept, rows = updates['applicants']
+                features = update_candidate_features(old_features, old.applicants_df, store.applicants_df, kept, rows,
+                                                     EmbeddingStore(), DEFAULT_SKILL_MATRIX_PATH)
+                update_ann_index(old_features, features, kept, rows)
+                set_candidate_features(store.applicants_df, features)
+
+            self.store = store
+            self._fingerprint = fingerprint
+
+            # Lets the next process start from the prepared frames (and their version)
+            cache_fingerprint = dict(fingerprint, options=self.options)
+            DataCache(CACHE_DIR).save(cache_fingerprint, frames, data_version=version)
+
+            self.last_refresh = {
+                'version': store.version,
+                'changed': changed,
+                'diffs': {name: {kind: len(values) for kind, values in diff.items()} for name, diff in diffs.items()},
+                'seconds': time.perf_counter() - start
+            }
+            for listener in list(self.listeners):
+                listener(store)
+            return self.last_refresh
+
+    def schedule_refresh(self) -> None:
+        """Refresh once no file event arrived for debounce_seconds."""
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.debounce_seconds, self.refresh)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def start(self) -> None:
+        """Watch the source files in the background (watchdog, or polling without it)."""
+        if self._observer is not None or self._poller is not None:
+            return
+        try:
+            self._observer = self._start_observer()
+        except ImportError:
+            self._poller = threading.Thread(target=self._poll, name='data-refresher', daemon=True)
+            self._poller.start()
+
+    def _start_observer(self):
+        observers = import_module('watchdog.observers')
+        events = import_module('watchdog.events')
+        watched = {os.path.abspath(path) for path in self.paths.values()}
+        refresher = self
+
+        class SourceFileHandler(events.FileSystemEventHandler):
+            def on_any_event(self, event):
+                # Atomic replaces arrive as moves onto the watched path
+                touched = {os.path.abspath(getattr(event, 'src_path', '')),
+                           os.path.abspath(getattr(event, 'dest_path', '') or '')}
+                if touched & watched:
+                    refresher.schedule_refresh()
+
+        observer = observers.Observer()
+        handler = SourceFileHandler()
+        for directory in {os.path.dirname(path) for path in watched}:
+            observer.schedule(handler, directory, recursive=False)
+        observer.daemon = True
+        observer.start()
+        return observer
+
+    def _poll(self) -> None:
+        while not self._stopped.wait(self.poll_seconds):
+            self.refresh()
+
+    def stop(self) -> None:
+        """Stop watching (the current snapshot stays available)."""
+        self._stopped.set()
+        with self._timer_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+if __name__ == '__main__':
+    refresher = DataRefresher()
+    refresher.start()
+    print(f"Observando {', '.join(refresher.paths.values())} (versão {refresher.store.version}); Ctrl+C para sair")
+    refresher.listeners.append(lambda store: print(f"Nova versão {store.version}: {refresher.last_refresh}"))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        refresher.stop()
@@ -0,0 +1,326 @@
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+def normalize_key(value: Any) -> str:
+    """
+    Canonical string form of a join key, so '123', 123 and 123.0 all match.
+
+    Args:
+        value: Raw key (string, integer, float or missing)
+
+    Returns:
+        Normalized key ("" for missing values)
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ''
+    if isinstance(value, (bool, np.bool_)):
+        return str(value)
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+def normalize_keys(values: pd.Series) -> np.ndarray:
+    """
+    Vectorized normalize_key (each distinct value is normalized once).
+
+    Args:
+        values: Key column
+
+    Returns:
+        Object array of normalized keys
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    normalized = np.array([normalize_key(value) for value in uniques], dtype=object)
+    return normalized[codes] if len(codes) else np.zeros(0, dtype=object)
+
+class KeyIndex:
+    """
+    Hash index from a key column to the row positions holding each key.
+
+    Rows sharing a key are stored as one range of a position array, so all
+    rows of a key come back in their original order with a single slice.
+    """
+
+    def __init__(self, keys: pd.Series):
+        codes, uniques = pd.factorize(normalize_keys(keys))
+        self._group = {key: i for i, key in enumerate(uniques.tolist())}
+        self._order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes, minlength=len(uniques))
+        self._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._first = self._order[self._offsets[:-1]]
+        self._keys = pd.Index(uniques)
+        # Rows already grouped by key (e.g. prospects, written vaga by vaga)
+        self._contiguous = bool(np.array_equal(self._order, np.arange(len(codes))))
+
+    def __len__(self) -> int:
+        return len(self._group)
+
+    def __contains__(self, key: Any) -> bool:
+        return normalize_key(key) in self._group
+
+    def first(self, key: Any) -> Optional[int]:
+        """
+        Position of the first row with the given key.
+
+        Args:
+            key: Key to look up (any type normalize_key accepts)
+
+        Returns:
+            Row position, or None if the key is absent
+        """
+        group = self._group.get(normalize_key(key))
+        return None if group is None else int(self._first[group])
+
+    def rows(self, key: Any):
+        """
+        Positions of every row with the given key, in frame order.
+
+        Args:
+            key: Key to look up
+
+        Returns:
+            A slice when the rows are contiguous, otherwise an array of positions
+        """
+        group = self._group.get(normalize_key(key))
+        if group is None:
+            return slice(0, 0)
+        start, end = int(self._offsets[group]), int(self._offsets[group + 1])
+        if self._contiguous:
+            return slice(start, end)
+        return self._order[start:end]
+
+    def first_positions(self, keys: pd.Series) -> np.ndarray:
+        """
+        Vectorized first(): position of the first row for each key.
+
+        Args:
+            keys: Keys to look up
+
+        Returns:
+            Array of row positions, -1 where the key is absent
+        """
+        groups = self._keys.get_indexer(normalize_keys(keys))
+        positions = np.full(len(groups), -1, dtype=np.int64)
+        found = groups >= 0
+        positions[found] = self._first[groups[found]]
+        return positions
+
+    def updated(self, kept: np.ndarray, appended_keys: np.ndarray) -> 'KeyIndex':
+        """
+        Index of a frame derived from the indexed one by dropping and appending rows.
+
+        The new frame holds the kept rows (in their order), whose keys are
+        unchanged, followed by the appended rows. Only the appended keys are
+        looked up; the rest is integer work on the position arrays. Groups left without rows stay in the arrays, empty, and are
+        removed from the lookup dictionary. The index itself is not modified.
+
+        Args:
+            kept: Positions of the indexed frame kept in the new frame, in order
+            appended_keys: Normalized keys of the appended rows (see normalize_keys)
+
+        Returns:
+            KeyIndex over the new frame
+        """
+        n_groups = len(self._keys)
+        old_counts = np.diff(self._offsets)
+        row_groups = np.empty(len(self._order), dtype=np.int64)
+        row_groups[self._order] = np.repeat(np.arange(n_groups), old_counts)
+
+        # Keys seen before (including groups emptied by this or an earlier update) keep their group
+        appended_groups = self._keys.get_indexer(appended_keys) if len(appended_keys) else np.zeros(0, dtype=np.int64)
+        new_codes, new_keys = pd.factorize(pd.Series(appended_keys[appended_groups < 0], dtype=object))
+        appended_groups = appended_groups.astype(np.int64)
+        appended_groups[appended_groups < 0] = n_groups + new_codes
+
+        index = KeyIndex.__new__(KeyIndex)
+        codes = np.concatenate([row_groups[kept], appended_groups])
+        index._keys = self._keys.append(pd.Index(new_keys, dtype=object)) if len(new_keys) else self._keys
+        index._order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes, minlength=len(index._keys))
+        index._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        index._first = np.full(len(index._keys), -1, dtype=np.int64)
+        filled = counts > 0
+        index._first[filled] = index._order[index._offsets[:-1][filled]]
+        index._contiguous = bool(np.array_equal(index._order, np.arange(len(codes))))
+
+        index._group = dict(self._group)
+        emptied = np.flatnonzero(counts[:n_groups] == 0)
+        for key in self._keys[emptied[old_counts[emptied] > 0]].tolist():
+            index._group.pop(key, None)
+        for group in np.unique(appended_groups).tolist():
+            index._group[index._keys[group]] = group
+        return index
+
+_indexes: Dict[Tuple[int, str], Tuple[weakref.ref, KeyIndex]] = {}
+_indexes_lock = threading.Lock()
+
+def key_index(df: pd.DataFrame, column: str) -> KeyIndex:
+    """
+    Hash index of a DataFrame column, built on first use and kept while the frame lives.
+
+    The index maps keys to row positions, so the frame is expected not to
+    have rows added, removed or reordered in place after indexing.
+
+    Args:
+        df: Indexed DataFrame
+        column: Key column
+
+    Returns:
+        KeyIndex over df[column]
+    """
+    key = (id(df), column)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0]() is df:
+            return cached[1]
+
+        index = KeyIndex(df[column])
+        ref = weakref.ref(df, lambda _, key=key: _indexes.pop(key, None))
+        _indexes[key] = (ref, index)
+        return index
+
+def set_key_index(df: pd.DataFrame, column: str, index: KeyIndex) -> None:
+    """
+    Make key_index return the given index for a DataFrame column.
+
+    Used when the index was derived from the one of another version of the
+    frame (see KeyIndex.updated).
+
+    Args:
+        df: Indexed DataFrame
+        column: Key column
+        index: KeyIndex over df[column]
+    """
+    key = (id(df), column)
+    with _indexes_lock:
+        ref = weakref.ref(df, lambda _, key=key: _indexes.pop(key, None))
+        _indexes[key] = (ref, index)
+
+def lookup_row(df: pd.DataFrame, column: str, key: Any) -> Optional[pd.Series]:
+    """
+    First row whose key column matches, like df[df[column] == key].iloc[0].
+
+    Args:
+        df: DataFrame to search
+        column: Key column
+        key: Key to look up
+
+    Returns:
+        The row, or None if no row matches
+    """
+    position = key_index(df, column).first(key)
+    return None if position is None else df.iloc[position]
+
+def lookup_rows(df: pd.DataFrame, column: str, key: Any) -> pd.DataFrame:
+    """
+    All rows whose key column matches, like df[df[column] == key].
+
+    Args:
+        df: DataFrame to search
+        column: Key column
+        key: Key to look up
+
+    Returns:
+        Matching rows in frame order (possibly empty)
+    """
+    return df.iloc[key_index(df, column).rows(key)]
+
+_frame_versions: Dict[int, Tuple[weakref.ref, str]] = {}
+
+def set_frame_version(df: pd.DataFrame, version: str) -> None:
+    """
+    Record which data version a DataFrame holds (kept while the frame lives).
+
+    Args:
+        df: Frame of a loaded snapshot
+        version: Identifier of the snapshot
+    """
+    key = id(df)
+    with _indexes_lock:
+        ref = weakref.ref(df, lambda _, key=key: _frame_versions.pop(key, None))
+        _frame_versions[key] = (ref, version)
+
+def frame_version(df: pd.DataFrame) -> Optional[str]:
+    """
+    Data version recorded for a DataFrame by its DataStore.
+
+    Args:
+        df: Any DataFrame
+
+    Returns:
+        The version, or None for frames that do not come from a versioned snapshot
+    """
+    with _indexes_lock:
+        cached = _frame_versions.get(id(df))
+        if cached is not None and cached[0]() is df:
+            return cached[1]
+        return None
+
+class DataStore:
+    """
+    The three application DataFrames plus hash indexes on their join keys.
+
+    Indexes: vaga_id -> vaga row, codigo_profissional -> applicant row and
+    vaga_id -> range of prospect rows. Iterating yields the frames, so
+    `vagas_df, prospects_df, applicants_df = load_data()` keeps working.
+    """
+
+    def __init__(self, vagas_df: pd.DataFrame, prospects_df: pd.DataFrame, applicants_df: pd.DataFrame,
+                 version: Optional[str] = None, load_stats: Optional[Dict[str, Any]] = None):
+        self.vagas_df = vagas_df
+        self.prospects_df = prospects_df
+        self.applicants_df = applicants_df
+        # How the frames were obtained: source, seconds, peak RSS (see data_loader.load_frames)
+        self.load_stats = load_stats or {}
+        self._version: Optional[str] = None
+        self._nbytes: Optional[int] = None
+        # Identifies the snapshot of the source files the frames were loaded from
+        self.version = version
+
+        # Registered per frame, so the lookup helpers find them too
+        empty = pd.Series([], dtype=object)
+        self.vaga_index = key_index(vagas_df, 'vaga_id') if 'vaga_id' in vagas_df else KeyIndex(empty)
+        self.applicant_index = (key_index(applicants_df, 'codigo_profissional')
+                                if 'codigo_profissional' in applicants_df else KeyIndex(empty))
+        self.prospect_index = key_index(prospects_df, 'vaga_id') if 'vaga_id' in prospects_df else KeyIndex(empty)
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        return iter((self.vagas_df, self.prospects_df, self.applicants_df))
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._version
+
+    @version.setter
+    def version(self, version: Optional[str]) -> None:
+        # Also recorded on the frames, so code receiving only a frame can key caches by it
+        self._version = version
+        if version is not None:
+            for df in self:
+                set_frame_version(df, version)
+
+    @property
+    def nbytes(self) -> int:
+        """Deep memory usage of the three frames (computed once; the store is read-only)."""
+        if self._nbytes is None:
+            self._nbytes = int(sum(df.memory_usage(index=True, deep=True).sum() for df in self))
+        return self._nbytes
+
+    def vaga(self, vaga_id: Any) -> Optional[pd.Series]:
+        """Row of a vaga, or None if the id is unknown."""
+        position = self.vaga_index.first(vaga_id)
+        return None if position is None else self.vagas_df.iloc[position]
+
+    def applicant(self, codigo: Any) -> Optional[pd.Series]:
+        """Row of an applicant, or None if the code is unknown."""
+        position = self.applicant_index.first(codigo)
+        return None if position is None else self.applicants_df.iloc[position]
+
+    def prospects(self, vaga_id: Any) -> pd.DataFrame:
+        """Prospect rows of a vaga (empty if it has none)."""
+        return self.prospects_df.iloc[self.prospect_index.rows(vaga_id)]
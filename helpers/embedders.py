@@ -0,0 +1,253 @@
+import hashlib
+import os
+import time
+import numpy as np
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from helpers.lazy_imports import get_sentence_transformer, import_module
+
+# Backend used when EMBEDDING_BACKEND is not set
+DEFAULT_BACKEND = 'bytes'
+
+# Texts encoded per call to the underlying model
+DEFAULT_BATCH_SIZE = 256
+
+# Files of a sentence-transformers directory that describe the model (hashed into its name)
+_MODEL_CONFIG_FILES = ['config.json', 'modules.json', 'sentence_bert_config.json', 'config_sentence_transformers.json']
+
+class Embedder:
+    """
+    Interface of the text embedding backends.
+
+    Subclasses implement _encode_batch(); encode() splits the input into
+    batches and keeps throughput counters, so every backend reports how
+    many vectors per second it produces.
+    """
+
+    # Identifies the vectors a backend produces (stored with persisted embeddings)
+    name = 'embedder'
+
+    def __init__(self):
+        self.stats = {'vectors': 0, 'seconds': 0.0}
+
+    @property
+    def dim(self) -> int:
+        raise NotImplementedError
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def encode(self, texts: List[str], batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+        """
+        Encode texts into a matrix with one vector per text.
+
+        Args:
+            texts: Texts to encode (already pre-processed)
+            batch_size: Texts handed to the backend at a time
+
+        Returns:
+            Matrix of shape (len(texts), dim)
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, self.dim))
+
+        start = time.perf_counter()
+        batches = [self._encode_batch(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)]
+        matrix = batches[0] if len(batches) == 1 else np.vstack(batches)
+        self.stats['vectors'] += len(texts)
+        self.stats['seconds'] += time.perf_counter() - start
+        return matrix
+
+    @property
+    def vectors_per_second(self) -> float:
+        """Throughput of every encode() call so far (0 before the first call)."""
+        if self.stats['seconds'] <= 0:
+            return 0.0
+        return self.stats['vectors'] / self.stats['seconds']
+
+class ByteEmbedder(Embedder):
+    """
+    Character-code embedding: the first `dim` UTF-8 bytes of the text, scaled
+    to [0, 1] and L2-normalized.
+
+    Same vectors as the original per-byte loop of SimpleEmbedder, built for a
+    whole batch at once from a single uint8 buffer.
+    """
+
+    # Kept from the original embedder, so vectors stored before stay valid
+    name = 'simple'
+
+    def __init__(self, dim: int = 384):
+        super().__init__()
+        self._dim = dim
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        # Zero padding contributes nothing, like the bytes the loop never reached
+        buffer = b''.join(text.encode('utf-8')[:self._dim].ljust(self._dim, b'\0') for text in texts)
+        matrix = np.frombuffer(buffer, dtype=np.uint8).reshape(len(texts), self._dim) / 255.0
+        # One BLAS dot per row rounds like np.linalg.norm of a single vector
+        # (norm(axis=1) sums in another order and can differ in the last bit)
+        norms = np.sqrt(np.array([row @ row for row in matrix]))[:, None]
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+class HashingEmbedder(Embedder):
+    """
+    Hashing-trick embedding of character n-grams (within word boundaries).
+
+    N-grams are hashed straight into `dim` signed buckets, so there is no
+    vocabulary to fit or store and texts can be encoded independently.
+    """
+
+    def __init__(self, dim: int = 384, ngram_range: Tuple[int, int] = (3, 5)):
+        super().__init__()
+        self._dim = dim
+        self.ngram_range = tuple(ngram_range)
+        self.name = f'hashing-{dim}-{self.ngram_range[0]}-{self.ngram_range[1]}'
+        self._vectorizer = None
+
+    @property
+    def dim(self) -> int:
+        return self._dim
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        if self._vectorizer is None:
+            feature_extraction = import_module('sklearn.feature_extraction.text')
+            self._vectorizer = feature_extraction.HashingVectorizer(
+                analyzer='char_wb', ngram_range=self.ngram_range, n_features=self._dim,
+                alternate_sign=True, norm='l2', lowercase=False
+            )
+        return self._vectorizer.transform(texts).toarray()
+
+class SentenceTransformerEmbedder(Embedder):
+    """
+    sentence-transformers model loaded from a local directory.
+
+    Only files in that directory are read, so it works offline. The model is
+    loaded on first use (importing torch), not when the backend is created.
+    """
+
+    def __init__(self, model_path: str, device: Optional[str] = None):
+        super().__init__()
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Sentence-transformers model directory not found: {model_path}")
+        self.model_path = os.path.realpath(model_path)
+        self.device = device
+        self.name = f'sentence-transformers:{os.path.basename(self.model_path.rstrip(os.sep))}-{self._model_digest()}'
+
+    def _model_digest(self) -> str:
+        # Resolved path plus model configuration: two models in directories
+        # with the same name never share stored embeddings or ANN indexes
+        digest = hashlib.blake2b(self.model_path.encode('utf-8'), digest_size=8)
+        for file_name in _MODEL_CONFIG_FILES:
+            try:
+                with open(os.path.join(self.model_path, file_name), 'rb') as file:
+                    digest.update(file_name.encode('utf-8') + b'\0' + file.read())
+            except OSError:
+                continue
+        return digest.hexdigest()
+
+    @property
+    def model(self) -> Any:
+        return get_sentence_transformer(self.model_path, local_files_only=True, device=self.device)
+
+    @property
+    def dim(self) -> int:
+        return int(self.model.get_sentence_embedding_dimension())
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=len(texts), convert_to_numpy=True,
+                                    normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=float)
+
+# Backend name -> factory taking the backend options as keyword arguments
+EMBEDDERS: Dict[str, Callable[..., Embedder]] = {
+    'bytes': ByteEmbedder,
+    'hashing': HashingEmbedder,
+    'sentence-transformers': SentenceTransformerEmbedder
+}
+
+def register_embedder(backend: str, factory: Callable[..., Embedder]) -> None:
+    """
+    Make a backend available to create_embedder and the EMBEDDING_BACKEND setting.
+
+    Args:
+        backend: Name used to select the backend
+        factory: Callable returning an Embedder (receives the backend options)
+    """
+    EMBEDDERS[backend] = factory
+
+def create_embedder(backend: str, **options: Any) -> Embedder:
+    """
+    Instantiate a registered backend.
+
+    Args:
+        backend: Registered backend name
+        **options: Backend arguments (e.g. dim, model_path)
+
+    Returns:
+        New Embedder
+    """
+    factory = EMBEDDERS.get(backend)
+    if factory is None:
+        raise ValueError(f"Unknown embedding backend '{backend}' (available: {', '.join(sorted(EMBEDDERS))})")
+    return factory(**options)
+
+def configured_backend() -> Tuple[str, Dict[str, Any]]:
+    """
+    Backend selected in the environment.
+
+    EMBEDDING_BACKEND names the backend (default 'bytes'); EMBEDDING_MODEL_PATH
+    is the model directory of 'sentence-transformers' and EMBEDDING_DIM the
+    vector size of 'bytes' and 'hashing'.
+
+    Returns:
+        Tuple (backend name, options for create_embedder)
+    """
+    backend = os.environ.get('EMBEDDING_BACKEND', DEFAULT_BACKEND).strip() or DEFAULT_BACKEND
+    options: Dict[str, Any] = {}
+    if backend == 'sentence-transformers':
+        options['model_path'] = os.environ.get('EMBEDDING_MODEL_PATH', '')
+    elif os.environ.get('EMBEDDING_DIM'):
+        options['dim'] = int(os.environ['EMBEDDING_DIM'])
+    return backend, options
+
+@lru_cache(maxsize=None)
+def _cached_embedder(backend: str, options: Tuple[Tuple[str, Any], ...]) -> Embedder:
+    return create_embedder(backend, **dict(options))
+
+def get_embedder() -> Embedder:
+    """
+    The configured embedder, created once per process and configuration.
+
+    Returns:
+        Embedder selected by configured_backend()
+    """
+    backend, options = configured_backend()
+    return _cached_embedder(backend, tuple(sorted(options.items())))
+
+if __name__ == '__main__':
+    import sys
+    from helpers.data_loader import load_data
+    from helpers.text_processor import preprocess_text
+
+    _, _, applicants_df = load_data()
+    texts = [preprocess_text(text) for text in applicants_df['profile_text'].tolist()]
+    configured, configured_options = configured_backend()
+    backends = sys.argv[1:] or list(dict.fromkeys(['bytes', 'hashing', configured]))
+
+    for backend in backends:
+        try:
+            embedder = create_embedder(backend, **(configured_options if backend == configured else {}))
+            embedder.encode(texts[:10])
+            embedder.stats = {'vectors': 0, 'seconds': 0.0}
+            embedder.encode(texts)
+        except (ImportError, OSError, TypeError, ValueError) as error:
+            print(f"{backend}: indisponível ({error})")
+            continue
+        print(f"{backend} ({embedder.name}, {embedder.dim} dims): "
+              f"{embedder.vectors_per_second:,.0f} vetores/s em {len(texts)} textos")
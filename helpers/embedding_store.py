@@ -0,0 +1,337 @@
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Dict, List, Optional
+from helpers.embedders import get_embedder
+from helpers.text_processor import encode_texts, preprocess_text
+
+# The app runs from the repository root, next to applicants.csv
+DEFAULT_STORE_DIR = '.'
+
+def text_key(processed_text: str) -> bytes:
+    """
+    Content hash used to key a vector by its (pre-processed) text.
+
+    Args:
+        processed_text: Text already passed through preprocess_text
+
+    Returns:
+        Hex digest as bytes (fixed width, suitable for an 'S32' array)
+    """
+    return hashlib.blake2b(processed_text.encode('utf-8'), digest_size=16).hexdigest().encode('ascii')
+
+def texts_digest(texts: List[str]) -> str:
+    """
+    Content hash of a whole list of raw texts, in order.
+
+    One pass of blake2b over the joined texts (plus their lengths, so the
+    split between texts is part of the hash): much cheaper than
+    pre-processing and hashing every text, which only the rows of a
+    changed corpus need.
+
+    Args:
+        texts: Texts (non-strings count as empty)
+
+    Returns:
+        Hex digest
+    """
+    texts = [text if isinstance(text, str) else '' for text in texts]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array([len(text) for text in texts], dtype=np.int64).tobytes())
+    digest.update('\0'.join(texts).encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+class EmbeddingStore:
+    """
+    On-disk store of L2-normalized text embeddings keyed by content hash.
+
+    Each saved version is a pair of immutable files (vectors and keys); a small
+    JSON manifest points at the current version and is replaced atomically,
+    so several processes can read and refresh the store concurrently. The
+    vector matrix is opened memory-mapped, which lets every process share a
+    single copy through the page cache.
+
+    The manifest also records a digest of the raw texts (and, when given,
+    the version of the data they came from), so an unchanged corpus is
+    recognized without hashing every text. Saving a version keeps the
+    previous one, which other processes may still have memory-mapped.
+    """
+
+    def __init__(self, directory: str = DEFAULT_STORE_DIR, name: str = 'applicants',
+                 model_name: Optional[str] = None):
+        self.directory = directory
+        self.name = name
+        # Vectors of another embedding backend are never reused
+        self.model_name = model_name or get_embedder().name
+        self.manifest_path = os.path.join(directory, f'{name}_embeddings.json')
+        self.last_stats: Dict[str, int] = {}
+        self.version: Optional[str] = None
+
+    def _version_paths(self, version: str):
+        base = os.path.join(self.directory, f'{self.name}_embeddings.{version}')
+        return f'{base}.npy', f'{base}.keys.npy'
+
+    def _manifest(self) -> Optional[Dict]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return manifest if manifest.get('model') == self.model_name else None
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        tmp_path = f'{self.manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(manifest, file)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _update_manifest(self, **fields) -> None:
+        manifest = self._manifest()
+        if manifest is None:
+            return
+        try:
+            self._write_manifest(dict(manifest, **fields))
+        except OSError:
+            pass
+
+    def load(self):
+        """
+        Open the current version of the store.
+
+        Returns:
+            Tuple (keys, matrix) with the matrix memory-mapped read-only,
+            or (None, None) if there is no usable version on disk
+        """
+        manifest = self._manifest()
+        if manifest is None:
+            return None, None
+        try:
+            matrix_path, keys_path = self._version_paths(manifest['version'])
+            keys = np.load(keys_path)
+            matrix = np.load(matrix_path, mmap_mode='r')
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+        if len(keys) != matrix.shape[0]:
+            return None, None
+        self.version = manifest['version']
+        return keys, matrix
+
+    def save(self, keys: np.ndarray, matrix: np.ndarray, texts: Optional[str] = None,
+             source: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Write a new version of the store and make it current.
+
+        Args:
+            keys: Content hashes, one per row
+            matrix: Normalized embedding matrix
+            texts: texts_digest of the raw texts the rows were encoded from
+            source: Version of the data the texts came from
+
+        Returns:
+            The saved matrix memory-mapped, or None if the directory is not writable
+        """
+        # Versions also differ per backend, so indexes built on them are not reused across backends
+        digest = hashlib.blake2b(self.model_name.encode('utf-8') + b'\0', digest_size=8)
+        digest.update(keys.tobytes())
+        version = digest.hexdigest()
+        matrix_path, keys_path = self._version_paths(version)
+        tmp_suffix = f'.{os.getpid()}.tmp'
+        previous = self._manifest()
+        previous_version = previous.get('version') if previous is not None else None
+
+        try:
+            if not os.path.exists(matrix_path):
+                with open(matrix_path + tmp_suffix, 'wb') as file:
+                    np.save(file, np.ascontiguousarray(matrix))
+                os.replace(matrix_path + tmp_suffix, matrix_path)
+            if not os.path.exists(keys_path):
+                with open(keys_path + tmp_suffix, 'wb') as file:
+                    np.save(file, keys)
+                os.replace(keys_path + tmp_suffix, keys_path)
+
+            self._write_manifest({
+                'version': version,
+                'model': self.model_name,
+                'count': int(matrix.shape[0]),
+                'dim': int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+                'texts': texts,
+                'source': source
+            })
+        except OSError:
+            return None
+
+        self.version = version
+        self._remove_stale_versions({version, previous_version})
+        return np.load(matrix_path, mmap_mode='r')
+
+    def save_update(self, base_version: Optional[str], kept: np.ndarray, changed: np.ndarray,
+                    texts: List[str], matrix: np.ndarray, source: Optional[str] = None) -> Optional[np.ndarray]:
+        """
+        Save the embeddings of a corpus updated by key as a new version.
+
+        The corpus holds the rows at the kept positions of the base version,
+        in order, followed by appended rows. Only the changed rows are
+        pre-processed and hashed; the keys of the other rows are copied from
+        the base version (every text is hashed if it is no longer current).
+
+        Args:
+            base_version: Version of the store the kept rows come from
+            kept: Positions of the base version kept, in order
+            changed: Rows encoded from a new text (replaced or appended)
+            texts: Raw texts, one per row of matrix
+            matrix: Normalized embedding matrix of the updated corpus
+            source: Version of the data the texts came from
+
+        Returns:
+            The saved matrix memory-mapped, or None if the directory is not writable
+        """
+        stored_keys = None
+        manifest = self._manifest()
+        if base_version is not None and manifest is not None and manifest.get('version') == base_version:
+            stored_keys, _ = self.load()
+
+        keys = np.empty(len(texts), dtype='S32')
+        if stored_keys is not None and (len(kept) == 0 or int(kept.max()) < len(stored_keys)):
+            keys[:len(kept)] = stored_keys[kept]
+            rows = np.asarray(changed, dtype=np.int64)
+        else:
+            rows = np.arange(len(texts))
+        keys[rows] = [text_key(preprocess_text(texts[row]) if isinstance(texts[row], str) else '')
+                      for row in rows.tolist()]
+
+        self.version = None
+        return self.save(keys, matrix, texts_digest(texts), source)
+
+    def _derived_path(self, version: str, kind: str, part: str) -> str:
+        return os.path.join(self.directory, f'{self.name}_embeddings.{version}.{kind}.{part}.npy')
+
+    def load_derived(self, version: str, kind: str, parts: List[str]) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Open arrays derived from a version of the store (quantized copies,
+        projections).
+
+        Args:
+            version: Store version the arrays were computed from
+            kind: Derivation, e.g. 'int8' or 'pca64'
+            parts: Names of the arrays that must all be present
+
+        Returns:
+            Dictionary of arrays memory-mapped read-only, or None if any part
+            was never saved
+        """
+        try:
+            return {part: np.load(self._derived_path(version, kind, part), mmap_mode='r') for part in parts}
+        except (OSError, ValueError):
+            return None
+
+    def save_derived(self, version: str, kind: str, arrays: Dict[str, np.ndarray]) -> None:
+        """
+        Save arrays derived from a version of the store.
+
+        They are removed together with their version (see _remove_stale_versions).
+
+        Args:
+            version: Store version the arrays were computed from
+            kind: Derivation, e.g. 'int8' or 'pca64'
+            arrays: Arrays to save, by part name
+        """
+        tmp_suffix = f'.{os.getpid()}.tmp'
+        try:
+            for part, array in arrays.items():
+                path = self._derived_path(version, kind, part)
+                with open(path + tmp_suffix, 'wb') as file:
+                    np.save(file, np.ascontiguousarray(array))
+                os.replace(path + tmp_suffix, path)
+        except OSError:
+            pass
+
+    def _remove_stale_versions(self, kept_versions: set) -> None:
+        # Versions other than the current and the previous one: a process
+        # that loaded the previous version may still be reading its files
+        prefix = f'{self.name}_embeddings.'
+        for file_name in os.listdir(self.directory):
+            version = file_name[len(prefix):].split('.', 1)[0]
+            if (file_name.startswith(prefix) and file_name.endswith('.npy')
+                    and version not in kept_versions):
+                try:
+                    os.remove(os.path.join(self.directory, file_name))
+                except OSError:
+                    pass
+
+    def get_embeddings(self, texts: List[str], source: Optional[str] = None) -> np.ndarray:
+        """
+        Return one normalized embedding per text, encoding only unseen texts.
+
+        When the texts are the ones stored, in the same order, the
+        memory-mapped matrix is returned as is: recognized by the data
+        version given as source (no pass over the texts), else by the digest
+        of the raw texts. Otherwise every text is pre-processed and hashed,
+        known vectors are reused, new or changed texts are encoded and a new
+        version is saved.
+
+        Args:
+            texts: Raw texts (they are pre-processed before hashing/encoding)
+            source: Version identifying the texts and their order (the
+                DataStore version of the applicants frame, see
+                data_loader.data_version), if known; it skips every check,
+                so it must never be shared by texts in another order
+
+        Returns:
+            Matrix with one row per text
+        """
+        manifest = self._manifest()
+        digest = None
+        if manifest is not None and manifest.get('count') == len(texts):
+            unchanged = source is not None and manifest.get('source') == source
+            if not unchanged:
+                digest = texts_digest(texts)
+                unchanged = manifest.get('texts') == digest
+            stored_keys, stored_matrix = self.load() if unchanged else (None, None)
+            if stored_keys is not None:
+                if digest is not None and source is not None:
+                    # Next time the data version alone identifies the texts
+                    self._update_manifest(source=source)
+                self.last_stats = {'reused': len(texts), 'encoded': 0}
+                return stored_matrix
+
+        digest = digest or texts_digest(texts)
+        processed = [preprocess_text(text) if isinstance(text, str) else '' for text in texts]
+        keys = np.array([text_key(text) for text in processed], dtype='S32')
+
+        stored_keys, stored_matrix = self.load()
+        if stored_keys is not None and np.array_equal(stored_keys, keys):
+            # Same texts after pre-processing: only the digests are new
+            self._update_manifest(texts=digest, source=source)
+            self.last_stats = {'reused': len(keys), 'encoded': 0}
+            return stored_matrix
+
+        known_rows = {}
+        if stored_keys is not None:
+            known_rows = {key: row for row, key in enumerate(stored_keys.tolist())}
+
+        # Encode each unseen text once, even if it appears in several rows
+        missing = {}
+        for position, key in enumerate(keys.tolist()):
+            if key not in known_rows and key not in missing:
+                missing[key] = position
+
+        new_vectors = encode_texts([processed[position] for position in missing.values()], preprocessed=True)
+        norms = np.linalg.norm(new_vectors, axis=1, keepdims=True)
+        new_vectors = np.divide(new_vectors, norms, out=np.zeros_like(new_vectors, dtype=float), where=norms > 0)
+        new_rows = {key: row for row, key in enumerate(missing)}
+
+        dim = stored_matrix.shape[1] if stored_matrix is not None else new_vectors.shape[1]
+        matrix = np.zeros((len(keys), dim))
+        is_new = np.array([key in new_rows for key in keys.tolist()], dtype=bool)
+        if is_new.any():
+            matrix[is_new] = new_vectors[[new_rows[key] for key in keys[is_new].tolist()]]
+        if (~is_new).any():
+            matrix[~is_new] = stored_matrix[[known_rows[key] for key in keys[~is_new].tolist()]]
+
+        self.last_stats = {'reused': len(keys) - len(missing), 'encoded': len(missing)}
+
+        self.version = None
+        saved = self.save(keys, matrix, digest, source)
+        return saved if saved is not None else matrix
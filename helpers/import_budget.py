@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+from helpers.lazy_imports import HEAVY_MODULES
+
+# Modules imported when the app starts (app.py and the pages)
+DEFAULT_MODULES = ['helpers.data_loader', 'helpers.similarity_calculator', 'helpers.ranking_cache']
+
+# Budget for a cold import of DEFAULT_MODULES, in milliseconds
+IMPORT_BUDGET_MS = 1500
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def measure_import_time(modules: List[str]) -> Tuple[float, Dict[str, float]]:
+    """
+    Cold-import modules in a fresh interpreter under `python -X importtime`.
+
+    Args:
+        modules: Dotted module names imported together
+
+    Returns:
+        Tuple (total milliseconds, {module: cumulative milliseconds}) where the
+        dictionary has every module imported, at any depth
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {', '.join(modules)}"],
+        cwd=_REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {modules} failed:\n{result.stderr[-2000:]}")
+
+    total_us, cumulative = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative_us, name_field = line[len('import time:'):].split('|')
+        name = name_field.strip()
+        cumulative[name] = int(cumulative_us) / 1000
+        # Top-level imports (no indentation) add up to the whole import
+        if name_field[1:2] != ' ':
+            total_us += int(cumulative_us)
+    return total_us / 1000, cumulative
+
+def check_import_budget(modules: List[str] = DEFAULT_MODULES,
+                        budget_ms: float = IMPORT_BUDGET_MS) -> List[str]:
+    """
+    Check the cold import of the given modules against the time budget.
+
+    Args:
+        modules: Modules imported together
+        budget_ms: Maximum total import time
+
+    Returns:
+        List of violations (empty when within budget and no heavy
+        dependency is imported eagerly)
+    """
+    total_ms, cumulative = measure_import_time(modules)
+    return budget_violations(total_ms, cumulative, budget_ms)
+
+def budget_violations(total_ms: float, cumulative: Dict[str, float], budget_ms: float) -> List[str]:
+    problems = []
+    if total_ms > budget_ms:
+        problems.append(f"cold import took {total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+    for heavy in HEAVY_MODULES:
+        if heavy in cumulative:
+            problems.append(f"{heavy} is imported at import time ({cumulative[heavy]:.0f} ms)")
+    return problems
+
+if __name__ == '__main__':
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else IMPORT_BUDGET_MS
+
+    total_ms, cumulative = measure_import_time(DEFAULT_MODULES)
+    print(f"Importação a frio de {', '.join(DEFAULT_MODULES)}: {total_ms:.0f} ms (orçamento {budget_ms:.0f} ms)")
+    for name in ['streamlit', 'pandas', 'numpy', 'scipy', 'pyarrow'] + HEAVY_MODULES:
+        if name in cumulative:
+            print(f"  {name:<24} {cumulative[name]:>8.0f} ms")
+
+    problems = budget_violations(total_ms, cumulative, budget_ms)
+    for problem in problems:
+        print(f"FALHA: {problem}")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,176 @@
+import json
+import os
+import sys
+import time
+import pandas as pd
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = '0123456789+-.eE'
+
+def peak_rss_bytes() -> int:
+    """
+    Peak resident set size of the current process.
+
+    Returns:
+        Peak RSS in bytes (0 where the platform does not report it)
+    """
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def iter_object_items(path: str, read_size: int = 1 << 16) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the (key, value) pairs of a JSON file whose top level is an object.
+
+    Only one value is decoded at a time, so memory stays proportional to the
+    largest value instead of the whole file.
+
+    Args:
+        path: JSON file
+        read_size: Number of characters read from the file at a time
+
+    Yields:
+        Tuples (key, decoded value) in file order
+    """
+    decoder = json.JSONDecoder()
+
+    with open(path, 'r', encoding='utf-8') as file:
+        buffer = ''
+        position = 0
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buffer, position, eof
+            if eof:
+                return False
+            # Grow reads with the pending value so re-decoding stays linear
+            chunk = file.read(max(read_size, len(buffer) - position))
+            if not chunk:
+                eof = True
+                return False
+            buffer = buffer[position:] + chunk
+            position = 0
+            return True
+
+        def skip_whitespace() -> None:
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in _WHITESPACE:
+                    position += 1
+                if position < len(buffer) or not fill():
+                    return
+
+        def expect(char: str) -> bool:
+            nonlocal position
+            skip_whitespace()
+            if position < len(buffer) and buffer[position] == char:
+                position += 1
+                return True
+            return False
+
+        def decode() -> Any:
+            nonlocal position
+            skip_whitespace()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    # Incomplete value: read more and retry from its start
+                    if fill():
+                        continue
+                    raise
+                # A number cut at the end of the buffer may continue in the next chunk
+                if (isinstance(value, (int, float)) and not isinstance(value, bool)
+                        and (end == len(buffer) or buffer[end] in _NUMBER_CHARS) and fill()):
+                    continue
+                position = end
+                return value
+
+        if not expect('{'):
+            raise ValueError(f"{path}: expected a JSON object at the top level")
+        if expect('}'):
+            return
+
+        while True:
+            key = decode()
+            if not expect(':'):
+                raise ValueError(f"{path}: expected ':' after key {key!r}")
+            yield key, decode()
+
+            if expect(','):
+                continue
+            if expect('}'):
+                return
+            raise ValueError(f"{path}: expected ',' or '}}' after the value of {key!r}")
+
+def stream_to_frame(items: Iterable[Tuple[str, Any]],
+                    row_builder: Callable[[str, Any], Iterable[Dict[str, Any]]],
+                    chunk_rows: int = 10_000) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Build a DataFrame from streamed items, moving rows into column buffers in chunks.
+
+    At most chunk_rows row dicts are alive at a time; every full chunk is
+    transposed into per-column lists, and the DataFrame is created once from
+    those lists, which yields the same frame as pd.DataFrame(list_of_rows).
+
+    Args:
+        items: Stream of (key, value) pairs (see iter_object_items)
+        row_builder: Function turning one item into zero or more row dicts
+        chunk_rows: Number of rows per chunk
+
+    Returns:
+        Tuple (DataFrame, stats) with the number of rows, chunks, elapsed
+        seconds and the process peak RSS in bytes
+    """
+    start = time.perf_counter()
+    columns: Dict[str, List[Any]] = {}
+    pending: List[Dict[str, Any]] = []
+    n_rows = 0
+    n_chunks = 0
+
+    def flush() -> None:
+        nonlocal n_rows, n_chunks
+        if not pending:
+            return
+        for row in pending:
+            for column in row:
+                if column not in columns:
+                    # Column seen for the first time: earlier rows lack it
+                    columns[column] = [None] * n_rows
+        for column, values in columns.items():
+            values.extend(row.get(column) for row in pending)
+        n_rows += len(pending)
+        n_chunks += 1
+        pending.clear()
+
+    for key, value in items:
+        for row in row_builder(key, value):
+            pending.append(row)
+            if len(pending) >= chunk_rows:
+                flush()
+    flush()
+
+    df = pd.DataFrame(columns) if n_rows else pd.DataFrame()
+    stats = {
+        'rows': n_rows,
+        'chunks': n_chunks,
+        'seconds': time.perf_counter() - start,
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+    return df, stats
+
+if __name__ == '__main__':
+    from helpers.data_loader import VAGAS_PATH, PROSPECTS_PATH, vaga_rows, prospect_rows
+
+    baseline = peak_rss_bytes()
+    for path, builder in [(VAGAS_PATH, vaga_rows), (PROSPECTS_PATH, prospect_rows)]:
+        df, stats = stream_to_frame(iter_object_items(path), builder)
+        print(f"{path}: {os.path.getsize(path) / 1e6:.1f} MB -> {stats['rows']} linhas "
+              f"em {stats['chunks']} blocos, {stats['seconds']:.2f} s, "
+              f"pico de RSS {stats['peak_rss_bytes'] / 1e6:.1f} MB "
+              f"(+{(stats['peak_rss_bytes'] - baseline) / 1e6:.1f} MB)")
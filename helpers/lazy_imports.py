@@ -0,0 +1,110 @@
+import importlib
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+
+# Dependencies that must never be imported just by importing helpers
+HEAVY_MODULES = ['torch', 'transformers', 'sentence_transformers', 'nltk', 'sklearn']
+
+# Modules the app needs soon after startup, imported by the background warm-up
+DEFAULT_WARMUP_MODULES = ['sklearn.metrics.pairwise', 'sklearn.cluster']
+
+# Model used by compute_embedding/match_score in data_loader
+DEFAULT_SENTENCE_MODEL = 'all-MiniLM-L6-v2'
+
+# NLTK resources the original text pipeline downloaded at import time
+NLTK_RESOURCES = {'tokenizers/punkt': 'punkt', 'corpora/stopwords': 'stopwords'}
+
+# Seconds spent importing each warmed module (None if it failed to import)
+warmup_stats: Dict[str, Optional[float]] = {}
+
+_warmup_thread: Optional[threading.Thread] = None
+_warmup_lock = threading.Lock()
+
+def import_module(name: str) -> Any:
+    """
+    Import a module on first real use (later calls hit sys.modules).
+
+    Args:
+        name: Dotted module name
+
+    Returns:
+        The imported module
+    """
+    return importlib.import_module(name)
+
+@lru_cache(maxsize=None)
+def get_sentence_transformer(model_name: str = DEFAULT_SENTENCE_MODEL, local_files_only: bool = False,
+                             device: Optional[str] = None) -> Any:
+    """
+    Load a sentence-transformers model once per process.
+
+    Imports torch and may download the model, so it is only called where
+    a real transformer embedding is needed.
+
+    Args:
+        model_name: Model name or local directory
+        local_files_only: Never reach the Hugging Face Hub (offline use)
+        device: Torch device (default: chosen by sentence-transformers)
+
+    Returns:
+        SentenceTransformer instance
+    """
+    return import_module('sentence_transformers').SentenceTransformer(
+        model_name, device=device, local_files_only=local_files_only
+    )
+
+@lru_cache(maxsize=None)
+def ensure_nltk_resources() -> bool:
+    """
+    Make sure the NLTK resources are available, downloading the missing ones.
+
+    Returns:
+        True if every resource is available afterwards
+    """
+    nltk = import_module('nltk')
+    available = True
+    for path, package in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            available = nltk.download(package, quiet=True) and available
+    return available
+
+def _warm_up(modules: Iterable[str], nltk_resources: bool) -> None:
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            import_module(name)
+            warmup_stats[name] = time.perf_counter() - start
+        except ImportError:
+            warmup_stats[name] = None
+    if nltk_resources:
+        try:
+            ensure_nltk_resources()
+        except (ImportError, OSError):
+            pass
+
+def start_warmup(modules: Optional[Iterable[str]] = None, nltk_resources: bool = False) -> threading.Thread:
+    """
+    Import heavy modules in a daemon thread so the first request does not pay for them.
+
+    Only the first call starts a thread; later calls return the same one.
+
+    Args:
+        modules: Modules to import (default: DEFAULT_WARMUP_MODULES)
+        nltk_resources: Also check/download the NLTK resources
+
+    Returns:
+        The warm-up thread (join() it to wait for completion)
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(
+                target=_warm_up, name='helpers-warmup', daemon=True,
+                args=(list(modules if modules is not None else DEFAULT_WARMUP_MODULES), nltk_resources)
+            )
+            _warmup_thread.start()
+        return _warmup_thread
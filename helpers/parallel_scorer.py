@@ -0,0 +1,274 @@
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from scipy import sparse
+from typing import Dict, List, Optional, Tuple
+from helpers.batch_scorer import SCORE_COMPONENTS, CandidateFeatures, JobQuery, prepare_job, score_job, score_prepared_job
+from helpers.skill_matrix import SkillMatrix
+
+# Corpus size from which find_matching_candidates scores in a process pool by default
+PARALLEL_MIN_CANDIDATES = 200_000
+
+# Shard boundaries are multiples of this many rows: BLAS kernels process rows
+# in fixed-size blocks, and aligned slices round exactly like the full matrix
+SHARD_ALIGNMENT = 256
+
+# Arrays of CandidateFeatures copied into shared memory
+_LEVEL_ARRAYS = ['education_levels', 'english_levels', 'spanish_levels']
+
+# Rows of the shared block the workers write their scores into
+_RESULT_NAMES = SCORE_COMPONENTS + ['overall_score']
+
+def default_workers() -> int:
+    """
+    Number of worker processes used when none is configured.
+
+    Returns:
+        CPUs available to this process
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+class SharedFeatures:
+    """
+    Copy of a corpus' CandidateFeatures in shared memory blocks.
+
+    The arrays are copied once; worker processes then attach to the blocks
+    by name and read them in place, so neither DataFrames nor feature
+    matrices are ever pickled to the workers. The blocks are released with
+    close() (or when the object is garbage collected).
+    """
+
+    def __init__(self, features: CandidateFeatures):
+        skill_matrix = features.skill_matrix.matrix
+        arrays = {
+            'embeddings': np.ascontiguousarray(features.embeddings),
+            'skill_data': skill_matrix.data,
+            'skill_indices': skill_matrix.indices,
+            'skill_indptr': skill_matrix.indptr
+        }
+        arrays.update({name: getattr(features, name) for name in _LEVEL_ARRAYS})
+
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.spec = {
+            'arrays': {},
+            'skill_shape': skill_matrix.shape,
+            'skills': features.skill_matrix.skills,
+            'embedding_version': features.embedding_version
+        }
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self._blocks.append(block)
+            self.spec['arrays'][name] = (block.name, array.shape, array.dtype.str)
+
+        self._finalizer = weakref.finalize(self, _release_blocks, self._blocks)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.size for block in self._blocks)
+
+    def close(self) -> None:
+        self._finalizer()
+
+def _release_blocks(blocks: List[shared_memory.SharedMemory]) -> None:
+    for block in blocks:
+        block.close()
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+
+def attach_features(spec: Dict) -> Tuple[CandidateFeatures, List[shared_memory.SharedMemory]]:
+    """
+    Rebuild CandidateFeatures on top of shared memory blocks, without copying.
+
+    Args:
+        spec: SharedFeatures.spec of the owning process
+
+    Returns:
+        Tuple (features, blocks); the blocks must stay referenced while the
+        features are in use
+    """
+    blocks, arrays = [], {}
+    for name, (block_name, shape, dtype) in spec['arrays'].items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+    matrix = sparse.csr_matrix((arrays['skill_data'], arrays['skill_indices'], arrays['skill_indptr']),
+                               shape=spec['skill_shape'], copy=False)
+    features = CandidateFeatures(
+        embeddings=arrays['embeddings'],
+        skill_matrix=SkillMatrix(matrix, spec['skills']),
+        education_levels=arrays['education_levels'],
+        english_levels=arrays['english_levels'],
+        spanish_levels=arrays['spanish_levels'],
+        embedding_version=spec['embedding_version']
+    )
+    return features, blocks
+
+# State of each worker process, set by the pool initializer
+_worker_features: Optional[CandidateFeatures] = None
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_shards: Dict[Tuple[int, int], CandidateFeatures] = {}
+_worker_results: Optional[np.ndarray] = None
+
+def _init_worker(spec: Dict, results_block: str) -> None:
+    global _worker_features, _worker_blocks, _worker_results
+    _worker_features, _worker_blocks = attach_features(spec)
+    block = shared_memory.SharedMemory(name=results_block)
+    _worker_blocks.append(block)
+    _worker_results = np.ndarray((len(_RESULT_NAMES), len(_worker_features)), dtype=np.float64, buffer=block.buf)
+
+def _shard_features(start: int, end: int) -> CandidateFeatures:
+    shard = _worker_shards.get((start, end))
+    if shard is None:
+        features = _worker_features
+        # Dense arrays are views of the shared blocks; only the CSR row range is copied
+        shard = CandidateFeatures(
+            embeddings=features.embeddings[start:end],
+            skill_matrix=SkillMatrix(features.skill_matrix.matrix[start:end], features.skill_matrix.skills),
+            education_levels=features.education_levels[start:end],
+            english_levels=features.english_levels[start:end],
+            spanish_levels=features.spanish_levels[start:end]
+        )
+        _worker_shards[(start, end)] = shard
+    return shard
+
+def _score_shard(query: JobQuery, start: int, end: int, weights: Optional[Dict[str, float]] = None) -> None:
+    # The job was encoded by the parent: no model is loaded in the workers,
+    # and the scores go to the shared results block instead of being pickled back
+    scores = score_prepared_job(query, _shard_features(start, end), weights)
+    for row, name in enumerate(_RESULT_NAMES):
+        _worker_results[row, start:end] = scores[name]
+
+class ParallelScorer:
+    """
+    Scores jobs against a corpus split into contiguous shards across a process pool.
+
+    Each worker attaches to the shared feature arrays once, when the pool
+    starts. A job is encoded once, in this process (prepare_job: embedding,
+    skill mask, level ordinals), and every worker receives only that
+    JobQuery and a row range, so workers do the mat-vec and gathers of
+    their shard and never encode text or load the embedding model. They
+    write the scores into a shared results block, which is why jobs are
+    scored one at a time per scorer. Every candidate is scored by the same
+    operations as score_job, so the arrays equal the single-process result.
+    """
+
+    def __init__(self, features: CandidateFeatures, workers: Optional[int] = None):
+        self.workers = max(1, workers or default_workers())
+        self.n_candidates = len(features)
+        # Vocabulary of the job skill masks (the same in every shard)
+        self.skill_matrix = features.skill_matrix
+        self.shared = SharedFeatures(features)
+
+        shard_size = -(-self.n_candidates // self.workers)
+        shard_size = -(-shard_size // SHARD_ALIGNMENT) * SHARD_ALIGNMENT
+        self.shards = [(start, min(start + shard_size, self.n_candidates))
+                       for start in range(0, self.n_candidates, shard_size)]
+
+        results_block = shared_memory.SharedMemory(create=True, size=max(8 * len(_RESULT_NAMES) * self.n_candidates, 1))
+        self._results = np.ndarray((len(_RESULT_NAMES), self.n_candidates), dtype=np.float64, buffer=results_block.buf)
+        self._results_finalizer = weakref.finalize(self, _release_blocks, [results_block])
+        self._lock = threading.Lock()
+
+        # 'spawn' keeps workers safe to start from the threaded Streamlit server
+        self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                         mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_init_worker, initargs=(self.shared.spec, results_block.name))
+
+    def score_job(self, job_data: pd.Series, weights: Optional[Dict[str, float]] = None) -> Dict[str, np.ndarray]:
+        """
+        Score one job against every candidate (see batch_scorer.score_job).
+
+        Args:
+            job_data: Series containing job data
+            weights: Weight per component of the overall score (default: SCORE_WEIGHTS)
+
+        Returns:
+            Dictionary with one score array per category plus 'overall_score'
+        """
+        if not self.shards:
+            return {name: np.zeros(0) for name in SCORE_COMPONENTS + ['overall_score']}
+
+        query = prepare_job(job_data, self.skill_matrix)
+        with self._lock:
+            futures = [self._pool.submit(_score_shard, query, start, end, weights) for start, end in self.shards]
+            for future in futures:
+                future.result()
+            return {name: self._results[row].copy() for row, name in enumerate(_RESULT_NAMES)}
+
+    def close(self) -> None:
+        """Stop the workers and release the shared memory."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self.shared.close()
+        self._results_finalizer()
+
+    def __enter__(self) -> 'ParallelScorer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def get_parallel_scorer(features: CandidateFeatures, workers: Optional[int] = None) -> ParallelScorer:
+    """
+    Process pool scorer of a featurized corpus, started on first use.
+
+    The scorer is kept on the features object, so the pool and the shared
+    memory live as long as the corpus they were built from.
+
+    Args:
+        features: Candidate features to share with the workers
+        workers: Worker processes (default: one per available CPU)
+
+    Returns:
+        ParallelScorer over features
+    """
+    workers = max(1, workers or default_workers())
+    scorer = getattr(features, '_parallel_scorer', None)
+    if scorer is not None and scorer.workers == workers:
+        return scorer
+    if scorer is not None:
+        scorer.close()
+
+    scorer = ParallelScorer(features, workers)
+    features._parallel_scorer = scorer
+    weakref.finalize(features, scorer.close)
+    return scorer
+
+if __name__ == '__main__':
+    import sys
+    from helpers.data_loader import load_data
+    from helpers.batch_scorer import get_candidate_features
+
+    vagas_df, _, applicants_df = load_data()
+    features = get_candidate_features(applicants_df)
+    jobs = [row for _, row in vagas_df.head(20).iterrows()]
+    worker_counts = [int(value) for value in sys.argv[1:]] or [1, 2, 4, 8]
+
+    start = time.perf_counter()
+    reference = [score_job(job, features) for job in jobs]
+    single = (time.perf_counter() - start) / len(jobs)
+    print(f"{len(features)} candidatos, {default_workers()} CPUs, "
+          f"1 processo: {1000 * single:.1f} ms por vaga")
+
+    for workers in sorted(set(worker_counts)):
+        with ParallelScorer(features, workers) as scorer:
+            scorer.score_job(jobs[0])
+            start = time.perf_counter()
+            results = [scorer.score_job(job) for job in jobs]
+            elapsed = (time.perf_counter() - start) / len(jobs)
+        exact = all(np.array_equal(result[name], expected[name])
+                    for result, expected in zip(results, reference) for name in expected)
+        print(f"{workers} processos: {1000 * elapsed:.1f} ms por vaga, "
+              f"speed-up {single / elapsed:.2f}x, idêntico: {'sim' if exact else 'NÃO'}")
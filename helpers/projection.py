@@ -0,0 +1,230 @@
+import time
+import numpy as np
+from typing import Any, Dict, Optional
+from helpers.embedding_store import EmbeddingStore
+from helpers.quantization import DEFAULT_RESCORE
+
+# Ways of fitting the projection matrix
+PROJECTION_METHODS = ['pca', 'random']
+
+# Target dimension when none is given (384 -> 64 makes the first pass ~6x cheaper)
+DEFAULT_PROJECTION_DIM = 64
+
+# Rows used to fit the PCA (the principal axes converge long before the whole corpus)
+PCA_SAMPLE_SIZE = 100_000
+
+# Rows projected at a time, bounding the temporary copy
+_CHUNK_ROWS = 65_536
+
+class ProjectedEmbeddings:
+    """
+    Embeddings projected to a lower dimension for a cheap first scoring pass.
+
+    The projection is a d x k matrix W; candidates are stored as X W and a
+    query q is scored as (X W)(W^T q), which approximates X q. 'pca' uses the
+    top right singular vectors of (a sample of) X, not centered, since inner
+    products rather than distances are approximated. 'random' uses a
+    Gaussian matrix scaled by 1/sqrt(k), which preserves inner products in
+    expectation without any fitting.
+    """
+
+    def __init__(self, method: str, components: np.ndarray, matrix: np.ndarray):
+        if method not in PROJECTION_METHODS:
+            raise ValueError(f"Unknown projection method '{method}' (available: {', '.join(PROJECTION_METHODS)})")
+        self.method = method
+        self.components = components
+        self.matrix = matrix
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def dim(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.components.nbytes + self.matrix.nbytes)
+
+    @classmethod
+    def fit(cls, embeddings: np.ndarray, method: str = 'pca', dim: int = DEFAULT_PROJECTION_DIM,
+            random_state: int = 0) -> 'ProjectedEmbeddings':
+        """
+        Fit a projection and project every embedding.
+
+        Args:
+            embeddings: Full-dimension embeddings, one row per candidate
+            method: 'pca' or 'random'
+            dim: Target dimension (capped at the embedding dimension)
+            random_state: Seed of the PCA sample and of the random matrix
+
+        Returns:
+            ProjectedEmbeddings of the corpus
+        """
+        if method not in PROJECTION_METHODS:
+            raise ValueError(f"Unknown projection method '{method}' (available: {', '.join(PROJECTION_METHODS)})")
+        n, full_dim = embeddings.shape
+        dim = min(dim, full_dim)
+        rng = np.random.default_rng(random_state)
+
+        if method == 'pca':
+            sample = embeddings
+            if n > PCA_SAMPLE_SIZE:
+                sample = embeddings[np.sort(rng.choice(n, PCA_SAMPLE_SIZE, replace=False))]
+            _, _, right_vectors = np.linalg.svd(np.asarray(sample, dtype=np.float64), full_matrices=False)
+            components = np.zeros((full_dim, dim))
+            # Fewer samples than dimensions leave the remaining axes at zero
+            components[:, :min(dim, len(right_vectors))] = right_vectors[:dim].T
+        else:
+            components = rng.standard_normal((full_dim, dim)) / np.sqrt(dim)
+
+        components = components.astype(np.float32)
+        matrix = np.empty((n, dim), dtype=np.float32)
+        for start in range(0, n, _CHUNK_ROWS):
+            matrix[start:start + _CHUNK_ROWS] = np.asarray(embeddings[start:start + _CHUNK_ROWS],
+                                                           dtype=np.float32) @ components
+        return cls(method, components, matrix)
+
+    def dot(self, vector: np.ndarray, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Approximate inner product of every (or the selected) embedding with a query.
+
+        Args:
+            vector: Full-dimension query vector
+            positions: Optional row positions to score
+
+        Returns:
+            Array of scores aligned with positions when given
+        """
+        query = np.asarray(vector, dtype=np.float32) @ self.components
+        matrix = self.matrix if positions is None else self.matrix[positions]
+        return (matrix @ query).astype(np.float64)
+
+def projection_kind(method: str, dim: int) -> str:
+    """Name of a projection among the arrays derived from the embedding store (e.g. 'pca64')."""
+    return f'{method}{dim}'
+
+def get_projected_embeddings(features: Any, method: str = 'pca', dim: int = DEFAULT_PROJECTION_DIM,
+                             embedding_store: Optional[EmbeddingStore] = None) -> ProjectedEmbeddings:
+    """
+    Projected embeddings of a featurized corpus.
+
+    Loaded from the embedding store when `python -m helpers.projection fit`
+    saved them for the current store version; otherwise fitted here and
+    saved. Kept on the features object afterwards.
+
+    Args:
+        features: CandidateFeatures whose embeddings are projected
+        method: 'pca' or 'random'
+        dim: Target dimension
+        embedding_store: Store the embeddings came from (default: next to applicants.csv)
+
+    Returns:
+        ProjectedEmbeddings aligned with the candidates
+    """
+    cache = getattr(features, '_projected', None)
+    if cache is None:
+        cache = features._projected = {}
+    kind = projection_kind(method, dim)
+    if kind in cache:
+        return cache[kind]
+
+    projected = None
+    version = features.embedding_version
+    store = embedding_store or EmbeddingStore()
+    if version is not None:
+        stored = store.load_derived(version, kind, ['components', 'matrix'])
+        if stored is not None and len(stored['matrix']) == len(features):
+            projected = ProjectedEmbeddings(method, stored['components'], stored['matrix'])
+
+    if projected is None:
+        projected = ProjectedEmbeddings.fit(features.embeddings, method, dim)
+        if version is not None:
+            store.save_derived(version, kind, {'components': projected.components, 'matrix': projected.matrix})
+
+    cache[kind] = projected
+    return projected
+
+def projection_report(vagas_df, applicants_df, method: str, dim: int, k: int = 10,
+                      rescore: int = DEFAULT_RESCORE, n_vagas: int = 20) -> Dict[str, float]:
+    """
+    First-pass latency and ranking agreement of a projection against full dimension.
+
+    Args:
+        vagas_df: DataFrame with job vacancies (the first n_vagas are ranked)
+        applicants_df: DataFrame with applicant data
+        method: 'pca' or 'random'
+        dim: Target dimension
+        k: Ranking depth compared
+        rescore: Hits rescored at full dimension
+        n_vagas: Vagas ranked
+
+    Returns:
+        Dictionary with 'full_ms' and 'projected_ms' (text similarity mat-vec
+        over the corpus), 'first_pass_overlap_at_k' (projected scores only)
+        and 'overlap_at_k' (after rescoring)
+    """
+    from helpers.batch_scorer import get_candidate_features, job_embedding
+    from helpers.data_store import lookup_row
+    from helpers.similarity_calculator import find_matching_candidates
+
+    features = get_candidate_features(applicants_df)
+    projected = get_projected_embeddings(features, method, dim)
+    embeddings = np.asarray(features.embeddings)
+
+    full_seconds, projected_seconds, first_pass, rescored = [], [], [], []
+    for vaga_id in vagas_df['vaga_id'].head(n_vagas).tolist():
+        job_vector = job_embedding(lookup_row(vagas_df, 'vaga_id', vaga_id))
+        start = time.perf_counter()
+        embeddings @ job_vector
+        full_seconds.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        projected.dot(job_vector)
+        projected_seconds.append(time.perf_counter() - start)
+
+        exact = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=k, use_ann=False, workers=1)
+        if exact.empty:
+            continue
+        for overlaps, hits in [(first_pass, 0), (rescored, rescore)]:
+            approximate = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=k, use_ann=False,
+                                                   workers=1, projection_dim=dim, projection_method=method,
+                                                   rescore=hits)
+            overlaps.append(len(set(exact['codigo']) & set(approximate['codigo'])) / len(exact))
+
+    return {
+        'full_ms': 1000 * float(np.median(full_seconds)) if full_seconds else 0.0,
+        'projected_ms': 1000 * float(np.median(projected_seconds)) if projected_seconds else 0.0,
+        'first_pass_overlap_at_k': float(np.mean(first_pass)) if first_pass else 1.0,
+        'overlap_at_k': float(np.mean(rescored)) if rescored else 1.0
+    }
+
+if __name__ == '__main__':
+    import argparse
+    from helpers.batch_scorer import get_candidate_features
+    from helpers.data_loader import load_data
+
+    parser = argparse.ArgumentParser(description="Projeções de dimensão reduzida dos embeddings dos candidatos.")
+    parser.add_argument('command', choices=['fit', 'evaluate'],
+                        help="fit: ajusta e grava a projeção; evaluate: latência x concordância do top-k")
+    parser.add_argument('--method', choices=PROJECTION_METHODS, default='pca', help="Tipo de projeção")
+    parser.add_argument('--dims', type=int, nargs='+', default=[DEFAULT_PROJECTION_DIM],
+                        help="Dimensões de destino")
+    parser.add_argument('--k', type=int, default=10, help="Profundidade do ranking comparado")
+    parser.add_argument('--vagas', type=int, default=20, help="Vagas avaliadas")
+    args = parser.parse_args()
+
+    vagas_df, _, applicants_df = load_data()
+    features = get_candidate_features(applicants_df)
+    for dim in args.dims:
+        if args.command == 'fit':
+            start = time.perf_counter()
+            projected = get_projected_embeddings(features, args.method, dim)
+            print(f"{projection_kind(args.method, dim)}: {len(projected)} vetores, "
+                  f"{projected.nbytes / 1e6:.1f} MB, {time.perf_counter() - start:.2f} s "
+                  f"(versão {features.embedding_version})")
+        else:
+            report = projection_report(vagas_df, applicants_df, args.method, dim, args.k, n_vagas=args.vagas)
+            print(f"{projection_kind(args.method, dim)}: {report['projected_ms']:.2f} ms por vaga "
+                  f"(dimensão completa {report['full_ms']:.2f} ms), "
+                  f"overlap@{args.k} {report['first_pass_overlap_at_k']:.3f} sem / "
+                  f"{report['overlap_at_k']:.3f} com rescoring")
@@ -0,0 +1,196 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+from helpers.batch_scorer import (
+    CandidateFeatures,
+    cheap_scores,
+    combine_scores,
+    job_embedding,
+    resolve_weights,
+    score_job,
+    top_k_indices,
+)
+from helpers.parallel_scorer import SHARD_ALIGNMENT
+
+# Largest text similarity of a candidate: cosine of L2-normalized vectors,
+# with room for the rounding of float32 embeddings
+TEXT_SIMILARITY_BOUND = 1.0 + 1e-6
+
+# Candidates with the best bounds scored first to set the pruning threshold
+DEFAULT_SEED_ROWS = 1024
+
+# Slack on the threshold for the rounding of the seed scores (gathered rows)
+THRESHOLD_MARGIN = 1e-9
+
+def aligned_text_similarity(embeddings: np.ndarray, job_vector: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    Text similarity of some rows, rounded exactly like the mat-vec over every row.
+
+    A mat-vec over gathered rows may round differently from the full one,
+    while every row of a slice starting at a multiple of SHARD_ALIGNMENT
+    rounds as in the full one (see parallel_scorer). So every row is
+    multiplied at its own offset within a block of SHARD_ALIGNMENT rows:
+    either in the aligned blocks of the matrix that hold a position, or,
+    when fewer rows are read that way, copied into a zero-padded buffer of
+    such blocks, the k-th row of each offset going to the k-th block. Rows
+    of the last, partial block of the matrix are multiplied in its slice.
+
+    Args:
+        embeddings: Normalized candidate matrix
+        job_vector: Normalized job vector
+        positions: Sorted row positions
+
+    Returns:
+        Text similarity of the rows at positions
+    """
+    similarity = np.empty(len(positions))
+    tail_start = len(embeddings) - len(embeddings) % SHARD_ALIGNMENT
+    split = int(np.searchsorted(positions, tail_start))
+    if split < len(positions):
+        similarity[split:] = (embeddings[tail_start:] @ job_vector)[positions[split:] - tail_start]
+    if split == 0:
+        return similarity
+
+    head = positions[:split]
+    offsets = head % SHARD_ALIGNMENT
+    order = np.argsort(offsets, kind='stable')
+    sorted_offsets = offsets[order]
+    # Rank of each row among the rows with the same offset = its block in the buffer
+    ranks = np.arange(split) - np.searchsorted(sorted_offsets, sorted_offsets)
+    n_buffer_blocks = int(ranks.max()) + 1
+    blocks = np.unique(head // SHARD_ALIGNMENT)
+
+    if n_buffer_blocks < len(blocks):
+        slots = np.empty(split, dtype=np.int64)
+        slots[order] = ranks * SHARD_ALIGNMENT + sorted_offsets
+        buffer = np.zeros((n_buffer_blocks * SHARD_ALIGNMENT, embeddings.shape[1]), dtype=embeddings.dtype)
+        buffer[slots] = embeddings[head]
+        similarity[:split] = (buffer @ job_vector)[slots]
+        return similarity
+
+    # Consecutive blocks are multiplied as one slice
+    for run in np.split(blocks, np.flatnonzero(np.diff(blocks) > 1) + 1):
+        start, end = int(run[0]) * SHARD_ALIGNMENT, (int(run[-1]) + 1) * SHARD_ALIGNMENT
+        lo, hi = np.searchsorted(head, [start, end])
+        similarity[lo:hi] = (embeddings[start:end] @ job_vector)[head[lo:hi] - start]
+    return similarity
+
+def score_job_top_k(job_data: pd.Series, features: CandidateFeatures, top_n: int,
+                    weights: Optional[Dict[str, float]] = None, seed_rows: int = DEFAULT_SEED_ROWS
+                    ) -> Tuple[np.ndarray, Dict[str, np.ndarray], Dict[str, int]]:
+    """
+    Score only the candidates that can reach the top_n of a job.
+
+    Threshold-algorithm pruning of the weighted overall score. The cheap
+    components (skills, education, languages) are computed for every
+    candidate; adding the weighted TEXT_SIMILARITY_BOUND to them gives an
+    upper bound of each overall score. The seed_rows candidates with the
+    best bounds get their text similarity, and their top_n-th overall
+    score becomes the threshold: candidates whose bound is below it cannot
+    make the top_n, so their text similarity is never computed.
+
+    The bound is summed like the overall score (combine_scores) with the
+    text similarity replaced by its maximum, and rounding is monotone, so
+    no candidate above the threshold is lost (the seed is scored on its
+    gathered rows, so the threshold keeps THRESHOLD_MARGIN of slack for
+    their rounding). The surviving rows are scored on the aligned blocks
+    that hold them (aligned_text_similarity), so their scores are exactly
+    those of score_job and the top_n, ties broken by position, is the same.
+
+    Args:
+        job_data: Series containing job data
+        features: Pre-computed candidate features (dense embeddings)
+        top_n: Number of candidates the scores must rank
+        weights: Weight per component of the overall score (default: SCORE_WEIGHTS)
+        seed_rows: Candidates scored to set the threshold
+
+    Returns:
+        Tuple (sorted row positions of the scored candidates, score_job
+        dictionary aligned with them, stats with the 'candidates', 'scored'
+        and 'pruned' counts)
+    """
+    weights = resolve_weights(weights)
+    n = len(features)
+    if top_n <= 0 or top_n >= n:
+        positions = np.arange(n)
+        return positions, score_job(job_data, features, weights=weights), \
+            {'candidates': n, 'scored': n, 'pruned': 0}
+
+    cheap = cheap_scores(job_data, features)
+    bound = combine_scores({'text_similarity': np.full(n, TEXT_SIMILARITY_BOUND), **cheap}, weights)
+    job_vector = job_embedding(job_data)
+
+    def score_positions(positions: np.ndarray, text_similarity: np.ndarray) -> Dict[str, np.ndarray]:
+        scores = {'text_similarity': text_similarity, **{name: values[positions] for name, values in cheap.items()}}
+        scores['overall_score'] = combine_scores(scores, weights)
+        return scores
+
+    # The top_n-th score among the seed is a lower bound of the final one
+    seed = np.sort(top_k_indices(bound, max(seed_rows, top_n)))
+    seed_overall = score_positions(seed, features.embeddings[seed] @ job_vector)['overall_score']
+    threshold = np.partition(seed_overall, len(seed) - top_n)[len(seed) - top_n] - THRESHOLD_MARGIN
+
+    positions = np.flatnonzero(bound >= threshold)
+    scores = score_positions(positions, aligned_text_similarity(features.embeddings, job_vector, positions))
+    return positions, scores, {'candidates': n, 'scored': len(positions), 'pruned': n - len(positions)}
+
+def pruning_report(vagas_df: pd.DataFrame, applicants_df: pd.DataFrame, k: int = 10,
+                   weights: Optional[Dict[str, float]] = None, n_vagas: int = 20) -> Dict[str, Any]:
+    """
+    Candidates pruned per vaga and latency against scoring the whole corpus.
+
+    Args:
+        vagas_df: DataFrame with job vacancies (the first n_vagas are ranked)
+        applicants_df: DataFrame with applicant data
+        k: Ranking depth
+        weights: Weight per component of the overall score (default: SCORE_WEIGHTS)
+        n_vagas: Vagas ranked
+
+    Returns:
+        Dictionary with 'vagas' (vaga_id, candidates, scored, pruned, full_ms,
+        pruned_ms and identical, whether both top-k hold the same candidates
+        in the same order, per vaga) and the 'full_ms' and 'pruned_ms' medians
+    """
+    from helpers.batch_scorer import get_candidate_features
+    from helpers.data_store import lookup_row
+
+    features = get_candidate_features(applicants_df)
+    rows = []
+    for vaga_id in vagas_df['vaga_id'].head(n_vagas).tolist():
+        job = lookup_row(vagas_df, 'vaga_id', vaga_id)
+        start = time.perf_counter()
+        full = score_job(job, features, weights=weights)['overall_score']
+        full_top = top_k_indices(full, k)
+        full_ms = 1000 * (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        positions, scores, stats = score_job_top_k(job, features, k, weights)
+        pruned_top = positions[top_k_indices(scores['overall_score'], k)]
+        pruned_ms = 1000 * (time.perf_counter() - start)
+
+        rows.append({'vaga_id': vaga_id, **stats, 'full_ms': full_ms, 'pruned_ms': pruned_ms,
+                     'identical': bool(np.array_equal(full_top, pruned_top))})
+
+    return {
+        'vagas': rows,
+        'full_ms': float(np.median([row['full_ms'] for row in rows])) if rows else 0.0,
+        'pruned_ms': float(np.median([row['pruned_ms'] for row in rows])) if rows else 0.0
+    }
+
+if __name__ == '__main__':
+    import argparse
+    from helpers.data_loader import load_data
+
+    parser = argparse.ArgumentParser(description="Poda por limite superior do score geral no top-k.")
+    parser.add_argument('--k', type=int, default=10, help="Profundidade do ranking")
+    parser.add_argument('--vagas', type=int, default=20, help="Vagas avaliadas")
+    args = parser.parse_args()
+
+    vagas_df, _, applicants_df = load_data()
+    report = pruning_report(vagas_df, applicants_df, args.k, n_vagas=args.vagas)
+    for row in report['vagas']:
+        print(f"Vaga {row['vaga_id']}: {row['pruned']}/{row['candidates']} podados, "
+              f"{row['pruned_ms']:.2f} ms (completo {row['full_ms']:.2f} ms)"
+              f"{'' if row['identical'] else ' - top-k diferente!'}")
+    print(f"Mediana: {report['pruned_ms']:.2f} ms com poda, {report['full_ms']:.2f} ms sem")
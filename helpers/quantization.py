@@ -0,0 +1,182 @@
+import numpy as np
+from typing import Any, Dict, Optional
+from helpers.embedding_store import EmbeddingStore
+
+# Storage modes of the quantized candidate embeddings
+QUANTIZATION_MODES = ['float16', 'int8']
+
+# Hits rescored against the full-precision embeddings after a quantized pass
+DEFAULT_RESCORE = 300
+
+# Rows converted to float32 at a time while scoring, bounding the temporary copy
+_CHUNK_ROWS = 65_536
+
+class QuantizedEmbeddings:
+    """
+    Reduced-precision copy of an embedding matrix for approximate scoring.
+
+    float16 halves a float32 matrix (a quarter of float64). int8 stores each
+    vector divided by its own scale (max |value| / 127) plus that float32
+    scale, about 1 byte per dimension. Scores are inner products with the
+    dequantized vectors, computed in row chunks.
+    """
+
+    def __init__(self, mode: str, data: np.ndarray, scales: Optional[np.ndarray] = None):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode '{mode}' (available: {', '.join(QUANTIZATION_MODES)})")
+        if mode == 'int8' and (scales is None or len(scales) != len(data)):
+            raise ValueError("int8 embeddings need one scale per vector")
+        self.mode = mode
+        self.data = data
+        self.scales = scales
+
+    def __len__(self) -> int:
+        return self.data.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.data.nbytes + (self.scales.nbytes if self.scales is not None else 0))
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, mode: str) -> 'QuantizedEmbeddings':
+        """
+        Quantize an embedding matrix.
+
+        Args:
+            matrix: Full-precision embeddings, one row per vector
+            mode: 'float16' or 'int8'
+
+        Returns:
+            QuantizedEmbeddings of the matrix
+        """
+        if mode == 'float16':
+            return cls(mode, np.asarray(matrix, dtype=np.float16))
+
+        data = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(matrix.shape[0], dtype=np.float32)
+        for start in range(0, matrix.shape[0], _CHUNK_ROWS):
+            chunk = np.asarray(matrix[start:start + _CHUNK_ROWS], dtype=np.float32)
+            chunk_scales = np.abs(chunk).max(axis=1, initial=0.0) / 127
+            divisor = np.where(chunk_scales > 0, chunk_scales, 1.0)[:, None]
+            data[start:start + len(chunk)] = np.clip(np.rint(chunk / divisor), -127, 127)
+            scales[start:start + len(chunk)] = chunk_scales
+        return cls(mode, data, scales)
+
+    def dot(self, vector: np.ndarray, positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Approximate inner product of every (or the selected) vector with a query.
+
+        Args:
+            vector: Full-precision query vector
+            positions: Optional row positions to score
+
+        Returns:
+            Array of scores aligned with positions when given
+        """
+        query = np.asarray(vector, dtype=np.float32)
+        data = self.data if positions is None else self.data[positions]
+        scales = self.scales if positions is None or self.scales is None else self.scales[positions]
+
+        scores = np.empty(data.shape[0], dtype=np.float64)
+        for start in range(0, data.shape[0], _CHUNK_ROWS):
+            end = start + _CHUNK_ROWS
+            scores[start:end] = data[start:end].astype(np.float32) @ query
+        if scales is not None:
+            scores *= scales
+        return scores
+
+def get_quantized_embeddings(features: Any, mode: str,
+                             embedding_store: Optional[EmbeddingStore] = None) -> QuantizedEmbeddings:
+    """
+    Quantized embeddings of a featurized corpus, built on first use.
+
+    They are kept on the features object and, when the embeddings come
+    from the embedding store, saved next to that version of the store.
+
+    Args:
+        features: CandidateFeatures whose embeddings are quantized
+        mode: 'float16' or 'int8'
+        embedding_store: Store the embeddings came from (default: next to applicants.csv)
+
+    Returns:
+        QuantizedEmbeddings aligned with the candidates
+    """
+    cache = getattr(features, '_quantized', None)
+    if cache is None:
+        cache = features._quantized = {}
+    if mode in cache:
+        return cache[mode]
+
+    quantized = None
+    version = features.embedding_version
+    store = embedding_store or EmbeddingStore()
+    parts = ['data', 'scales'] if mode == 'int8' else ['data']
+    if version is not None:
+        stored = store.load_derived(version, mode, parts)
+        if stored is not None and len(stored['data']) == len(features):
+            quantized = QuantizedEmbeddings(mode, stored['data'], stored.get('scales'))
+
+    if quantized is None:
+        quantized = QuantizedEmbeddings.from_matrix(features.embeddings, mode)
+        if version is not None:
+            store.save_derived(version, mode, {'data': quantized.data, 'scales': quantized.scales}
+                               if mode == 'int8' else {'data': quantized.data})
+
+    cache[mode] = quantized
+    return quantized
+
+def quantization_report(vagas_df, applicants_df, mode: str, k: int = 10,
+                        rescore: int = DEFAULT_RESCORE, n_vagas: int = 20) -> Dict[str, float]:
+    """
+    Memory saved by a quantization mode and its ranking agreement with full precision.
+
+    Args:
+        vagas_df: DataFrame with job vacancies (the first n_vagas are ranked)
+        applicants_df: DataFrame with applicant data
+        mode: 'float16' or 'int8'
+        k: Ranking depth compared
+        rescore: Hits rescored exactly (0 = quantized scores only)
+        n_vagas: Vagas ranked
+
+    Returns:
+        Dictionary with 'full_bytes', 'quantized_bytes', 'saved_bytes' and
+        'overlap_at_k' (mean fraction of the exact top-k also returned)
+    """
+    from helpers.batch_scorer import get_candidate_features
+    from helpers.similarity_calculator import find_matching_candidates
+
+    features = get_candidate_features(applicants_df)
+    quantized = get_quantized_embeddings(features, mode)
+
+    overlaps = []
+    for vaga_id in vagas_df['vaga_id'].head(n_vagas).tolist():
+        exact = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=k, use_ann=False, workers=1)
+        approximate = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=k, use_ann=False,
+                                               workers=1, quantization=mode, rescore=rescore)
+        if not exact.empty:
+            overlaps.append(len(set(exact['codigo']) & set(approximate['codigo'])) / len(exact))
+
+    full_bytes = int(features.embeddings.nbytes)
+    return {
+        'full_bytes': full_bytes,
+        'quantized_bytes': quantized.nbytes,
+        'saved_bytes': full_bytes - quantized.nbytes,
+        'overlap_at_k': float(np.mean(overlaps)) if overlaps else 1.0
+    }
+
+if __name__ == '__main__':
+    import argparse
+    from helpers.data_loader import load_data
+
+    parser = argparse.ArgumentParser(description="Compara embeddings quantizados com a precisão completa.")
+    parser.add_argument('--k', type=int, default=10, help="Profundidade do ranking comparado")
+    parser.add_argument('--vagas', type=int, default=20, help="Vagas avaliadas")
+    args = parser.parse_args()
+
+    vagas_df, _, applicants_df = load_data()
+    for mode in QUANTIZATION_MODES:
+        for rescore in [0, DEFAULT_RESCORE]:
+            report = quantization_report(vagas_df, applicants_df, mode, args.k, rescore, args.vagas)
+            print(f"{mode:<8} rescore={rescore:<4} memória {report['quantized_bytes'] / 1e6:.1f} MB "
+                  f"(de {report['full_bytes'] / 1e6:.1f} MB, economia {report['saved_bytes'] / 1e6:.1f} MB), "
+                  f"overlap@{args.k} {report['overlap_at_k']:.3f}")
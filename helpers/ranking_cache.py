@@ -0,0 +1,345 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+import pandas as pd
+from typing import Any, Dict, Optional, Tuple
+from helpers.data_store import frame_version, normalize_key
+from helpers.skill_extractor import get_skill_extractor
+
+# Bump when the layout of the cached rankings changes
+RANKING_CACHE_FORMAT_VERSION = 1
+
+# Memory held by the in-process tier before the least recently used rankings are evicted
+DEFAULT_MEMORY_BUDGET_BYTES = 64 << 20
+
+# Disk tier, next to the other caches of the app
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'rankings')
+
+# Size of the disk tier before the least recently used rankings are deleted
+DEFAULT_DISK_BUDGET_BYTES = 256 << 20
+
+# Directories of other data versions are only deleted once nothing was written
+# to them for this long (another process may still be serving that version)
+STALE_VERSION_GRACE_SECONDS = 600
+
+def ranking_data_version(vagas_df: pd.DataFrame, applicants_df: pd.DataFrame) -> Optional[str]:
+    """
+    Data version a ranking over these frames depends on.
+
+    Besides the snapshot of the frames, it covers the skill taxonomy the
+    skill scores are extracted with, so editing the taxonomy (even a single
+    form of a skill) invalidates both tiers.
+
+    Args:
+        vagas_df: DataFrame with job vacancies
+        applicants_df: DataFrame with applicant data
+
+    Returns:
+        Hex digest, or None when either frame was not loaded through a
+        versioned DataStore (not cacheable)
+    """
+    vagas_version, applicants_version = frame_version(vagas_df), frame_version(applicants_df)
+    if vagas_version is None or applicants_version is None:
+        return None
+    combined = f'{vagas_version}\0{applicants_version}\0{get_skill_extractor().digest}'.encode('utf-8')
+    return hashlib.blake2b(combined, digest_size=8).hexdigest()
+
+def ranking_key(vaga_id: Any, weights: Dict[str, float], backend: Dict[str, Any]) -> str:
+    """
+    Identifier of a ranking within a data version.
+
+    Args:
+        vaga_id: Ranked vaga
+        weights: Weight of each score component
+        backend: Everything else that changes the scores (embedder, text
+            backend, approximation options)
+
+    Returns:
+        Hex digest
+    """
+    key = json.dumps({'format': RANKING_CACHE_FORMAT_VERSION, 'vaga_id': normalize_key(vaga_id),
+                      'weights': weights, 'backend': backend}, sort_keys=True, default=str)
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+class RankingCache:
+    """
+    Two-tier cache of ranked candidate tables.
+
+    Rankings are keyed by vaga, scoring weights and backend within a data
+    version. The memory tier is an LRU bounded by the deep size of the
+    cached DataFrames. Rankings put with persist=True (the top_n tables,
+    not whole-corpus score tables) are also written to a Parquet file under
+    a directory per data version, so they survive restarts and are shared
+    between processes; that tier is bounded too, deleting the least
+    recently used files. A ranking computed with top_n rows answers any
+    request for top_n rows or fewer.
+
+    As soon as a lookup or insert arrives with a new data version, the
+    memory entries of the other versions are dropped. Their directories
+    are deleted once no process has written to them for
+    STALE_VERSION_GRACE_SECONDS; a directory is first renamed away in one
+    atomic step, so a process still writing to it just fails that write.
+    """
+
+    def __init__(self, memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES,
+                 directory: Optional[str] = DEFAULT_CACHE_DIR,
+                 disk_budget_bytes: int = DEFAULT_DISK_BUDGET_BYTES):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.directory = directory
+        self.disk_budget_bytes = disk_budget_bytes
+        # (version, key) -> (depth, DataFrame, bytes)
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[int, pd.DataFrame, int]]' = OrderedDict()
+        self._memory_bytes = 0
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters of the cache.
+
+        Returns:
+            Dictionary with 'hits' (memory + disk), 'memory_hits', 'disk_hits',
+            'misses', 'evictions' (memory tier), 'invalidations' (data version
+            changes), 'entries' and 'memory_bytes'
+        """
+        with self._lock:
+            return {
+                'hits': self.counters['memory_hits'] + self.counters['disk_hits'],
+                **self.counters,
+                'entries': len(self._entries),
+                'memory_bytes': self._memory_bytes
+            }
+
+    def _check_version(self, version: str) -> None:
+        # Called with the lock held
+        if version == self._version:
+            return
+        if self._version is not None:
+            self.counters['invalidations'] += 1
+        self._version = version
+        for entry_key in [entry_key for entry_key in self._entries if entry_key[0] != version]:
+            self._memory_bytes -= self._entries.pop(entry_key)[2]
+
+    def _path(self, version: str, key: str) -> str:
+        return os.path.join(self.directory, version, f'{key}.parquet')
+
+    def get(self, version: str, key: str, top_n: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        Cached ranking, if one at least top_n rows deep exists.
+
+        Args:
+            version: Data version (see ranking_data_version)
+            key: Ranking key (see ranking_key)
+            top_n: Rows requested (None = the whole cached table)
+
+        Returns:
+            Copy of the best top_n rows, or None on a miss
+        """
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get((version, key))
+            if entry is not None and _covers(entry[0], entry[1], top_n):
+                self._entries.move_to_end((version, key))
+                self.counters['memory_hits'] += 1
+                return _head(entry[1], top_n)
+
+        stored = self._read(version, key)
+        if stored is not None and _covers(stored[0], stored[1], top_n):
+            self._touch(version, key)
+            with self._lock:
+                self.counters['disk_hits'] += 1
+                self._remember(version, key, *stored)
+            return _head(stored[1], top_n)
+
+        with self._lock:
+            self.counters['misses'] += 1
+        return None
+
+    def put(self, version: str, key: str, top_n: int, ranking: pd.DataFrame, persist: bool = True) -> None:
+        """
+        Store a ranking computed with top_n rows.
+
+        Args:
+            version: Data version (see ranking_data_version)
+            key: Ranking key (see ranking_key)
+            top_n: Rows that were requested
+            ranking: Ranked candidates (copied)
+            persist: Also write it to the disk tier (False for tables as
+                large as the corpus, which stay in memory only)
+        """
+        ranking = ranking.copy()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get((version, key))
+            if entry is not None and entry[0] >= top_n:
+                return
+            self._remember(version, key, top_n, ranking)
+
+        if self.directory is not None and persist:
+            self._write(version, key, top_n, ranking)
+            self._enforce_disk_budget(version)
+            self._remove_stale_versions(version)
+
+    def clear(self) -> None:
+        """Drop every entry, in memory and on disk (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+            self._version = None
+        if self.directory is not None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _remember(self, version: str, key: str, depth: int, ranking: pd.DataFrame) -> None:
+        # Called with the lock held
+        nbytes = int(ranking.memory_usage(index=True, deep=True).sum())
+        previous = self._entries.pop((version, key), None)
+        if previous is not None:
+            self._memory_bytes -= previous[2]
+        if nbytes > self.memory_budget_bytes:
+            # Larger than the whole tier: disk only
+            return
+        self._entries[(version, key)] = (depth, ranking, nbytes)
+        self._memory_bytes += nbytes
+        while self._memory_bytes > self.memory_budget_bytes:
+            _, (_, _, evicted_bytes) = self._entries.popitem(last=False)
+            self._memory_bytes -= evicted_bytes
+            self.counters['evictions'] += 1
+
+    def _read(self, version: str, key: str) -> Optional[Tuple[int, pd.DataFrame]]:
+        if self.directory is None:
+            return None
+        import pyarrow.parquet as pq
+
+        try:
+            table = pq.read_table(self._path(version, key))
+            metadata = json.loads((table.schema.metadata or {}).get(b'ranking_cache', b'{}'))
+        except (OSError, ValueError):
+            return None
+        if metadata.get('format') != RANKING_CACHE_FORMAT_VERSION:
+            return None
+        return int(metadata['top_n']), table.to_pandas()
+
+    def _write(self, version: str, key: str, top_n: int, ranking: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self._path(version, key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            table = pa.Table.from_pandas(ranking, preserve_index=False)
+            metadata = json.dumps({'format': RANKING_CACHE_FORMAT_VERSION, 'top_n': top_n})
+            table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                                   b'ranking_cache': metadata.encode('utf-8')})
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            pass
+
+    def _touch(self, version: str, key: str) -> None:
+        # Disk hits count as uses for the LRU order of the disk tier
+        try:
+            os.utime(self._path(version, key))
+        except OSError:
+            pass
+
+    def _enforce_disk_budget(self, version: str) -> None:
+        directory = os.path.join(self.directory, version)
+        files = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith('.parquet'):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_budget_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def _remove_stale_versions(self, current_version: str) -> None:
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        now = time.time()
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if name == current_version:
+                continue
+            try:
+                if now - os.stat(path).st_mtime < STALE_VERSION_GRACE_SECONDS:
+                    continue
+                if not name.startswith('.stale-'):
+                    # Renamed first: the directory disappears from its version in one step
+                    stale_path = os.path.join(self.directory, f'.stale-{name}-{os.getpid()}-{threading.get_ident()}')
+                    os.rename(path, stale_path)
+                    path = stale_path
+            except OSError:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+
+def _covers(depth: int, ranking: pd.DataFrame, top_n: Optional[int]) -> bool:
+    # A shorter ranking than requested means the corpus was exhausted
+    return top_n is None or depth >= top_n or len(ranking) < depth
+
+def _head(ranking: pd.DataFrame, top_n: Optional[int]) -> pd.DataFrame:
+    return (ranking if top_n is None else ranking.head(top_n)).copy()
+
+_default_cache: Optional[RankingCache] = None
+_default_cache_lock = threading.Lock()
+
+def get_ranking_cache() -> RankingCache:
+    """
+    Ranking cache shared by the whole process.
+
+    Returns:
+        RankingCache with the default budget and directory
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = RankingCache()
+        return _default_cache
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    from helpers.data_loader import load_data
+    from helpers.similarity_calculator import find_matching_candidates
+    # The instance find_matching_candidates uses (this file also runs as __main__)
+    from helpers.ranking_cache import get_ranking_cache
+
+    parser = argparse.ArgumentParser(description="Latência do ranking com e sem o cache de rankings.")
+    parser.add_argument('command', nargs='?', choices=['bench', 'clear'], default='bench',
+                        help="bench: ranqueia as vagas duas vezes; clear: apaga o cache em disco")
+    parser.add_argument('--vagas', type=int, default=20, help="Vagas ranqueadas")
+    parser.add_argument('--top-n', type=int, default=10, help="Candidatos por vaga")
+    args = parser.parse_args()
+
+    cache = get_ranking_cache()
+    if args.command == 'clear':
+        cache.clear()
+        print(f"Cache de rankings apagado ({cache.directory})")
+    else:
+        vagas_df, _, applicants_df = load_data()
+        vaga_ids = vagas_df['vaga_id'].head(args.vagas).tolist()
+        for label in ['primeira passada', 'segunda passada']:
+            start = time.perf_counter()
+            for vaga_id in vaga_ids:
+                find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=args.top_n)
+            elapsed = (time.perf_counter() - start) / max(len(vaga_ids), 1)
+            print(f"{label}: {1000 * elapsed:.2f} ms por vaga")
+        print(f"Contadores: {cache.stats()}")
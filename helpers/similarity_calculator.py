@@ -1,9 +1,33 @@
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional
 import streamlit as st
-from sklearn.metrics.pairwise import cosine_similarity
-from helpers.text_processor import encode_text, preprocess_text, extract_skills
+from helpers.text_processor import (
+    encode_text,
+    preprocess_text,
+    extract_skills,
+    education_level_to_int,
+    language_level_to_int,
+)
+from helpers.ann_index import ANN_MIN_CANDIDATES, get_ann_index
+from helpers.parallel_scorer import PARALLEL_MIN_CANDIDATES, default_workers, get_parallel_scorer
+from helpers.data_store import key_index, lookup_row, lookup_rows, normalize_keys
+from helpers.embedders import get_embedder
+from helpers.projection import get_projected_embeddings
+from helpers.pruning import score_job_top_k
+from helpers.quantization import DEFAULT_RESCORE, get_quantized_embeddings
+from helpers.ranking_cache import get_ranking_cache, ranking_data_version, ranking_key
+from helpers.text_index import get_text_index
+from helpers.batch_scorer import (
+    SCORE_COMPONENTS,
+    component_matrix,
+    get_candidate_features,
+    job_embedding,
+    resolve_weights,
+    score_job,
+    top_k_indices,
+    weight_vector,
+)
 
 def calculate_cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
     """
@@ -16,6 +40,9 @@ def calculate_cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
     Returns:
         Cosine similarity score between 0 and 1
     """
+    # sklearn is imported on first use, not with the module
+    from sklearn.metrics.pairwise import cosine_similarity
+    
     if vec1.ndim == 1:
         vec1 = vec1.reshape(1, -1)
     if vec2.ndim == 1:
@@ -60,36 +87,9 @@ def calculate_education_level_match(job_level: str, candidate_level: str) -> flo
     Returns:
         Education match score between 0 and 1
     """
-    education_levels = {
-        'ensino fundamental': 1,
-        'ensino médio': 2,
-        'ensino médio completo': 2,
-        'ensino técnico': 3,
-        'ensino técnico completo': 3,
-        'ensino superior': 4,
-        'ensino superior cursando': 4,
-        'ensino superior incompleto': 4,
-        'ensino superior completo': 5,
-        'pós-graduação': 6,
-        'especialização': 6,
-        'mba': 6,
-        'mestrado': 7,
-        'doutorado': 8
-    }
-    
-    # Normalize inputs to lowercase
-    job_level_lower = job_level.lower() if isinstance(job_level, str) else ''
-    candidate_level_lower = candidate_level.lower() if isinstance(candidate_level, str) else ''
-    
     # Get education level integers or default to 0
-    job_level_num = 0
-    candidate_level_num = 0
-    
-    for level, value in education_levels.items():
-        if level in job_level_lower:
-            job_level_num = value
-        if level in candidate_level_lower:
-            candidate_level_num = value
+    job_level_num = education_level_to_int(job_level)
+    candidate_level_num = education_level_to_int(candidate_level)
     
     # If no education requirement for job, return 1.0 (match)
     if job_level_num == 0:
@@ -113,27 +113,9 @@ def calculate_language_match(job_language_level: str, candidate_language_level:
     Returns:
         Language match score between 0 and 1
     """
-    language_levels = {
-        'nenhum': 0,
-        'básico': 1,
-        'intermediário': 2,
-        'avançado': 3,
-        'fluente': 4
-    }
-    
-    # Normalize inputs to lowercase
-    job_level_lower = job_language_level.lower() if isinstance(job_language_level, str) else ''
-    candidate_level_lower = candidate_language_level.lower() if isinstance(candidate_language_level, str) else ''
-    
     # Get language level integers or default to 0
-    job_level_num = 0
-    candidate_level_num = 0
-    
-    for level, value in language_levels.items():
-        if level in job_level_lower:
-            job_level_num = value
-        if level in candidate_level_lower:
-            candidate_level_num = value
+    job_level_num = language_level_to_int(job_language_level)
+    candidate_level_num = language_level_to_int(candidate_language_level)
     
     # If no language requirement for job, return 1.0 (match)
     if job_level_num == 0:
@@ -146,13 +128,15 @@ def calculate_language_match(job_language_level: str, candidate_language_level:
     # If candidate is below the requirement, partial match based on how close
     return candidate_level_num / job_level_num if job_level_num > 0 else 0.0
 
-def calculate_similarity(job_data: pd.Series, candidate_data: pd.Series) -> Dict[str, float]:
+def calculate_similarity(job_data: pd.Series, candidate_data: pd.Series,
+                         weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
     """
     Calculate overall similarity between a job and a candidate.
     
     Args:
         job_data: Series containing job data
         candidate_data: Series containing candidate data
+        weights: Weight per score category (default: SCORE_WEIGHTS)
     
     Returns:
         Dictionary with similarity scores by category and overall score
@@ -220,14 +204,6 @@ def calculate_similarity(job_data: pd.Series, candidate_data: pd.Series) -> Dict
     )
     
     # Calculate overall match score with weights
-    weights = {
-        'text_similarity': 0.35,
-        'skill_match': 0.35,
-        'education_match': 0.1,
-        'english_match': 0.1,
-        'spanish_match': 0.1
-    }
-    
     scores = {
         'text_similarity': text_similarity,
         'skill_match': skill_match,
@@ -236,13 +212,257 @@ def calculate_similarity(job_data: pd.Series, candidate_data: pd.Series) -> Dict
         'spanish_match': spanish_match
     }
     
+    weights = resolve_weights(weights)
     overall_score = sum(score * weights[category] for category, score in scores.items())
     scores['overall_score'] = overall_score
     
     return scores
 
+class VagaRanking:
+    """
+    Component scores of every candidate scored for a vaga.
+    
+    Built once by rank_vaga; top() then selects and orders candidates
+    with array operations only, so changing the threshold, the number of
+    candidates, the ordering or the weights does not rescore anything.
+    Candidates are the whole corpus, or the ANN shortlist / rescored hits
+    when those were used.
+    
+    The five components are kept as a float32 candidates x components
+    matrix; the overall score under other weights is one mat-vec with it.
+    The overall score under the weights the vaga was scored with is kept
+    as computed, so the default ranking equals score_job exactly.
+    """
+    
+    def __init__(self, applicants_df: pd.DataFrame, positions: Optional[np.ndarray],
+                 components: np.ndarray, overall: np.ndarray, weights: Optional[Dict[str, float]] = None):
+        self.applicants_df = applicants_df
+        # Row positions in applicants_df of the scored candidates (None = every row)
+        self.positions = positions
+        self.components = components
+        self.overall = overall
+        self.weights = resolve_weights(weights)
+        # Overall scores of the last weights asked for
+        self._weighted: Optional[Tuple[Tuple[float, ...], np.ndarray]] = None
+    
+    def __len__(self) -> int:
+        return len(self.overall)
+    
+    @property
+    def nbytes(self) -> int:
+        # The applicants DataFrame is shared, not held by the ranking
+        return int(self.components.nbytes + self.overall.nbytes
+                   + (self.positions.nbytes if self.positions is not None else 0))
+    
+    @classmethod
+    def from_scores(cls, applicants_df: pd.DataFrame, positions: Optional[np.ndarray],
+                    scores: Dict[str, np.ndarray], weights: Optional[Dict[str, float]] = None) -> 'VagaRanking':
+        """Ranking of the score arrays returned by score_job with the given weights."""
+        return cls(applicants_df, positions, component_matrix(scores), scores['overall_score'], weights)
+    
+    @classmethod
+    def from_table(cls, applicants_df: pd.DataFrame, table: pd.DataFrame,
+                   weights: Optional[Dict[str, float]] = None) -> 'VagaRanking':
+        """Rebuild a ranking from its table() (e.g. read from the ranking cache)."""
+        components = table[SCORE_COMPONENTS].to_numpy(dtype=np.float32)
+        return cls(applicants_df, table['position'].to_numpy(), components, table['overall_score'].to_numpy(), weights)
+    
+    def table(self) -> pd.DataFrame:
+        """Row position in applicants_df and scores of every candidate."""
+        positions = self.positions if self.positions is not None else np.arange(len(self))
+        return pd.DataFrame({'position': positions, 'overall_score': self.overall,
+                             **{name: self.components[:, column] for column, name in enumerate(SCORE_COMPONENTS)}})
+    
+    def overall_scores(self, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """
+        Overall score of every candidate under a weighting.
+        
+        Args:
+            weights: Weight per component (default: the weights the vaga was scored with)
+        
+        Returns:
+            Array with one overall score per candidate
+        """
+        if weights is None:
+            return self.overall
+        vector = weight_vector(weights)
+        key = tuple(vector.tolist())
+        if key == tuple(weight_vector(self.weights).tolist()):
+            return self.overall
+        if self._weighted is None or self._weighted[0] != key:
+            self._weighted = (key, (self.components @ vector).astype(np.float64))
+        return self._weighted[1]
+    
+    def top(self, top_n: Optional[int] = None, threshold: float = 0.0, skill_first: bool = False,
+            weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+        """
+        Best candidates as a results table.
+        
+        Args:
+            top_n: Number of candidates to return (None = every candidate
+                above the threshold)
+            threshold: Minimum overall score
+            skill_first: Order the selected candidates by skill match, then
+                overall score (the selection is still the top_n by overall score)
+            weights: Weight per component of the overall score (default:
+                the weights the vaga was scored with)
+        
+        Returns:
+            DataFrame with the find_matching_candidates columns
+        """
+        overall = self.overall_scores(weights)
+        k = top_n if top_n is not None else 0
+        if threshold > 0:
+            eligible = np.flatnonzero(overall >= threshold)
+            selected = eligible[top_k_indices(overall[eligible], k)]
+        else:
+            selected = top_k_indices(overall, k)
+        if skill_first:
+            # lexsort is stable: ties keep the overall order
+            skill_match = self.components[selected, SCORE_COMPONENTS.index('skill_match')]
+            selected = selected[np.lexsort((-overall[selected], -skill_match))]
+        return self._results_frame(selected, overall)
+    
+    def _results_frame(self, selected: np.ndarray, overall: np.ndarray) -> pd.DataFrame:
+        rows = selected if self.positions is None else self.positions[selected]
+        candidates = self.applicants_df.iloc[rows]
+        components = self.components[selected].astype(np.float64)
+        
+        def column(name: str) -> List[Any]:
+            return candidates[name].tolist() if name in candidates.columns else [''] * len(candidates)
+        
+        return pd.DataFrame({
+            'codigo': column('codigo_profissional'),
+            'nome': column('nome'),
+            'area_atuacao': column('area_atuacao'),
+            'nivel_academico': column('nivel_academic'),
+            'nivel_ingles': column('nivel_ingles'),
+            'nivel_espanhol': column('nivel_espanhol'),
+            'overall_score': overall[selected],
+            **{name: components[:, column] for column, name in enumerate(SCORE_COMPONENTS)}
+        })
+
+def select_matches(matches_df: pd.DataFrame, top_n: Optional[int] = None, threshold: float = 0.0,
+                   skill_first: bool = False) -> pd.DataFrame:
+    """
+    VagaRanking.top() for a results table already ordered by overall score
+    (e.g. the precomputed batch table).
+    
+    Args:
+        matches_df: DataFrame with the find_matching_candidates columns
+        top_n: Number of candidates to return (None = every candidate
+            above the threshold)
+        threshold: Minimum overall score
+        skill_first: Order the selected candidates by skill match, then overall score
+    
+    Returns:
+        DataFrame with the selected candidates
+    """
+    if threshold > 0:
+        matches_df = matches_df[matches_df['overall_score'] >= threshold]
+    if top_n is not None and top_n > 0:
+        matches_df = matches_df.head(top_n)
+    if skill_first:
+        matches_df = matches_df.sort_values(['skill_match', 'overall_score'], ascending=False, kind='stable')
+    return matches_df.reset_index(drop=True)
+
+def rank_vaga(vagas_df: pd.DataFrame, applicants_df: pd.DataFrame, vaga_id: str,
+              use_ann: Optional[bool] = None, ann_candidates: int = 1000, workers: Optional[int] = None,
+              text_backend: str = 'dense', quantization: Optional[str] = None,
+              projection_dim: Optional[int] = None, projection_method: str = 'pca',
+              rescore: int = DEFAULT_RESCORE, use_cache: bool = True,
+              weights: Optional[Dict[str, float]] = None) -> Optional[VagaRanking]:
+    """
+    Score the candidates of a vaga once, keeping every component score.
+    
+    Takes the scoring options of find_matching_candidates. With use_cache,
+    the scores are shared with the other sessions of the process through
+    the memory tier of the ranking cache (they cover the whole corpus, so
+    they are not written to disk). The weights only pick the rescored hits of an
+    approximate pass; the ranking can be re-weighted afterwards.
+    
+    Returns:
+        VagaRanking, or None when the vaga does not exist or there are no applicants
+    """
+    if quantization is not None and projection_dim is not None:
+        raise ValueError("Use either quantization or projection_dim, not both")
+    
+    # Get job data
+    job_series = lookup_row(vagas_df, 'vaga_id', vaga_id)
+    if job_series is None or applicants_df.empty:
+        return None
+    
+    if use_ann is None:
+        use_ann = len(applicants_df) >= ANN_MIN_CANDIDATES
+    weights = resolve_weights(weights)
+    
+    data_version = ranking_data_version(vagas_df, applicants_df) if use_cache else None
+    if data_version is not None:
+        backend = _cache_backend(use_ann, ann_candidates, text_backend, quantization, projection_dim,
+                                 projection_method, rescore)
+        cache_key = ranking_key(vaga_id, weights, dict(backend, table='scores'))
+        cached = get_ranking_cache().get(data_version, cache_key)
+        if cached is not None:
+            return VagaRanking.from_table(applicants_df, cached, weights)
+    
+    features = get_candidate_features(applicants_df)
+    text_index = None if text_backend == 'dense' else get_text_index(applicants_df, text_backend)
+    approximate = None
+    if quantization is not None and text_index is None:
+        approximate = get_quantized_embeddings(features, quantization)
+    elif projection_dim is not None and text_index is None:
+        approximate = get_projected_embeddings(features, projection_method, projection_dim)
+    
+    # Score every candidate at once using the pre-computed corpus features,
+    # or only the shortlist retrieved by text similarity through the ANN index
+    positions = None
+    if use_ann:
+        shortlist, _ = get_ann_index(features).search(job_embedding(job_series), ann_candidates)
+        positions = np.sort(shortlist)
+    
+    if workers is None:
+        workers = default_workers() if len(features) >= PARALLEL_MIN_CANDIDATES else 1
+    
+    # The sparse text index and the approximate matrices are scored in-process
+    if positions is None and workers > 1 and text_index is None and approximate is None:
+        similarity_scores = get_parallel_scorer(features, workers).score_job(job_series, weights)
+    else:
+        similarity_scores = score_job(job_series, features, positions, text_index, approximate, weights)
+    
+    if approximate is not None and rescore > 0:
+        # Rescore the best approximate hits with the full embeddings
+        hits = top_k_indices(similarity_scores['overall_score'], rescore)
+        hits = np.sort(hits if positions is None else positions[hits])
+        positions = hits
+        similarity_scores = score_job(job_series, features, positions, text_index, weights=weights)
+    
+    ranking = VagaRanking.from_scores(applicants_df, positions, similarity_scores, weights)
+    if data_version is not None:
+        # As large as the corpus: kept in the memory tier only
+        get_ranking_cache().put(data_version, cache_key, len(ranking), ranking.table(), persist=False)
+    return ranking
+
+def _cache_backend(use_ann: bool, ann_candidates: int, text_backend: str, quantization: Optional[str],
+                   projection_dim: Optional[int], projection_method: str, rescore: int) -> Dict[str, Any]:
+    # Options that change the scores, for the ranking cache key (approximations
+    # only apply to the dense text similarity)
+    dense = text_backend == 'dense'
+    return {
+        'embedder': get_embedder().name,
+        'text_backend': text_backend,
+        'ann_candidates': ann_candidates if use_ann else None,
+        'quantization': quantization if dense else None,
+        'projection': f'{projection_method}{projection_dim}' if dense and projection_dim is not None else None,
+        'rescore': rescore if dense and (quantization is not None or projection_dim is not None) else None
+    }
+
 def find_matching_candidates(vagas_df: pd.DataFrame, applicants_df: pd.DataFrame, vaga_id: str, 
-                            top_n: int = 10) -> pd.DataFrame:
+                            top_n: int = 10, use_ann: Optional[bool] = None,
+                            ann_candidates: int = 1000, workers: Optional[int] = None,
+                            text_backend: str = 'dense', quantization: Optional[str] = None,
+                            projection_dim: Optional[int] = None, projection_method: str = 'pca',
+                            rescore: int = DEFAULT_RESCORE, use_cache: bool = True,
+                            weights: Optional[Dict[str, float]] = None, prune: bool = False) -> pd.DataFrame:
     """
     Find the top N candidates matching a specific job.
     
@@ -251,62 +471,73 @@ def find_matching_candidates(vagas_df: pd.DataFrame, applicants_df: pd.DataFrame
         applicants_df: DataFrame with applicant data
         vaga_id: ID of the job vacancy to match against
         top_n: Number of top candidates to return
+        use_ann: Retrieve a shortlist through the approximate nearest-neighbour
+            index before the full rerank (default: only for very large corpora)
+        ann_candidates: Size of the shortlist retrieved by the index
+        workers: Processes scoring the full corpus in parallel (default: one
+            per CPU for very large corpora, otherwise 1 = single process)
+        text_backend: Engine of the text similarity: 'dense' (embeddings),
+            'tfidf' or 'bm25' (sparse index of the profiles)
+        quantization: Score the dense text similarity on 'float16' or 'int8'
+            embeddings (default: full precision)
+        projection_dim: Score the dense text similarity on embeddings
+            projected to this dimension (default: full dimension)
+        projection_method: Projection used with projection_dim: 'pca' or 'random'
+        rescore: With quantization or projection, hits rescored exactly
+            before the final ranking (0 keeps the approximate scores)
+        use_cache: Reuse rankings of the ranking cache (only for frames of a
+            versioned DataStore, see helpers.ranking_cache)
+        weights: Weight per score component in the overall score (default:
+            SCORE_WEIGHTS; components left out weigh 0)
+        prune: Skip the text similarity of candidates whose best possible
+            overall score cannot reach the top_n (same candidates and
+            scores, see helpers.pruning; exact dense scoring only, in-process)
     
     Returns:
         DataFrame with top matching candidates and their scores
     """
-    # Get job data
-    job_data = vagas_df[vagas_df['vaga_id'] == vaga_id]
-    if job_data.empty:
-        return pd.DataFrame()
-    
-    job_series = job_data.iloc[0]
+    if quantization is not None and projection_dim is not None:
+        raise ValueError("Use either quantization or projection_dim, not both")
     
-    # Calculate similarity for each candidate
-    results = []
-    
-    # Use a subset of candidates for better performance if the dataset is large
-    candidates_sample = applicants_df if len(applicants_df) < 1000 else applicants_df.sample(1000)
+    if lookup_row(vagas_df, 'vaga_id', vaga_id) is None or applicants_df.empty:
+        return pd.DataFrame()
     
-    for index, candidate in candidates_sample.iterrows():
-        candidate_dict = {}
-        # Convertendo pandas.Series para dict para evitar erros do tipo
-        if hasattr(candidate, 'to_dict'):
-            candidate_dict = candidate.to_dict()
-        else:
-            for col in applicants_df.columns:
-                candidate_dict[col] = candidate.get(col, '')
-                
-        similarity_scores = calculate_similarity(job_series, candidate)
-        
-        result = {
-            'codigo': candidate_dict.get('codigo_profissional', ''),
-            'nome': candidate_dict.get('nome', ''),
-            'area_atuacao': candidate_dict.get('area_atuacao', ''),
-            'nivel_academico': candidate_dict.get('nivel_academic', ''),
-            'nivel_ingles': candidate_dict.get('nivel_ingles', ''),
-            'nivel_espanhol': candidate_dict.get('nivel_espanhol', ''),
-            'overall_score': similarity_scores['overall_score'],
-            'text_similarity': similarity_scores['text_similarity'],
-            'skill_match': similarity_scores['skill_match'],
-            'education_match': similarity_scores['education_match'],
-            'english_match': similarity_scores['english_match'],
-            'spanish_match': similarity_scores['spanish_match']
-        }
-        results.append(result)
-    
-    # Create DataFrame and sort by overall score
-    results_df = pd.DataFrame(results) if results else pd.DataFrame()
-    
-    if not results_df.empty:
-        results_df = results_df.sort_values('overall_score', ascending=False)
-        if top_n > 0:
-            results_df = results_df.head(top_n)
+    if use_ann is None:
+        use_ann = len(applicants_df) >= ANN_MIN_CANDIDATES
+    weights = resolve_weights(weights)
+    
+    # Rankings already computed for this vaga, configuration and data version
+    data_version = ranking_data_version(vagas_df, applicants_df) if use_cache else None
+    if data_version is not None:
+        backend = _cache_backend(use_ann, ann_candidates, text_backend, quantization, projection_dim,
+                                 projection_method, rescore)
+        cache_key = ranking_key(vaga_id, weights, backend)
+        cached = get_ranking_cache().get(data_version, cache_key, top_n)
+        if cached is not None:
+            return cached
+    
+    if prune and not use_ann and text_backend == 'dense' and quantization is None and projection_dim is None:
+        # Only the candidates that can still reach the top_n are scored in full
+        job_series = lookup_row(vagas_df, 'vaga_id', vaga_id)
+        positions, scores, _ = score_job_top_k(job_series, get_candidate_features(applicants_df), top_n, weights)
+        ranking = VagaRanking.from_scores(applicants_df, positions, scores, weights)
+    else:
+        # The shortlist and the rescored hits must hold at least top_n candidates
+        ranking = rank_vaga(vagas_df, applicants_df, vaga_id, use_ann, max(ann_candidates, top_n), workers,
+                            text_backend, quantization, projection_dim, projection_method,
+                            max(rescore, top_n) if rescore > 0 else 0, use_cache=False, weights=weights)
+    
+    # Keep only the best candidates, ordered by overall score
+    results_df = ranking.top(top_n)
+    
+    if data_version is not None:
+        get_ranking_cache().put(data_version, cache_key, top_n, results_df)
     
     return results_df
 
 def get_candidates_by_vaga(vagas_df: pd.DataFrame, prospects_df: pd.DataFrame, applicants_df: pd.DataFrame, 
-                          vaga_id: str, include_scores: bool = True) -> pd.DataFrame:
+                          vaga_id: str, include_scores: bool = True, text_backend: str = 'dense',
+                          weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
     """
     Get all candidates who have applied for a specific job vacancy with similarity scores.
     
@@ -316,101 +547,113 @@ def get_candidates_by_vaga(vagas_df: pd.DataFrame, prospects_df: pd.DataFrame, a
         applicants_df: DataFrame with applicant data
         vaga_id: ID of the job vacancy to get candidates for
         include_scores: Whether to include similarity scores
+        text_backend: Engine of the text similarity ('dense', 'tfidf' or 'bm25')
+        weights: Weight per score component in the overall score (default: SCORE_WEIGHTS)
     
     Returns:
         DataFrame with candidates and their information
     """
     # Get job data
-    job_data = vagas_df[vagas_df['vaga_id'] == vaga_id]
-    if job_data.empty:
+    job_series = lookup_row(vagas_df, 'vaga_id', vaga_id)
+    if job_series is None:
         return pd.DataFrame()
     
-    job_series = job_data.iloc[0]
-    
     # Get prospects for this job
-    job_prospects = prospects_df[prospects_df['vaga_id'] == vaga_id]
+    job_prospects = lookup_rows(prospects_df, 'vaga_id', vaga_id)
     
     if job_prospects.empty:
         return pd.DataFrame()
     
-    # Get candidate codes and convert to list (avoiding .unique() on series)
-    # This é uma alternativa ao .unique() para evitar erros de tipo
-    prospect_codes = list(set(job_prospects['codigo'].tolist()))
-    
-    # Get candidate information
-    results = []
-    for code in prospect_codes:
-        # Find candidate in applicants data
-        candidate_data = applicants_df[applicants_df['codigo_profissional'] == code]
-        if candidate_data.empty:
-            # If candidate not found in applicants data, use prospect data
-            prospect_matches = job_prospects[job_prospects['codigo'] == code]
-            if prospect_matches.empty:
-                continue
-                
-            prospect_data = prospect_matches.iloc[0]
-            prospect_dict = prospect_data.to_dict() if hasattr(prospect_data, 'to_dict') else {}
-                
-            candidate = {
-                'codigo': code,
-                'nome': prospect_dict.get('nome', ''),
-                'area_atuacao': '',
-                'situacao': prospect_dict.get('situacao_candidado', ''),
-                'data_candidatura': prospect_dict.get('data_candidatura', ''),
-                'recrutador': prospect_dict.get('recrutador', '')
-            }
-            
-            if include_scores:
-                candidate.update({
-                    'overall_score': 0,
-                    'text_similarity': 0,
-                    'skill_match': 0,
-                    'education_match': 0,
-                    'english_match': 0,
-                    'spanish_match': 0
-                })
-        else:
-            # Use applicant data
-            candidate_series = candidate_data.iloc[0]
-            prospect_matches = job_prospects[job_prospects['codigo'] == code]
-            if prospect_matches.empty:
-                continue
-                
-            prospect_data = prospect_matches.iloc[0]
-            candidate_dict = candidate_series.to_dict() if hasattr(candidate_series, 'to_dict') else {}
-            prospect_dict = prospect_data.to_dict() if hasattr(prospect_data, 'to_dict') else {}
-            
-            candidate = {
-                'codigo': code,
-                'nome': candidate_dict.get('nome', ''),
-                'area_atuacao': candidate_dict.get('area_atuacao', ''),
-                'nivel_academico': candidate_dict.get('nivel_academic', ''),
-                'nivel_ingles': candidate_dict.get('nivel_ingles', ''),
-                'nivel_espanhol': candidate_dict.get('nivel_espanhol', ''),
-                'situacao': prospect_dict.get('situacao_candidado', ''),
-                'data_candidatura': prospect_dict.get('data_candidatura', ''),
-                'recrutador': prospect_dict.get('recrutador', '')
-            }
-            
-            if include_scores:
-                # Calculate similarity scores
-                similarity_scores = calculate_similarity(job_series, candidate_series)
-                candidate.update({
-                    'overall_score': similarity_scores['overall_score'],
-                    'text_similarity': similarity_scores['text_similarity'],
-                    'skill_match': similarity_scores['skill_match'],
-                    'education_match': similarity_scores['education_match'],
-                    'english_match': similarity_scores['english_match'],
-                    'spanish_match': similarity_scores['spanish_match']
-                })
-        
-        results.append(candidate)
+    # One entry per candidate code (its first prospect row), joined to the
+    # applicants through the hash index on codigo_profissional
+    job_prospects = job_prospects[~pd.Series(normalize_keys(job_prospects['codigo'])).duplicated().to_numpy()]
+    n = len(job_prospects)
+    
+    if 'codigo_profissional' in applicants_df.columns:
+        positions = key_index(applicants_df, 'codigo_profissional').first_positions(job_prospects['codigo'])
+    else:
+        positions = np.full(n, -1, dtype=np.int64)
+    matched = positions >= 0
+    
+    def prospect_column(name: str) -> np.ndarray:
+        if name in job_prospects.columns:
+            return job_prospects[name].to_numpy(dtype=object)
+        return np.full(n, '', dtype=object)
+    
+    def applicant_column(name: str, missing: Any) -> np.ndarray:
+        # Applicant values for matched codes, `missing` for prospects not found
+        values = np.full(n, missing, dtype=object)
+        values[matched] = (applicants_df[name].to_numpy(dtype=object)[positions[matched]]
+                           if name in applicants_df.columns else '')
+        return values
+    
+    results = {
+        'codigo': prospect_column('codigo'),
+        'nome': np.where(matched, applicant_column('nome', ''), prospect_column('nome')),
+        'area_atuacao': applicant_column('area_atuacao', '')
+    }
+    if matched.any():
+        results.update({
+            'nivel_academico': applicant_column('nivel_academic', np.nan),
+            'nivel_ingles': applicant_column('nivel_ingles', np.nan),
+            'nivel_espanhol': applicant_column('nivel_espanhol', np.nan)
+        })
+    results.update({
+        'situacao': prospect_column('situacao_candidado'),
+        'data_candidatura': prospect_column('data_candidatura'),
+        'recrutador': prospect_column('recrutador')
+    })
+    
+    if include_scores:
+        # Score all matched candidates in one batch; unmatched prospects score 0
+        scores = {name: np.zeros(n) for name in ['overall_score'] + SCORE_COMPONENTS}
+        if matched.any():
+            text_index = None if text_backend == 'dense' else get_text_index(applicants_df, text_backend)
+            similarity_scores = score_job(job_series, get_candidate_features(applicants_df), positions[matched],
+                                          text_index, weights=weights)
+            for name, values in scores.items():
+                values[matched] = similarity_scores[name]
+        results.update(scores)
     
     # Create DataFrame and sort by status and score if scores included
-    results_df = pd.DataFrame(results) if results else pd.DataFrame()
+    results_df = pd.DataFrame(results)
     
-    if not results_df.empty:
-        if include_scores and 'overall_score' in results_df.columns:
-            results_df = results_df.sort_values(['situacao', 'overall_score'], ascending=[True, False])
+    if include_scores:
+        results_df = results_df.sort_values(['situacao', 'overall_score'], ascending=[True, False])
     
     return results_df
+
+if __name__ == '__main__':
+    import time
+    from helpers.data_loader import load_data
+    
+    # Latência de get_candidates_by_vaga para uma vaga com 1.000 prospects
+    vagas_df, prospects_df, applicants_df = load_data()
+    vaga_id = vagas_df['vaga_id'].iloc[0]
+    sample = applicants_df.sample(min(1000, len(applicants_df)), random_state=0)
+    bench_prospects = pd.DataFrame({
+        'vaga_id': vaga_id,
+        'nome': sample['nome'].tolist(),
+        'codigo': [str(code) for code in sample['codigo_profissional']],
+        'situacao_candidado': np.resize(['Prospect', 'Encaminhado ao Requisitante', 'Contratado'], len(sample)),
+        'data_candidatura': '',
+        'recrutador': ''
+    })
+    
+    start = time.perf_counter()
+    get_candidate_features(applicants_df)
+    print(f"Features do corpus ({len(applicants_df)} candidatos): {time.perf_counter() - start:.2f} s")
+    
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        results_df = get_candidates_by_vaga(vagas_df, bench_prospects, applicants_df, vaga_id)
+        timings.append(time.perf_counter() - start)
+    print(f"get_candidates_by_vaga ({len(results_df)} candidatos): mediana {1000 * np.median(timings):.1f} ms")
+    
+    # Referência: o caminho anterior, uma chamada de calculate_similarity por candidato
+    job_series = lookup_row(vagas_df, 'vaga_id', vaga_id)
+    start = time.perf_counter()
+    for _, candidate in sample.iterrows():
+        calculate_similarity(job_series, candidate)
+    print(f"calculate_similarity linha a linha: {1000 * (time.perf_counter() - start):.1f} ms")
@@ -0,0 +1,224 @@
+import csv
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List
+import pandas as pd
+
+# Taxonomia padrão: {habilidade canônica: [formas de escrita/sinônimos]}
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'skills_taxonomy.json')
+
+# Marcas diacríticas combinantes (removidas após a normalização NFKD)
+_COMBINING_MARKS = re.compile(r'[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]')
+
+# Mantém '+' e '#' para distinguir termos como 'c++' e 'c#'
+_NON_TOKEN_CHARS = re.compile(r'[^\w\s+#]')
+
+def normalize_skill_text(text: str) -> str:
+    """
+    Normaliza o texto para a busca de habilidades: minúsculas, sem acentos e
+    com pontuação substituída por espaços (exceto '+' e '#').
+
+    Args:
+        text: Texto a ser normalizado
+
+    Returns:
+        Texto normalizado
+    """
+    if not isinstance(text, str):
+        return ""
+
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = _COMBINING_MARKS.sub('', text)
+    return _NON_TOKEN_CHARS.sub(' ', text)
+
+def normalize_skill_series(texts: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de normalize_skill_text para uma coluna inteira.
+
+    Args:
+        texts: Série de textos
+
+    Returns:
+        Série de textos normalizados (valores ausentes viram "")
+    """
+    texts = texts.where(texts.map(lambda value: isinstance(value, str)), '').astype(str)
+    return (texts.str.lower()
+                 .str.normalize('NFKD')
+                 .str.replace(_COMBINING_MARKS, '', regex=True)
+                 .str.replace(_NON_TOKEN_CHARS, ' ', regex=True))
+
+def load_skill_taxonomy(path: str = DEFAULT_TAXONOMY_PATH) -> Dict[str, List[str]]:
+    """
+    Carrega uma taxonomia de habilidades de um arquivo JSON ou CSV.
+
+    O JSON mapeia cada habilidade canônica para a lista de formas que a
+    identificam no texto. O CSV tem as colunas 'skill' e 'synonym' (uma
+    linha por forma). O nome canônico só é buscado se constar nas formas.
+
+    Args:
+        path: Caminho do arquivo de taxonomia
+
+    Returns:
+        Dicionário {habilidade canônica: [formas]}
+    """
+    if path.lower().endswith('.csv'):
+        taxonomy: Dict[str, List[str]] = {}
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            for row in csv.DictReader(file):
+                taxonomy.setdefault(row['skill'].strip(), []).append(row['synonym'].strip())
+        return taxonomy
+
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def taxonomy_digest(taxonomy: Dict[str, List[str]]) -> str:
+    """
+    Hash de uma taxonomia: habilidades canônicas, na ordem, e todas as suas formas.
+
+    Args:
+        taxonomy: Dicionário {habilidade canônica: [formas]}
+
+    Returns:
+        Digest hexadecimal
+    """
+    content = json.dumps(list(taxonomy.items()), ensure_ascii=False)
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+class SkillExtractor:
+    """
+    Extrator de habilidades baseado em um autômato de Aho-Corasick sobre tokens.
+
+    Todas as formas da taxonomia são compiladas em um único autômato, então o
+    texto é percorrido uma única vez, com custo independente do tamanho da
+    taxonomia. Como o casamento é feito por tokens inteiros, termos curtos
+    como 'ai' ou 'xd' não casam dentro de outras palavras.
+    """
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        self.skills = list(taxonomy.keys())
+        self.skill_index = {skill: i for i, skill in enumerate(self.skills)}
+        # Identifica a taxonomia inteira (habilidades, na ordem, e suas formas):
+        # resultados persistidos só valem para o mesmo digest
+        self.digest = taxonomy_digest(taxonomy)
+
+        # Trie de tokens: transições, saídas (índices de habilidades) e falhas
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[frozenset] = [frozenset()]
+        outputs: List[set] = [set()]
+
+        for skill, forms in taxonomy.items():
+            for form in forms:
+                tokens = normalize_skill_text(form).split()
+                if not tokens:
+                    continue
+                state = 0
+                for token in tokens:
+                    next_state = self._goto[state].get(token)
+                    if next_state is None:
+                        next_state = len(self._goto)
+                        self._goto[state][token] = next_state
+                        self._goto.append({})
+                        outputs.append(set())
+                    state = next_state
+                outputs[state].add(self.skill_index[skill])
+
+        # Links de falha em largura, herdando as saídas dos sufixos
+        self._fail = [0] * len(self._goto)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for token, next_state in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state] |= outputs[self._fail[next_state]]
+                queue.append(next_state)
+
+        self._output = [frozenset(found) for found in outputs]
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def match_tokens(self, tokens: Iterable[str]) -> set:
+        """
+        Percorre os tokens uma vez e devolve os índices das habilidades encontradas.
+
+        Args:
+            tokens: Tokens de um texto já normalizado
+
+        Returns:
+            Conjunto de índices (posições em self.skills)
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+    def extract(self, text: str) -> List[str]:
+        """
+        Extrai as habilidades de um texto.
+
+        Args:
+            text: Texto para extrair habilidades
+
+        Returns:
+            Lista de habilidades canônicas, na ordem da taxonomia
+        """
+        found = self.match_tokens(normalize_skill_text(text).split())
+        return [self.skills[i] for i in sorted(found)]
+
+    def extract_indices_batch(self, texts: pd.Series) -> List[List[int]]:
+        """
+        Extrai os índices das habilidades de uma coluna inteira de textos.
+
+        A normalização é vetorizada sobre a coluna e textos repetidos são
+        processados uma única vez.
+
+        Args:
+            texts: Série de textos
+
+        Returns:
+            Uma lista ordenada de índices de habilidades por linha
+        """
+        normalized = normalize_skill_series(pd.Series(texts, dtype=object))
+        codes, uniques = pd.factorize(normalized)
+        unique_found = [sorted(self.match_tokens(text.split())) for text in uniques]
+        return [unique_found[code] for code in codes]
+
+    def extract_batch(self, texts: pd.Series) -> pd.Series:
+        """
+        Extrai as habilidades de uma coluna inteira de textos.
+
+        Args:
+            texts: Série de textos
+
+        Returns:
+            Série com a lista de habilidades de cada linha (mesmo índice da entrada)
+        """
+        index = texts.index if isinstance(texts, pd.Series) else None
+        skill_lists = [[self.skills[i] for i in found] for found in self.extract_indices_batch(texts)]
+        return pd.Series(skill_lists, index=index, dtype=object)
+
+@lru_cache(maxsize=None)
+def get_skill_extractor(path: str = DEFAULT_TAXONOMY_PATH) -> SkillExtractor:
+    """
+    Extrator compilado para uma taxonomia (compilado uma única vez por processo).
+
+    Args:
+        path: Caminho do arquivo de taxonomia
+
+    Returns:
+        SkillExtractor pronto para uso
+    """
+    return SkillExtractor(load_skill_taxonomy(path))
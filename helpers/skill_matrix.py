@@ -0,0 +1,268 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Dict, List, Optional
+from helpers.embedding_store import text_key, texts_digest
+from helpers.skill_extractor import SkillExtractor, get_skill_extractor
+
+# The app runs from the repository root, next to applicants.csv
+DEFAULT_SKILL_MATRIX_PATH = 'applicants_skills.npz'
+
+class SkillMatrix:
+    """
+    Sparse candidate x skill indicator matrix (CSR, one row per candidate).
+
+    Skill overlap of a job against every candidate is a single sparse
+    matrix-vector product, and boolean skill queries are answered by
+    intersecting the (column-wise) posting lists of the requested skills.
+    """
+
+    def __init__(self, matrix: sparse.csr_matrix, skills: List[str]):
+        self.matrix = matrix.tocsr()
+        self.skills = list(skills)
+        self.skill_index = {skill: i for i, skill in enumerate(self.skills)}
+        self._columns: Optional[sparse.csc_matrix] = None
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @classmethod
+    def from_texts(cls, texts: List[str], extractor: Optional[SkillExtractor] = None) -> 'SkillMatrix':
+        """
+        Featurize texts into a skill matrix.
+
+        Args:
+            texts: One text per candidate
+            extractor: Skill extractor (default: the compiled default taxonomy)
+
+        Returns:
+            SkillMatrix with one row per text
+        """
+        extractor = extractor or get_skill_extractor()
+        found = extractor.extract_indices_batch(pd.Series(list(texts), dtype=object))
+        return cls(_indicator_matrix(found, len(extractor)), extractor.skills)
+
+    def job_mask(self, job_skills: List[str]) -> np.ndarray:
+        """
+        Indicator vector of a job's skills over the matrix vocabulary.
+
+        Args:
+            job_skills: Skills extracted from the job description
+
+        Returns:
+            Array with 1 for each job skill present in the vocabulary
+        """
+        mask = np.zeros(len(self.skills), dtype=np.float64)
+        positions = [self.skill_index[skill] for skill in set(job_skills) if skill in self.skill_index]
+        mask[positions] = 1.0
+        return mask
+
+    def overlap(self, job_skills: List[str]) -> np.ndarray:
+        """
+        Fraction of the job skills that each candidate has.
+
+        Same semantics as calculate_skill_overlap: matched skills divided by
+        the number of job skills, and 0 when either side has no skills.
+
+        Args:
+            job_skills: Skills extracted from the job description
+
+        Returns:
+            Array of overlap scores between 0 and 1
+        """
+        job_skills = set(job_skills)
+        return self.mask_overlap(self.job_mask(job_skills), len(job_skills))
+
+    def mask_overlap(self, job_mask: np.ndarray, n_job_skills: int) -> np.ndarray:
+        """
+        overlap() of a job whose skills were already turned into a mask.
+
+        Args:
+            job_mask: job_mask() of the job skills (same vocabulary)
+            n_job_skills: Number of distinct job skills
+
+        Returns:
+            Array of overlap scores between 0 and 1
+        """
+        if n_job_skills == 0:
+            return np.zeros(len(self))
+        return (self.matrix @ job_mask) / n_job_skills
+
+    def candidates_with_all(self, skills: List[str]) -> np.ndarray:
+        """
+        Row positions of the candidates that have every one of the given skills.
+
+        Args:
+            skills: Canonical skill names (e.g. ['python', 'aws'])
+
+        Returns:
+            Sorted array of row positions
+        """
+        if not skills:
+            return np.arange(len(self))
+        if any(skill not in self.skill_index for skill in skills):
+            return np.zeros(0, dtype=np.int64)
+
+        if self._columns is None:
+            self._columns = self.matrix.tocsc()
+            self._columns.sort_indices()
+
+        columns = self._columns
+        postings = []
+        for skill in set(skills):
+            column = self.skill_index[skill]
+            postings.append(columns.indices[columns.indptr[column]:columns.indptr[column + 1]])
+
+        # Start from the rarest skill so every intersection stays small
+        postings.sort(key=len)
+        rows = postings[0]
+        for posting in postings[1:]:
+            rows = np.intersect1d(rows, posting, assume_unique=True)
+        return rows.astype(np.int64)
+
+    def subset(self, positions: np.ndarray) -> 'SkillMatrix':
+        """
+        Rows at the given positions, in that order.
+
+        Args:
+            positions: Row positions to keep
+
+        Returns:
+            New SkillMatrix with only the selected rows
+        """
+        return SkillMatrix(self.matrix[positions], self.skills)
+
+def _indicator_matrix(found: List[List[int]], n_skills: int) -> sparse.csr_matrix:
+    indptr = np.zeros(len(found) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in found])
+    indices = np.fromiter((i for row in found for i in row), dtype=np.int32, count=int(indptr[-1]))
+    data = np.ones(len(indices), dtype=np.uint8)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(found), n_skills))
+
+def load_or_build_skill_matrix(texts: List[str], path: str = DEFAULT_SKILL_MATRIX_PATH,
+                               extractor: Optional[SkillExtractor] = None,
+                               source: Optional[str] = None) -> SkillMatrix:
+    """
+    Skill matrix for a corpus, reusing the rows saved on disk for unchanged texts.
+
+    An unchanged corpus is recognized by the data version given as source,
+    else by the digest of all the texts, before any per-text work. Otherwise
+    rows are keyed by a content hash of the text; only new or changed texts
+    are run through the extractor, and the updated matrix is saved back.
+
+    Args:
+        texts: One text per candidate
+        path: Location of the saved matrix (.npz)
+        extractor: Skill extractor (default: the compiled default taxonomy)
+        source: Version identifying the texts and their order (see
+            data_loader.data_version), if known; it skips every check
+
+    Returns:
+        SkillMatrix with one row per text
+    """
+    extractor = extractor or get_skill_extractor()
+    texts = [text if isinstance(text, str) else '' for text in texts]
+
+    stored = _load(path)
+    # Rows extracted with another taxonomy (even one that only differs in a form) are never reused
+    if stored is not None and (stored['taxonomy'] != extractor.digest or stored['skills'] != extractor.skills):
+        stored = None
+
+    digest = None
+    if stored is not None and stored['matrix'].shape[0] == len(texts):
+        if source is not None and stored['source'] == source:
+            return SkillMatrix(stored['matrix'], extractor.skills)
+        digest = texts_digest(texts)
+        if stored['digest'] == digest:
+            if source is not None:
+                _save(path, SkillMatrix(stored['matrix'], extractor.skills), stored['keys'], digest,
+                      extractor.digest, source)
+            return SkillMatrix(stored['matrix'], extractor.skills)
+
+    digest = digest or texts_digest(texts)
+    keys = np.array([text_key(text) for text in texts], dtype='S32')
+    if stored is not None and np.array_equal(stored['keys'], keys):
+        skill_matrix = SkillMatrix(stored['matrix'], extractor.skills)
+        _save(path, skill_matrix, keys, digest, extractor.digest, source)
+        return skill_matrix
+
+    known_rows: Dict[bytes, int] = {}
+    if stored is not None:
+        known_rows = {key: row for row, key in enumerate(stored['keys'].tolist())}
+
+    is_known = np.array([key in known_rows for key in keys.tolist()], dtype=bool)
+    new_matrix = SkillMatrix.from_texts([text for text, known in zip(texts, is_known) if not known], extractor).matrix
+
+    # Assemble the rows in corpus order from the stored and the new matrices
+    if stored is not None and is_known.any():
+        source_rows = np.empty(len(texts), dtype=np.int64)
+        source_rows[is_known] = [known_rows[key] for key in keys[is_known].tolist()]
+        source_rows[~is_known] = stored['matrix'].shape[0] + np.arange(int((~is_known).sum()))
+        matrix = sparse.vstack([stored['matrix'], new_matrix], format='csr')[source_rows]
+    else:
+        matrix = new_matrix
+
+    skill_matrix = SkillMatrix(matrix, extractor.skills)
+    _save(path, skill_matrix, keys, digest, extractor.digest, source)
+    return skill_matrix
+
+def save_updated_skill_matrix(skill_matrix: SkillMatrix, texts: List[str], kept: np.ndarray,
+                              changed: np.ndarray, path: str = DEFAULT_SKILL_MATRIX_PATH,
+                              base_source: Optional[str] = None, source: Optional[str] = None,
+                              extractor: Optional[SkillExtractor] = None) -> None:
+    """
+    Save the skill matrix of a corpus updated by key (see EmbeddingStore.save_update).
+
+    Only the changed rows are hashed when the saved matrix is the one of
+    base_source; otherwise every text is.
+
+    Args:
+        skill_matrix: Matrix of the updated corpus
+        texts: One text per row
+        kept: Positions of the base corpus kept, in order, before the appended rows
+        changed: Rows extracted from a new text (replaced or appended)
+        path: Location of the saved matrix (.npz)
+        base_source: Data version of the base corpus
+        source: Data version of the updated corpus
+        extractor: Skill extractor the rows came from (default: the compiled default taxonomy)
+    """
+    extractor = extractor or get_skill_extractor()
+    texts = [text if isinstance(text, str) else '' for text in texts]
+    stored = _load(path)
+
+    keys = np.empty(len(texts), dtype='S32')
+    if (stored is not None and base_source is not None and stored['source'] == base_source
+            and stored['taxonomy'] == extractor.digest
+            and (len(kept) == 0 or int(kept.max()) < len(stored['keys']))):
+        keys[:len(kept)] = stored['keys'][kept]
+        rows = np.asarray(changed, dtype=np.int64)
+    else:
+        rows = np.arange(len(texts))
+    keys[rows] = [text_key(texts[row]) for row in rows.tolist()]
+    _save(path, skill_matrix, keys, texts_digest(texts), extractor.digest, source)
+
+def _load(path: str) -> Optional[Dict]:
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            matrix = sparse.csr_matrix((data['data'], data['indices'], data['indptr']),
+                                       shape=tuple(data['shape']))
+            # Files saved before the digests were recorded only match row by row
+            return {'matrix': matrix, 'keys': data['keys'], 'skills': data['skills'].tolist(),
+                    'digest': str(data['digest']) if 'digest' in data else None,
+                    'source': str(data['source']) if 'source' in data else None,
+                    'taxonomy': str(data['taxonomy']) if 'taxonomy' in data else None}
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _save(path: str, skill_matrix: SkillMatrix, keys: np.ndarray, digest: str, taxonomy: str,
+          source: Optional[str] = None) -> None:
+    matrix = skill_matrix.matrix
+    tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+    try:
+        np.savez(tmp_path, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                 shape=np.array(matrix.shape), keys=keys, skills=np.array(skill_matrix.skills),
+                 digest=np.array(digest), taxonomy=np.array(taxonomy), source=np.array(source or ''))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
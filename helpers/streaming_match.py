@@ -0,0 +1,205 @@
+import time
+import pandas as pd
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from helpers.batch_scorer import build_candidate_features, resolve_weights, score_job, top_k_indices
+from helpers.data_cache import DataCache, source_fingerprint
+from helpers.data_loader import (
+    APPLICANTS_PATH,
+    CACHE_DIR,
+    PROSPECTS_PATH,
+    VAGAS_PATH,
+    applicant_usecols,
+    prepare_applicants,
+)
+from helpers.data_store import lookup_row
+from helpers.json_stream import peak_rss_bytes
+from helpers.similarity_calculator import VagaRanking
+
+# Applicants read, featurized and scored at a time (the profile embeddings of
+# a chunk dominate its memory: 20k x 384 float64 is about 60 MB)
+DEFAULT_CHUNK_ROWS = 20_000
+
+# Where the applicants are streamed from: the columnar cache when it is
+# fresh ('auto'), always the CSV, or only the cache
+STREAM_SOURCES = ['auto', 'csv', 'cache']
+
+# Columns of the cached frame needed to score and describe a candidate
+_CACHE_COLUMNS = [
+    'codigo_profissional', 'nome', 'area_atuacao', 'nivel_academic', 'nivel_ingles', 'nivel_espanhol',
+    'nivel_academic_ord', 'nivel_ingles_ord', 'nivel_espanhol_ord', 'profile_text'
+]
+
+def cached_applicants_path(path: str = APPLICANTS_PATH) -> Optional[str]:
+    """
+    Columnar cache file of the applicants, if it was built from the current sources.
+
+    Args:
+        path: Applicants CSV the cache must have been built from
+
+    Returns:
+        Path of the Arrow/Feather file, or None when there is no fresh cache
+    """
+    try:
+        fingerprint = source_fingerprint([VAGAS_PATH, PROSPECTS_PATH, path])
+    except OSError:
+        return None
+    cache = DataCache(CACHE_DIR)
+    # Every load option carries 'profile_text' and the ordinal levels
+    for lean, drop_raw_text in [(True, False), (True, True), (False, False)]:
+        options = {'lean': lean, 'drop_raw_text': drop_raw_text}
+        frame_path = cache.frame_path(dict(fingerprint, options=options), 'applicants')
+        if frame_path is not None:
+            return frame_path
+    return None
+
+def iter_applicant_chunks(path: str = APPLICANTS_PATH, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                          source: str = 'auto') -> Iterator[pd.DataFrame]:
+    """
+    Stream the prepared applicants in chunks of at most chunk_rows rows.
+
+    Chunks have the columns of read_applicants ('profile_text', ordinal
+    levels) and come in file order. Only one chunk is alive at a time.
+
+    Args:
+        path: Applicants CSV
+        chunk_rows: Maximum rows per chunk
+        source: 'auto' (columnar cache when fresh, else CSV), 'csv' or 'cache'
+
+    Yields:
+        DataFrames of consecutive applicants
+    """
+    if source not in STREAM_SOURCES:
+        raise ValueError(f"Unknown applicant source '{source}' (available: {', '.join(STREAM_SOURCES)})")
+    if chunk_rows <= 0:
+        raise ValueError("chunk_rows must be positive")
+
+    if source != 'csv':
+        cache_path = cached_applicants_path(path)
+        if cache_path is not None:
+            yield from _iter_cache_chunks(cache_path, chunk_rows)
+            return
+        if source == 'cache':
+            raise FileNotFoundError(f"No columnar cache built from the current {path}")
+
+    with pd.read_csv(path, encoding='utf-8', index_col=0, usecols=applicant_usecols(path),
+                     chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            # Categorical columns do not pay off for a single chunk
+            yield prepare_applicants(chunk, lean=False)
+
+def _iter_cache_chunks(path: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    import pyarrow as pa
+
+    # The file is memory-mapped: only the record batch being converted is read
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            columns = [name for name in _CACHE_COLUMNS if name in batch.schema.names]
+            batch = batch.select(columns)
+            for offset in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(offset, chunk_rows).to_pandas()
+
+def stream_top_candidates(vagas_df: pd.DataFrame, vaga_ids: List[str], top_n: int = 10,
+                          path: str = APPLICANTS_PATH, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                          source: str = 'auto', weights: Optional[Dict[str, float]] = None
+                          ) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Any]]:
+    """
+    Top candidates of several vagas in one pass over the applicants file.
+
+    Each chunk is featurized once and scored against every vaga with
+    score_job; only a running top_n per vaga is kept, so memory depends on
+    chunk_rows and top_n, not on the number of applicants. The chunk's
+    best rows are merged with the running best through top_k_indices,
+    which breaks ties by position: the result equals the head of a full
+    stable sort of the whole file (dense text similarity, no ANN), up to
+    the last-bit rounding of the text similarity of each chunk.
+
+    Args:
+        vagas_df: DataFrame with job vacancies
+        vaga_ids: Vagas to rank (unknown ids are left out of the result)
+        top_n: Candidates kept per vaga
+        path: Applicants CSV
+        chunk_rows: Maximum applicants per chunk
+        source: 'auto', 'csv' or 'cache' (see iter_applicant_chunks)
+        weights: Weight per score component (default: SCORE_WEIGHTS)
+
+    Returns:
+        Tuple ({vaga_id: DataFrame with the find_matching_candidates columns},
+        stats with the rows and chunks read, elapsed seconds and the process
+        peak RSS in bytes)
+    """
+    start = time.perf_counter()
+    weights = resolve_weights(weights)
+    jobs = {}
+    for vaga_id in vaga_ids:
+        job = lookup_row(vagas_df, 'vaga_id', vaga_id)
+        if job is not None:
+            jobs[vaga_id] = job
+    best: Dict[str, Optional[pd.DataFrame]] = {vaga_id: None for vaga_id in jobs}
+
+    n_rows = 0
+    n_chunks = 0
+    for chunk in iter_applicant_chunks(path, chunk_rows, source):
+        n_rows += len(chunk)
+        n_chunks += 1
+        # Encoded in memory: the embedding store would hold the whole corpus
+        features = build_candidate_features(chunk)
+        for vaga_id, job in jobs.items():
+            scores = score_job(job, features, weights=weights)
+            chunk_best = VagaRanking.from_scores(chunk, None, scores, weights).top(top_n)
+            if best[vaga_id] is not None:
+                # Earlier rows first, so ties keep file order
+                chunk_best = pd.concat([best[vaga_id], chunk_best], ignore_index=True)
+            keep = top_k_indices(chunk_best['overall_score'].to_numpy(), top_n)
+            best[vaga_id] = chunk_best.iloc[keep].reset_index(drop=True)
+
+    results = {vaga_id: ranking if ranking is not None else pd.DataFrame() for vaga_id, ranking in best.items()}
+    stats = {
+        'rows': n_rows,
+        'chunks': n_chunks,
+        'seconds': time.perf_counter() - start,
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+    return results, stats
+
+def stream_matching_candidates(vagas_df: pd.DataFrame, vaga_id: str, top_n: int = 10,
+                               path: str = APPLICANTS_PATH, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                               source: str = 'auto', weights: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    find_matching_candidates over the applicants file, without loading it whole.
+
+    Args:
+        vagas_df: DataFrame with job vacancies
+        vaga_id: ID of the job vacancy to match against
+        top_n: Number of top candidates to return
+        path: Applicants CSV
+        chunk_rows: Maximum applicants per chunk
+        source: 'auto', 'csv' or 'cache' (see iter_applicant_chunks)
+        weights: Weight per score component (default: SCORE_WEIGHTS)
+
+    Returns:
+        DataFrame with top matching candidates and their scores
+    """
+    results, _ = stream_top_candidates(vagas_df, [vaga_id], top_n, path, chunk_rows, source, weights)
+    return results.get(vaga_id, pd.DataFrame())
+
+if __name__ == '__main__':
+    import argparse
+    from helpers.data_loader import read_vagas
+
+    parser = argparse.ArgumentParser(description="Top-k de candidatos lendo applicants.csv em blocos.")
+    parser.add_argument('--vagas', type=int, default=5, help="Vagas ranqueadas (as primeiras do arquivo)")
+    parser.add_argument('--top-n', type=int, default=10, help="Candidatos por vaga")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS, help="Candidatos por bloco")
+    parser.add_argument('--source', choices=STREAM_SOURCES, default='auto', help="Origem dos candidatos")
+    args = parser.parse_args()
+
+    vagas_df = read_vagas(VAGAS_PATH)
+    results, stats = stream_top_candidates(vagas_df, vagas_df['vaga_id'].head(args.vagas).tolist(), args.top_n,
+                                           chunk_rows=args.chunk_rows, source=args.source)
+    for vaga_id, ranking in results.items():
+        best = ranking['overall_score'].iloc[0] if not ranking.empty else 0.0
+        print(f"Vaga {vaga_id}: {len(ranking)} candidatos, melhor score {best:.1%}")
+    print(f"{stats['rows']} candidatos em {stats['chunks']} blocos, {stats['seconds']:.1f} s, "
+          f"pico de memória {stats['peak_rss_bytes'] / 1e6:.0f} MB")
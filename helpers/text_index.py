@@ -0,0 +1,300 @@
+import json
+import os
+import threading
+import weakref
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Any, Dict, List, Optional, Tuple
+from helpers.embedding_store import text_key
+from helpers.lazy_imports import import_module
+from helpers.text_processor import STOPWORDS, preprocess_text
+
+# Engines of the text_similarity component ('dense' = embeddings)
+TEXT_BACKENDS = ['dense', 'tfidf', 'bm25']
+
+# Bump when the layout of the saved index changes
+TEXT_INDEX_FORMAT_VERSION = 1
+
+# Cap on the vocabulary (most frequent terms), which bounds the matrix width
+DEFAULT_MAX_FEATURES = 50_000
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+def text_index_path(kind: str) -> str:
+    """
+    Default location of a saved index (the app runs next to applicants.csv).
+
+    Args:
+        kind: 'tfidf' or 'bm25'
+
+    Returns:
+        Path of the .npz file
+    """
+    return f'applicants_text_{kind}.npz'
+
+def _stopwords() -> List[str]:
+    # Folded like the texts, so 'não' matches the 'nao' left by preprocess_text
+    return sorted({preprocess_text(word) for word in STOPWORDS['portuguese']})
+
+def _count_vectorizer(**options: Any):
+    feature_extraction = import_module('sklearn.feature_extraction.text')
+    # Texts are already lower-cased and folded by preprocess_text
+    return feature_extraction.CountVectorizer(lowercase=False, dtype=np.float32, **options)
+
+class SparseTextIndex:
+    """
+    TF-IDF or BM25 index of a text corpus as a CSR document x term matrix.
+
+    Document weights are computed once when the index is fit, so scoring a
+    query against every document is a single sparse matrix-vector product.
+    Queries are tokenized with the fitted vocabulary only; unknown terms
+    are ignored.
+    """
+
+    def __init__(self, kind: str, terms: List[str], idf: np.ndarray, matrix: sparse.csr_matrix,
+                 max_features: int = DEFAULT_MAX_FEATURES):
+        if kind not in ('tfidf', 'bm25'):
+            raise ValueError(f"Unknown sparse text backend '{kind}'")
+        self.kind = kind
+        self.terms = list(terms)
+        self.idf = idf.astype(np.float32)
+        self.matrix = matrix.tocsr()
+        self.max_features = max_features
+        self._query_vectorizer = None
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.matrix.data.nbytes + self.matrix.indices.nbytes + self.matrix.indptr.nbytes
+                   + self.idf.nbytes)
+
+    @classmethod
+    def fit(cls, texts: List[str], kind: str = 'tfidf',
+            max_features: int = DEFAULT_MAX_FEATURES) -> 'SparseTextIndex':
+        """
+        Build the index of a corpus.
+
+        Args:
+            texts: One raw text per document (pre-processed here)
+            kind: 'tfidf' (cosine of smoothed TF-IDF vectors) or 'bm25'
+            max_features: Maximum vocabulary size
+
+        Returns:
+            Fitted SparseTextIndex
+        """
+        processed = [preprocess_text(text) if isinstance(text, str) else '' for text in texts]
+        vectorizer = _count_vectorizer(stop_words=_stopwords(), max_features=max_features)
+        try:
+            counts = vectorizer.fit_transform(processed).tocsr()
+            terms = vectorizer.get_feature_names_out().tolist()
+        except ValueError:
+            # Empty vocabulary (no documents or only stopwords)
+            counts, terms = sparse.csr_matrix((len(processed), 0), dtype=np.float32), []
+
+        n_documents = counts.shape[0]
+        document_frequency = np.bincount(counts.indices, minlength=len(terms)).astype(np.float64)
+
+        if kind == 'bm25':
+            idf = np.log1p((n_documents - document_frequency + 0.5) / (document_frequency + 0.5))
+            lengths = np.asarray(counts.sum(axis=1)).ravel()
+            average_length = lengths.mean() if n_documents and lengths.mean() > 0 else 1.0
+            # Saturated term frequency, normalized by document length
+            row_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)
+            tf = counts.data.astype(np.float64)
+            row_of_value = np.repeat(np.arange(n_documents), np.diff(counts.indptr))
+            weights = tf * (BM25_K1 + 1) / (tf + row_norm[row_of_value]) * idf[counts.indices]
+        else:
+            # Smoothed idf, as TfidfVectorizer computes it
+            idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+            weights = counts.data.astype(np.float64) * idf[counts.indices]
+
+        matrix = sparse.csr_matrix((weights.astype(np.float32), counts.indices, counts.indptr),
+                                   shape=counts.shape)
+        if kind == 'tfidf':
+            matrix = _normalize_csr_rows(matrix)
+        return cls(kind, terms, idf, matrix, max_features)
+
+    def query_vector(self, text: str) -> np.ndarray:
+        """
+        Dense weight vector of a query over the vocabulary.
+
+        Args:
+            text: Raw query text
+
+        Returns:
+            Array with one weight per term (all zeros if no term is known)
+        """
+        if not self.terms:
+            return np.zeros(0, dtype=np.float32)
+        if self._query_vectorizer is None:
+            self._query_vectorizer = _count_vectorizer(vocabulary=self.terms)
+
+        counts = self._query_vectorizer.transform([preprocess_text(text) if isinstance(text, str) else ''])
+        vector = np.asarray(counts.todense(), dtype=np.float32).ravel()
+        if self.kind == 'bm25':
+            # Each query term counts once, weighted by the document side
+            return (vector > 0).astype(np.float32)
+
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def score(self, text: str) -> np.ndarray:
+        """
+        Similarity of a query to every document, between 0 and 1.
+
+        TF-IDF scores are cosine similarities. BM25 scores are divided by the
+        best score of the corpus for the query, so the top document scores 1.
+
+        Args:
+            text: Raw query text
+
+        Returns:
+            Array with one score per document
+        """
+        if not self.terms:
+            return np.zeros(len(self))
+
+        scores = (self.matrix @ self.query_vector(text)).astype(np.float64)
+        if self.kind == 'bm25':
+            best = scores.max(initial=0.0)
+            if best > 0:
+                scores /= best
+        return scores
+
+    def save(self, path: str, keys: np.ndarray) -> None:
+        """
+        Write the vocabulary, idf and matrix to an .npz file (atomically).
+
+        Args:
+            path: Destination file
+            keys: Content hash of each indexed text, used to detect changes
+        """
+        matrix = self.matrix
+        params = {'format': TEXT_INDEX_FORMAT_VERSION, 'kind': self.kind, 'max_features': self.max_features}
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        try:
+            np.savez(tmp_path, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+                     shape=np.array(matrix.shape), idf=self.idf, terms=np.array(self.terms, dtype=str),
+                     keys=keys, params=np.array(json.dumps(params)))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    @classmethod
+    def load(cls, path: str, kind: str, max_features: int = DEFAULT_MAX_FEATURES
+             ) -> Optional[Tuple['SparseTextIndex', np.ndarray]]:
+        """
+        Read an index saved with the same kind and vocabulary cap.
+
+        Args:
+            path: Saved index
+            kind: Expected backend
+            max_features: Expected vocabulary cap
+
+        Returns:
+            Tuple (index, keys), or None if the file is missing, unreadable
+            or was built with other parameters
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                params = json.loads(str(data['params']))
+                if params != {'format': TEXT_INDEX_FORMAT_VERSION, 'kind': kind, 'max_features': max_features}:
+                    return None
+                matrix = sparse.csr_matrix((data['data'], data['indices'], data['indptr']),
+                                           shape=tuple(data['shape']))
+                index = cls(kind, data['terms'].tolist(), data['idf'], matrix, max_features)
+                return index, data['keys']
+        except (OSError, ValueError, KeyError):
+            return None
+
+def _normalize_csr_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    squared = matrix.multiply(matrix).sum(axis=1)
+    norms = np.sqrt(np.asarray(squared, dtype=np.float64).ravel())
+    norms[norms == 0] = 1.0
+    scale = np.repeat(1.0 / norms, np.diff(matrix.indptr)).astype(np.float32)
+    return sparse.csr_matrix((matrix.data * scale, matrix.indices, matrix.indptr), shape=matrix.shape)
+
+def load_or_build_text_index(texts: List[str], kind: str = 'tfidf', path: Optional[str] = None,
+                             max_features: int = DEFAULT_MAX_FEATURES) -> SparseTextIndex:
+    """
+    Index of a corpus, reusing the one saved on disk if the texts did not change.
+
+    Document frequencies depend on the whole corpus, so any change refits
+    the index (fitting is a single pass of CountVectorizer).
+
+    Args:
+        texts: One text per document
+        kind: 'tfidf' or 'bm25'
+        path: Location of the saved index (default: text_index_path(kind))
+        max_features: Maximum vocabulary size
+
+    Returns:
+        SparseTextIndex with one row per text
+    """
+    path = path or text_index_path(kind)
+    texts = [text if isinstance(text, str) else '' for text in texts]
+    keys = np.array([text_key(preprocess_text(text)) for text in texts], dtype='S32')
+
+    stored = SparseTextIndex.load(path, kind, max_features)
+    if stored is not None and np.array_equal(stored[1], keys):
+        return stored[0]
+
+    index = SparseTextIndex.fit(texts, kind, max_features)
+    index.save(path, keys)
+    return index
+
+_indexes: Dict[Tuple[int, str], Tuple[weakref.ref, SparseTextIndex]] = {}
+_indexes_lock = threading.Lock()
+
+def get_text_index(applicants_df: pd.DataFrame, kind: str) -> SparseTextIndex:
+    """
+    Sparse text index of the applicant profiles, built on first use.
+
+    Cached for as long as the DataFrame object is alive and persisted next
+    to applicants.csv.
+
+    Args:
+        applicants_df: DataFrame with applicant data (including 'profile_text')
+        kind: 'tfidf' or 'bm25'
+
+    Returns:
+        SparseTextIndex aligned with the rows of applicants_df
+    """
+    if kind not in ('tfidf', 'bm25'):
+        raise ValueError(f"Unknown sparse text backend '{kind}' (available: tfidf, bm25)")
+
+    key = (id(applicants_df), kind)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0]() is applicants_df:
+            return cached[1]
+
+        profiles = applicants_df['profile_text'].tolist() if 'profile_text' in applicants_df else [''] * len(applicants_df)
+        index = load_or_build_text_index(profiles, kind)
+        ref = weakref.ref(applicants_df, lambda _, key=key: _indexes.pop(key, None))
+        _indexes[key] = (ref, index)
+        return index
+
+if __name__ == '__main__':
+    import time
+    from helpers.data_loader import load_data
+
+    vagas_df, _, applicants_df = load_data()
+    for kind in ['tfidf', 'bm25']:
+        start = time.perf_counter()
+        index = get_text_index(applicants_df, kind)
+        built = time.perf_counter() - start
+
+        descriptions = vagas_df['descricao_completa'].head(50).tolist()
+        start = time.perf_counter()
+        for description in descriptions:
+            index.score(description)
+        per_query = (time.perf_counter() - start) / max(len(descriptions), 1)
+        print(f"{kind}: {len(index.terms)} termos, {index.nbytes / 1e6:.1f} MB, "
+              f"carregado/ajustado em {built:.2f} s, {1000 * per_query:.2f} ms por vaga")
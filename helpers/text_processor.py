@@ -3,16 +3,12 @@ import unicodedata
 import numpy as np
 import pandas as pd
 import streamlit as st
-import nltk
 from typing import List
+from helpers.embedders import DEFAULT_BATCH_SIZE, ByteEmbedder, Embedder, get_embedder
+from helpers.skill_extractor import get_skill_extractor
 
-# Download de recursos do NLTK
-try:
-    nltk.data.find('tokenizers/punkt')
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('stopwords')
+# Os recursos do NLTK não são mais baixados na importação: veja
+# helpers.lazy_imports.ensure_nltk_resources (chamado no aquecimento em segundo plano)
 
 # Stopwords para remover durante o processamento
 STOPWORDS = {
@@ -28,51 +24,67 @@ STOPWORDS = {
                   'te', 'teu', 'tua', 'tuas', 'teus', 'um', 'uma', 'você', 'vocês']
 }
 
+# Níveis de formação acadêmica (ordinal)
+EDUCATION_LEVELS = {
+    'ensino fundamental': 1,
+    'ensino médio': 2,
+    'ensino médio completo': 2,
+    'ensino técnico': 3,
+    'ensino técnico completo': 3,
+    'ensino superior': 4,
+    'ensino superior cursando': 4,
+    'ensino superior incompleto': 4,
+    'ensino superior completo': 5,
+    'pós-graduação': 6,
+    'especialização': 6,
+    'mba': 6,
+    'mestrado': 7,
+    'doutorado': 8
+}
+
+# Níveis de proficiência em idiomas (ordinal)
+LANGUAGE_LEVELS = {
+    'nenhum': 0,
+    'básico': 1,
+    'intermediário': 2,
+    'avançado': 3,
+    'fluente': 4
+}
+
 # Classe para geração de embeddings
-class SimpleEmbedder:
+class SimpleEmbedder(ByteEmbedder):
     """Implementação simplificada de modelo de embedding para processamento de texto"""
     
-    def encode(self, texts):
+    def encode(self, texts, batch_size: int = DEFAULT_BATCH_SIZE):
         """
         Codifica textos em vetores de embedding simplificados
         
         Args:
             texts: String única ou lista de strings para codificar
+            batch_size: Quantidade de textos codificados por vez
             
         Returns:
             Vetor de embedding único ou array de vetores
         """
         if isinstance(texts, str):
-            texts = [texts]
-        
-        # Cria vetores simples baseados nos caracteres do texto
-        results = []
-        for text in texts:
-            # Cria um vetor de 384 dimensões (simulando o tamanho de embeddings reais)
-            text_bytes = text.encode('utf-8')
-            vec = np.zeros(384)
-            for i, byte in enumerate(text_bytes[:384]):
-                vec[i % 384] += byte / 255.0
-            
-            # Normaliza o vetor
-            if np.linalg.norm(vec) > 0:
-                vec = vec / np.linalg.norm(vec)
-            results.append(vec)
+            return super().encode([texts], batch_size)[0]
         
-        if len(results) == 1:
-            return results[0]
-        return np.array(results)
+        vectors = super().encode(texts, batch_size)
+        if len(vectors) == 1:
+            return vectors[0]
+        return vectors
 
 # Cache do modelo de embedding
 @st.cache_resource
-def load_embedding_model():
+def load_embedding_model() -> Embedder:
     """
-    Uma versão simplificada do modelo de embeddings.
+    Carrega o modelo de embeddings escolhido na configuração
+    (veja helpers.embedders.configured_backend).
     
     Returns:
-        Um objeto simulado que usa embedding baseado em caracteres
+        Embedder com encode(list[str], batch_size=...) em lote
     """
-    return SimpleEmbedder()
+    return get_embedder()
 
 def preprocess_text(text: str, language: str = 'portuguese') -> str:
     """
@@ -110,7 +122,8 @@ def preprocess_text(text: str, language: str = 'portuguese') -> str:
 def extract_skills(text: str) -> List[str]:
     """
     Extrai habilidades técnicas do texto.
-    Usa uma abordagem simples de correspondência de palavras-chave.
+    Usa o extrator compilado da taxonomia de habilidades, que casa termos
+    (e seus sinônimos) respeitando os limites das palavras.
     
     Args:
         text: Texto para extrair habilidades
@@ -118,27 +131,7 @@ def extract_skills(text: str) -> List[str]:
     Returns:
         Lista de habilidades extraídas
     """
-    # Lista de habilidades técnicas comuns (exemplo simplificado)
-    common_skills = [
-        'python', 'java', 'javascript', 'html', 'css', 'sql', 'react', 'angular',
-        'node', 'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'devops', 'ci/cd',
-        'git', 'agile', 'scrum', 'kanban', 'nosql', 'mongodb', 'postgresql', 'mysql',
-        'oracle', 'data science', 'machine learning', 'deep learning', 'ai', 'nlp',
-        'tensorflow', 'pytorch', 'pandas', 'numpy', 'scikit-learn', 'big data',
-        'hadoop', 'spark', 'tableau', 'power bi', 'excel', 'word', 'powerpoint',
-        'photoshop', 'illustrator', 'indesign', 'figma', 'sketch', 'xd'
-    ]
-    
-    # Pré-processar o texto
-    processed_text = preprocess_text(text)
-    
-    # Extrair habilidades
-    found_skills = []
-    for skill in common_skills:
-        if skill in processed_text:
-            found_skills.append(skill)
-    
-    return found_skills
+    return get_skill_extractor().extract(text)
 
 def encode_text(text: str) -> np.ndarray:
     """
@@ -157,7 +150,7 @@ def encode_text(text: str) -> np.ndarray:
     processed_text = preprocess_text(text)
     
     # Codifica o texto usando o modelo
-    vector = model.encode(processed_text)
+    vector = model.encode([processed_text])[0]
     
     return vector
 
@@ -179,12 +172,85 @@ def encode_dataframe_column(df: pd.DataFrame, column_name: str, new_column_name:
     # Copia o DataFrame para não modificar o original
     df_copy = df.copy()
     
-    # Codifica cada texto na coluna
-    vectors = []
-    for text in df[column_name]:
-        vectors.append(encode_text(text))
+    # Codifica a coluna inteira em lote
+    vectors = encode_texts(df[column_name].tolist())
     
     # Adiciona os vetores como uma nova coluna
-    df_copy[new_column_name] = vectors
+    df_copy[new_column_name] = list(vectors)
+    
+    return df_copy
+
+def encode_texts(texts: List[str], preprocessed: bool = False,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> np.ndarray:
+    """
+    Codifica uma lista de textos em uma matriz de vetores (uma linha por texto).
+    
+    Args:
+        texts: Lista de textos a serem codificados
+        preprocessed: Indica se os textos já passaram por preprocess_text
+        batch_size: Quantidade de textos enviados ao modelo por vez
+    
+    Returns:
+        Matriz com uma representação vetorial por texto
+    """
+    model = load_embedding_model()
+    
+    if preprocessed:
+        processed_texts = list(texts)
+    else:
+        processed_texts = [preprocess_text(text) if isinstance(text, str) else "" for text in texts]
+    
+    return model.encode(processed_texts, batch_size=batch_size)
+
+def _level_to_int(text: str, levels: dict) -> int:
+    text_lower = text.lower() if isinstance(text, str) else ''
+    
+    # O último nível encontrado (na ordem do dicionário) prevalece
+    level_num = 0
+    for level, value in levels.items():
+        if level in text_lower:
+            level_num = value
     
-    return df_copy
\ No newline at end of file
+    return level_num
+
+def education_level_to_int(text: str) -> int:
+    """
+    Converte a descrição de formação acadêmica em um nível ordinal.
+    
+    Args:
+        text: Descrição do nível acadêmico (ex.: 'Ensino Superior Completo')
+    
+    Returns:
+        Nível ordinal (0 quando não reconhecido)
+    """
+    return _level_to_int(text, EDUCATION_LEVELS)
+
+def language_level_to_int(text: str) -> int:
+    """
+    Converte a descrição de proficiência em idioma em um nível ordinal.
+    
+    Args:
+        text: Descrição do nível no idioma (ex.: 'Avançado')
+    
+    Returns:
+        Nível ordinal (0 quando não reconhecido)
+    """
+    return _level_to_int(text, LANGUAGE_LEVELS)
+
+def levels_to_ordinal(values: pd.Series, to_int) -> np.ndarray:
+    """
+    Converte uma coluna de níveis (formação ou idioma) em códigos ordinais.
+    
+    A conversão é feita apenas sobre os valores distintos da coluna, que
+    costumam ser poucos, e depois distribuída para todas as linhas.
+    
+    Args:
+        values: Série com as descrições de nível
+        to_int: Função de conversão (education_level_to_int ou language_level_to_int)
+    
+    Returns:
+        Array int8 com o nível ordinal de cada linha
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object), use_na_sentinel=False)
+    mapped = np.array([to_int(value) for value in uniques], dtype=np.int8)
+    return mapped[codes] if len(codes) else np.zeros(0, dtype=np.int8)
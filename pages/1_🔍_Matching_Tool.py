@@ -2,9 +2,17 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-from helpers.data_loader import load_data, get_vaga_by_id
+from helpers.data_loader import get_shared_data, get_vaga_by_id, get_applicant_by_code
 from helpers.text_processor import preprocess_text, extract_skills
-from helpers.similarity_calculator import find_matching_candidates, get_candidates_by_vaga
+from helpers.similarity_calculator import get_candidates_by_vaga, rank_vaga, select_matches
+from helpers.batch_match import get_precomputed_matches
+from helpers.batch_scorer import SCORE_WEIGHTS
+from helpers.ranking_cache import get_ranking_cache
+from helpers.text_index import TEXT_BACKENDS
+from helpers.lazy_imports import start_warmup
+
+# Importa as dependências pesadas em segundo plano enquanto a página carrega
+start_warmup()
 
 # Configuração da página
 st.set_page_config(
@@ -26,21 +34,17 @@ st.markdown("""
 st.title("🔍 Ferramenta de Matching")
 st.markdown("### Encontre os candidatos mais adequados para cada vaga")
 
-# Inicializar estado da sessão para dados, se ainda não estiver feito
-if 'data_loaded' not in st.session_state:
-    with st.spinner("Carregando dados... Por favor, aguarde."):
-        try:
-            vagas_df, prospects_df, applicants_df = load_data()
-            st.session_state['vagas_df'] = vagas_df
-            st.session_state['prospects_df'] = prospects_df
-            st.session_state['applicants_df'] = applicants_df
-            st.session_state['data_loaded'] = True
-        except Exception as e:
-            st.error(f"Erro ao carregar os dados: {e}")
-else:
-    vagas_df = st.session_state['vagas_df']
-    prospects_df = st.session_state['prospects_df']
-    applicants_df = st.session_state['applicants_df']
+# Dados compartilhados por todas as sessões (snapshot somente leitura)
+with st.spinner("Carregando dados... Por favor, aguarde."):
+    try:
+        data = get_shared_data()
+        vagas_df, prospects_df, applicants_df = data
+    except Exception as e:
+        st.error(f"Erro ao carregar os dados: {e}")
+        st.stop()
+
+# Candidatos listados quando "Mostrar apenas os candidatos mais aderentes" está desmarcado
+MAX_LISTED_CANDIDATES = 100
 
 # Criar abas para diferentes funcionalidades de matching
 tab1, tab2 = st.tabs(["Buscar Candidatos para Vaga", "Ver Candidatos Inscritos"])
@@ -55,7 +59,7 @@ with tab1:
         vaga_selected = st.selectbox(
             "Selecione a vaga:",
             options=vagas_df['vaga_id'].tolist(),
-            format_func=lambda x: f"{vagas_df[vagas_df['vaga_id'] == x]['titulo_vaga'].iloc[0]} ({x})"
+            format_func=lambda x: f"{get_vaga_by_id(vagas_df, x)['titulo_vaga']} ({x})"
         )
     
     with col2:
@@ -64,7 +68,7 @@ with tab1:
     with col3:
         match_threshold = st.slider("Score mínimo de match (%):", min_value=0, max_value=100, value=50, step=5) / 100
     
-    col4, col5 = st.columns([1, 1])
+    col4, col5, col6 = st.columns([1, 1, 1])
     with col4:
         show_top_match = st.checkbox("Mostrar apenas os candidatos mais aderentes", value=True, 
                                    help="Quando selecionado, mostra apenas os candidatos com maior score de similaridade")
@@ -73,191 +77,238 @@ with tab1:
         filter_by_skill = st.checkbox("Filtrar por competências técnicas", value=False,
                                    help="Prioriza candidatos com maior match em competências técnicas")
     
+    with col6:
+        text_backend = st.selectbox(
+            "Similaridade de texto:",
+            options=TEXT_BACKENDS,
+            format_func=lambda x: {'dense': "Embeddings", 'tfidf': "TF-IDF", 'bm25': "BM25"}[x],
+            help="Método usado para comparar a descrição da vaga com o perfil dos candidatos"
+        )
+    
+    # Pesos de cada componente no score geral; mudar um peso só reordena o
+    # ranking já calculado (sem recalcular os scores)
+    with st.expander("Pesos do score geral"):
+        weight_labels = {
+            'text_similarity': "Similaridade Textual",
+            'skill_match': "Competências",
+            'education_match': "Formação",
+            'english_match': "Inglês",
+            'spanish_match': "Espanhol"
+        }
+        weight_columns = st.columns(len(weight_labels))
+        raw_weights = {}
+        for weight_column, (component, label) in zip(weight_columns, weight_labels.items()):
+            with weight_column:
+                raw_weights[component] = st.slider(label, min_value=0, max_value=100,
+                                                   value=int(round(SCORE_WEIGHTS[component] * 100)), step=5)
+        
+        # Normalizados para somarem 1, mantendo o score geral entre 0% e 100%
+        total_weight = sum(raw_weights.values())
+        if total_weight > 0:
+            score_weights = {component: value / total_weight for component, value in raw_weights.items()}
+        else:
+            st.warning("Todos os pesos estão zerados; usando os pesos padrão.")
+            score_weights = dict(SCORE_WEIGHTS)
+        st.caption(" | ".join(f"{weight_labels[component]}: {weight:.0%}" for component, weight in score_weights.items()))
+    
+    # A busca fica registrada na sessão: mexer nos filtros acima só refaz a
+    # seleção, sem recalcular os scores
+    ranking_key = (vaga_selected, text_backend, data.version)
     if st.button("Buscar Candidatos"):
-        with st.spinner("Analisando candidatos..."):
-            # Obter informações da vaga
-            job_data = vagas_df[vagas_df['vaga_id'] == vaga_selected].iloc[0]
+        st.session_state['vaga_search'] = ranking_key
+    
+    if st.session_state.get('vaga_search') == ranking_key:
+        n_candidates = top_n if show_top_match else MAX_LISTED_CANDIDATES
+        
+        # Usa o ranking pré-calculado (python -m helpers.batch_match) quando ele
+        # está atualizado; ele só vale para embeddings e pesos padrão
+        precomputed = None
+        if text_backend == 'dense' and score_weights == SCORE_WEIGHTS:
+            precomputed = get_precomputed_matches(vaga_selected, n_candidates)
+        
+        # Caso contrário, ranking completo da vaga (todos os candidatos, com
+        # cada componente do score), calculado uma vez por sessão
+        ranking = None
+        if precomputed is None:
+            stored = st.session_state.get('vaga_ranking')
+            if stored is None or stored[0] != ranking_key:
+                with st.spinner("Analisando candidatos..."):
+                    stored = (ranking_key, rank_vaga(vagas_df, applicants_df, vaga_selected, text_backend=text_backend))
+                st.session_state['vaga_ranking'] = stored
+            ranking = stored[1]
+        
+        # Obter informações da vaga
+        job_data = get_vaga_by_id(vagas_df, vaga_selected)
+        
+        # Exibir informações da vaga
+        with st.expander("Informações da Vaga", expanded=True):
+            col1, col2 = st.columns(2)
             
-            # Exibir informações da vaga
-            with st.expander("Informações da Vaga", expanded=True):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.markdown(f"**Título:** {job_data['titulo_vaga']}")
-                    st.markdown(f"**Cliente:** {job_data['cliente']}")
-                    st.markdown(f"**Localização:** {job_data['cidade']}, {job_data['estado']}")
-                    st.markdown(f"**Tipo de Contratação:** {job_data['tipo_contratacao']}")
-                
-                with col2:
-                    st.markdown(f"**Nível Profissional:** {job_data['nivel_profissional']}")
-                    st.markdown(f"**Nível Acadêmico:** {job_data['nivel_academico']}")
-                    st.markdown(f"**Inglês:** {job_data['nivel_ingles']}")
-                    st.markdown(f"**Espanhol:** {job_data['nivel_espanhol']}")
-                
-                st.markdown("**Área de Atuação:**")
-                st.markdown(job_data['areas_atuacao'])
-                
-                st.markdown("**Principais Atividades:**")
-                st.markdown(job_data['principais_atividades'])
-                
-                st.markdown("**Competências Técnicas e Comportamentais:**")
-                st.markdown(job_data['competencia_tecnicas'])
+            with col1:
+                st.markdown(f"**Título:** {job_data['titulo_vaga']}")
+                st.markdown(f"**Cliente:** {job_data['cliente']}")
+                st.markdown(f"**Localização:** {job_data['cidade']}, {job_data['estado']}")
+                st.markdown(f"**Tipo de Contratação:** {job_data['tipo_contratacao']}")
             
-            # Encontrar candidatos correspondentes
-            # Buscar candidatos de acordo com os critérios selecionados
-            matching_candidates = find_matching_candidates(
-                vagas_df, applicants_df, vaga_selected, top_n=top_n if show_top_match else 100
-            )
+            with col2:
+                st.markdown(f"**Nível Profissional:** {job_data['nivel_profissional']}")
+                st.markdown(f"**Nível Acadêmico:** {job_data['nivel_academico']}")
+                st.markdown(f"**Inglês:** {job_data['nivel_ingles']}")
+                st.markdown(f"**Espanhol:** {job_data['nivel_espanhol']}")
+            
+            st.markdown("**Área de Atuação:**")
+            st.markdown(job_data['areas_atuacao'])
             
+            st.markdown("**Principais Atividades:**")
+            st.markdown(job_data['principais_atividades'])
+            
+            st.markdown("**Competências Técnicas e Comportamentais:**")
+            st.markdown(job_data['competencia_tecnicas'])
+        
+        if (precomputed is None or precomputed.empty) and (ranking is None or len(ranking) == 0):
+            st.warning("Nenhum candidato adequado encontrado.")
+        else:
+            # Score mínimo, limite e ordenação por competências (entre os mais
+            # aderentes) aplicados sobre o ranking já calculado
+            if precomputed is not None:
+                matching_candidates = select_matches(precomputed, n_candidates, threshold=match_threshold,
+                                                     skill_first=filter_by_skill)
+            else:
+                matching_candidates = ranking.top(n_candidates, threshold=match_threshold,
+                                                  skill_first=filter_by_skill, weights=score_weights)
+            
+            # Verificar se ainda existem candidatos após os filtros
             if matching_candidates.empty:
-                st.warning("Nenhum candidato adequado encontrado.")
+                st.warning("Nenhum candidato atende aos critérios de filtro selecionados.")
             else:
-                # Aplicar filtros adicionais conforme selecionado pelo usuário
-                if match_threshold > 0:
-                    matching_candidates = matching_candidates[matching_candidates['overall_score'] >= match_threshold]
+                # Exibir resultados
+                st.markdown(f"### {len(matching_candidates)} Candidatos Recomendados")
+                st.success(f"Mostrando os candidatos mais aderentes à vaga com score mínimo de {match_threshold:.0%}")
                 
-                if filter_by_skill:
-                    # Ordenar primeiro por skill_match e depois por overall_score
-                    matching_candidates = matching_candidates.sort_values(['skill_match', 'overall_score'], ascending=[False, False])
+                # Adicionar métricas de resumo
+                avg_score = matching_candidates['overall_score'].mean()
+                max_score = matching_candidates['overall_score'].max()
                 
-                # Limitar ao número desejado
-                if show_top_match and len(matching_candidates) > top_n:
-                    matching_candidates = matching_candidates.head(top_n)
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric(label="Score Médio", value=f"{avg_score:.1%}")
+                with col2:
+                    st.metric(label="Score Máximo", value=f"{max_score:.1%}")
+                with col3:
+                    st.metric(label="Candidatos Encontrados", value=len(matching_candidates))
+            
+            # Criar gráfico radar para os 5 principais candidatos
+            if len(matching_candidates) >= 5:
+                top_5_candidates = matching_candidates.head(5)
                 
-                # Verificar se ainda existem candidatos após os filtros
-                if matching_candidates.empty:
-                    st.warning("Nenhum candidato atende aos critérios de filtro selecionados.")
-                else:
-                    # Exibir resultados
-                    st.markdown(f"### {len(matching_candidates)} Candidatos Recomendados")
-                    st.success(f"Mostrando os candidatos mais aderentes à vaga com score mínimo de {match_threshold:.0%}")
-                    
-                    # Adicionar métricas de resumo
-                    avg_score = matching_candidates['overall_score'].mean()
-                    max_score = matching_candidates['overall_score'].max()
-                    
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric(label="Score Médio", value=f"{avg_score:.1%}")
-                    with col2:
-                        st.metric(label="Score Máximo", value=f"{max_score:.1%}")
-                    with col3:
-                        st.metric(label="Candidatos Encontrados", value=len(matching_candidates))
+                # Preparar dados para o gráfico radar
+                categories = ['Similaridade Textual', 'Competências', 'Formação', 'Inglês', 'Espanhol']
                 
-                # Criar gráfico radar para os 5 principais candidatos
-                if len(matching_candidates) >= 5:
-                    top_5_candidates = matching_candidates.head(5)
-                    
-                    # Preparar dados para o gráfico radar
-                    categories = ['Similaridade Textual', 'Competências', 'Formação', 'Inglês', 'Espanhol']
-                    
-                    fig = px.line_polar(
-                        r=[0, 0.25, 0.5, 0.75, 1],
+                fig = px.line_polar(
+                    r=[0, 0.25, 0.5, 0.75, 1],
+                    theta=categories,
+                    line_close=True,
+                    range_r=[0, 1],
+                    title="Comparação Top 5 Candidatos"
+                )
+                
+                for i, (_, candidate) in enumerate(top_5_candidates.iterrows()):
+                    fig.add_trace(px.line_polar(
+                        r=[
+                            candidate['text_similarity'], 
+                            candidate['skill_match'], 
+                            candidate['education_match'],
+                            candidate['english_match'],
+                            candidate['spanish_match']
+                        ],
                         theta=categories,
                         line_close=True,
-                        range_r=[0, 1],
-                        title="Comparação Top 5 Candidatos"
-                    )
+                        range_r=[0, 1]
+                    ).data[0])
+                
+                fig.update_traces(fill='toself')
+                fig.update_layout(
+                    polar=dict(
+                        radialaxis=dict(
+                            visible=True,
+                            range=[0, 1]
+                        )
+                    ),
+                    showlegend=False
+                )
+                
+                st.plotly_chart(fig)
+            
+            # Exibir tabela de candidatos
+            formatted_candidates = matching_candidates.copy()
+            
+            # Formatar pontuações como percentuais
+            score_columns = ['overall_score', 'text_similarity', 'skill_match', 
+                            'education_match', 'english_match', 'spanish_match']
+            
+            for col in score_columns:
+                formatted_candidates[col] = formatted_candidates[col].apply(lambda x: f"{x:.1%}")
+            
+            # Renomear colunas para exibição
+            formatted_candidates = formatted_candidates.rename(columns={
+                'codigo': 'Código',
+                'nome': 'Nome',
+                'area_atuacao': 'Área de Atuação',
+                'nivel_academico': 'Formação Acadêmica',
+                'nivel_ingles': 'Nível de Inglês',
+                'nivel_espanhol': 'Nível de Espanhol',
+                'overall_score': 'Pontuação Geral',
+                'text_similarity': 'Similaridade Textual',
+                'skill_match': 'Competências',
+                'education_match': 'Match Formação',
+                'english_match': 'Match Inglês',
+                'spanish_match': 'Match Espanhol'
+            })
+            
+            st.dataframe(formatted_candidates)
+            
+            # Visão detalhada de cada candidato
+            for i, (_, candidate) in enumerate(matching_candidates.iterrows()):
+                with st.expander(f"{i+1}. {candidate['nome']} - {candidate['overall_score']:.1%}"):
+                    col1, col2 = st.columns(2)
                     
-                    for i, (_, candidate) in enumerate(top_5_candidates.iterrows()):
-                        fig.add_trace(px.line_polar(
-                            r=[
-                                candidate['text_similarity'], 
-                                candidate['skill_match'], 
-                                candidate['education_match'],
-                                candidate['english_match'],
-                                candidate['spanish_match']
-                            ],
-                            theta=categories,
-                            line_close=True,
-                            range_r=[0, 1]
-                        ).data[0])
+                    with col1:
+                        st.markdown(f"**Código:** {candidate['codigo']}")
+                        st.markdown(f"**Nome:** {candidate['nome']}")
+                        st.markdown(f"**Área de Atuação:** {candidate['area_atuacao']}")
+                        st.markdown(f"**Formação:** {candidate['nivel_academico']}")
                     
-                    fig.update_traces(fill='toself')
-                    fig.update_layout(
-                        polar=dict(
-                            radialaxis=dict(
-                                visible=True,
-                                range=[0, 1]
-                            )
-                        ),
-                        showlegend=False
-                    )
+                    with col2:
+                        st.markdown(f"**Pontuação Geral:** {candidate['overall_score']:.1%}")
+                        st.markdown(f"**Similaridade Textual:** {candidate['text_similarity']:.1%}")
+                        st.markdown(f"**Match de Competências:** {candidate['skill_match']:.1%}")
+                        st.markdown(f"**Match de Formação:** {candidate['education_match']:.1%}")
+                        st.markdown(f"**Match de Inglês:** {candidate['english_match']:.1%}")
+                        st.markdown(f"**Match de Espanhol:** {candidate['spanish_match']:.1%}")
                     
-                    st.plotly_chart(fig)
-                
-                # Exibir tabela de candidatos
-                formatted_candidates = matching_candidates.copy()
-                
-                # Formatar pontuações como percentuais
-                score_columns = ['overall_score', 'text_similarity', 'skill_match', 
-                                'education_match', 'english_match', 'spanish_match']
-                
-                for col in score_columns:
-                    formatted_candidates[col] = formatted_candidates[col].apply(lambda x: f"{x:.1%}")
-                
-                # Renomear colunas para exibição
-                formatted_candidates = formatted_candidates.rename(columns={
-                    'codigo': 'Código',
-                    'nome': 'Nome',
-                    'area_atuacao': 'Área de Atuação',
-                    'nivel_academico': 'Formação Acadêmica',
-                    'nivel_ingles': 'Nível de Inglês',
-                    'nivel_espanhol': 'Nível de Espanhol',
-                    'overall_score': 'Pontuação Geral',
-                    'text_similarity': 'Similaridade Textual',
-                    'skill_match': 'Competências',
-                    'education_match': 'Match Formação',
-                    'english_match': 'Match Inglês',
-                    'spanish_match': 'Match Espanhol'
-                })
-                
-                st.dataframe(formatted_candidates)
-                
-                # Visão detalhada de cada candidato
-                for i, (_, candidate) in enumerate(matching_candidates.iterrows()):
-                    with st.expander(f"{i+1}. {candidate['nome']} - {candidate['overall_score']:.1%}"):
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.markdown(f"**Código:** {candidate['codigo']}")
-                            st.markdown(f"**Nome:** {candidate['nome']}")
-                            st.markdown(f"**Área de Atuação:** {candidate['area_atuacao']}")
-                            st.markdown(f"**Formação:** {candidate['nivel_academico']}")
-                        
-                        with col2:
-                            st.markdown(f"**Pontuação Geral:** {candidate['overall_score']:.1%}")
-                            st.markdown(f"**Similaridade Textual:** {candidate['text_similarity']:.1%}")
-                            st.markdown(f"**Match de Competências:** {candidate['skill_match']:.1%}")
-                            st.markdown(f"**Match de Formação:** {candidate['education_match']:.1%}")
-                            st.markdown(f"**Match de Inglês:** {candidate['english_match']:.1%}")
-                            st.markdown(f"**Match de Espanhol:** {candidate['spanish_match']:.1%}")
+                    # Encontrar perfil do candidato nos dados de candidatos
+                    profile = get_applicant_by_code(applicants_df, candidate['codigo'])
+                    
+                    if profile is not None:
+                        st.markdown("**Perfil Profissional:**")
+                        st.markdown(profile.get('titulo_profissional', ''))
                         
-                        # Encontrar perfil do candidato nos dados de candidatos
-                        candidate_profile = applicants_df[applicants_df['codigo_profissional'] == candidate['codigo']]
+                        st.markdown("**Conhecimentos Técnicos:**")
+                        st.markdown(profile.get('conhecimentos_tecnicos', ''))
                         
-                        if not candidate_profile.empty:
-                            profile = candidate_profile.iloc[0]
-                            
-                            st.markdown("**Perfil Profissional:**")
-                            st.markdown(profile.get('titulo_profissional', ''))
-                            
-                            st.markdown("**Conhecimentos Técnicos:**")
-                            st.markdown(profile.get('conhecimentos_tecnicos', ''))
-                            
-                            st.markdown("**Certificações:**")
-                            st.markdown(profile.get('certificacoes', ''))
-                
-                # Opções de download
-                st.markdown("### Download dos Resultados")
-                
-                csv = matching_candidates.to_csv(index=False)
-                st.download_button(
-                    label="Baixar como CSV",
-                    data=csv,
-                    file_name=f"candidatos_vaga_{vaga_selected}.csv",
-                    mime="text/csv"
-                )
+                        st.markdown("**Certificações:**")
+                        st.markdown(profile.get('certificacoes', ''))
+            
+            # Opções de download
+            st.markdown("### Download dos Resultados")
+            
+            csv = matching_candidates.to_csv(index=False)
+            st.download_button(
+                label="Baixar como CSV",
+                data=csv,
+                file_name=f"candidatos_vaga_{vaga_selected}.csv",
+                mime="text/csv"
+            )
 
 with tab2:
     st.markdown("### Ver Candidatos Inscritos")
@@ -266,14 +317,14 @@ with tab2:
     vaga_selected_2 = st.selectbox(
         "Selecione a vaga:",
         options=vagas_df['vaga_id'].tolist(),
-        format_func=lambda x: f"{vagas_df[vagas_df['vaga_id'] == x]['titulo_vaga'].iloc[0]} ({x})",
+        format_func=lambda x: f"{get_vaga_by_id(vagas_df, x)['titulo_vaga']} ({x})",
         key="vaga_selectbox_2"
     )
     
     if st.button("Ver Candidatos"):
         with st.spinner("Buscando candidatos inscritos..."):
             # Obter informações da vaga
-            job_data = vagas_df[vagas_df['vaga_id'] == vaga_selected_2].iloc[0]
+            job_data = get_vaga_by_id(vagas_df, vaga_selected_2)
             
             # Exibir informações da vaga
             with st.expander("Informações da Vaga", expanded=True):
@@ -347,6 +398,17 @@ with tab2:
                     mime="text/csv"
                 )
 
+# Contadores do cache de rankings (compartilhado por todas as sessões do processo)
+ranking_stats = get_ranking_cache().stats()
+st.sidebar.metric(
+    "Cache de rankings",
+    f"{ranking_stats['hits']} acertos / {ranking_stats['misses']} falhas",
+    help=(f"{ranking_stats['memory_hits']} em memória, {ranking_stats['disk_hits']} em disco; "
+          f"{ranking_stats['evictions']} remoções por falta de espaço, "
+          f"{ranking_stats['invalidations']} invalidações por nova versão dos dados; "
+          f"{ranking_stats['entries']} rankings ({ranking_stats['memory_bytes'] / 1e6:.1f} MB) em memória")
+)
+
 # Rodapé com nomes da equipe
 st.markdown(
     """
@@ -4,7 +4,7 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-from helpers.data_loader import load_data
+from helpers.data_loader import get_shared_data
 
 # Set page configuration
 st.set_page_config(
@@ -26,21 +26,13 @@ st.markdown("""
 st.title("📊 Analytics")
 st.markdown("### Visualize estatísticas e insights sobre o processo de recrutamento")
 
-# Initialize session state for data if not already done
-if 'data_loaded' not in st.session_state:
-    with st.spinner("Carregando dados... Por favor, aguarde."):
-        try:
-            vagas_df, prospects_df, applicants_df = load_data()
-            st.session_state['vagas_df'] = vagas_df
-            st.session_state['prospects_df'] = prospects_df
-            st.session_state['applicants_df'] = applicants_df
-            st.session_state['data_loaded'] = True
-        except Exception as e:
-            st.error(f"Erro ao carregar os dados: {e}")
-else:
-    vagas_df = st.session_state['vagas_df']
-    prospects_df = st.session_state['prospects_df']
-    applicants_df = st.session_state['applicants_df']
+# Dados compartilhados por todas as sessões (snapshot somente leitura)
+with st.spinner("Carregando dados... Por favor, aguarde."):
+    try:
+        vagas_df, prospects_df, applicants_df = get_shared_data()
+    except Exception as e:
+        st.error(f"Erro ao carregar os dados: {e}")
+        st.stop()
 
 # Create tabs for analytics sections
 tab1, tab2, tab3 = st.tabs(["Visão Geral", "Análise de Vagas", "Análise de Candidatos"])
@@ -99,8 +91,8 @@ with tab1:
     
     # Time series of applications
     if not prospects_df.empty and 'data_candidatura' in prospects_df.columns:
-        # Convert date strings to datetime
-        prospects_df['data_candidatura_dt'] = pd.to_datetime(
+        # Convert date strings to datetime (local series: the shared data is read-only)
+        data_candidatura_dt = pd.to_datetime(
             prospects_df['data_candidatura'], 
             format='%d-%m-%Y', 
             errors='coerce'
@@ -108,7 +100,7 @@ with tab1:
         
         # Group by date and count
         time_series = prospects_df.groupby(
-            prospects_df['data_candidatura_dt'].dt.to_period('M')
+            data_candidatura_dt.dt.to_period('M')
         ).size().reset_index()
         
         time_series.columns = ['Mês', 'Candidaturas']
@@ -153,11 +145,11 @@ with tab2:
         
         # Distribution of job vacancies by location
         if 'estado' in vagas_df.columns and 'cidade' in vagas_df.columns:
-            # Create a location column
-            vagas_df['localização'] = vagas_df['cidade'] + ', ' + vagas_df['estado']
+            # Build the location of each vacancy
+            localizacao = vagas_df['cidade'] + ', ' + vagas_df['estado']
             
             # Count vacancies by location
-            location_counts = vagas_df['localização'].value_counts().head(10).reset_index()
+            location_counts = localizacao.value_counts().head(10).reset_index()
             location_counts.columns = ['Localização', 'Contagem']
             
             # Create horizontal bar chart
@@ -213,8 +205,7 @@ with tab3:
         # Distribution of candidates by area
         if 'area_atuacao' in applicants_df.columns:
             # Split and count areas
-            applicants_df['area_atuacao'] = applicants_df['area_atuacao'].astype(str)
-            areas = applicants_df['area_atuacao'].str.split(',').explode().str.strip()
+            areas = applicants_df['area_atuacao'].astype(str).str.split(',').explode().str.strip()
             area_counts = areas.value_counts().head(10).reset_index()
             area_counts.columns = ['Área', 'Contagem']
             
@@ -267,25 +258,23 @@ with tab3:
     # Process duration analysis
     if not prospects_df.empty and 'data_candidatura' in prospects_df.columns and 'ultima_atualizacao' in prospects_df.columns:
         # Convert date strings to datetime
-        prospects_df['data_candidatura_dt'] = pd.to_datetime(
+        data_candidatura_dt = pd.to_datetime(
             prospects_df['data_candidatura'], 
             format='%d-%m-%Y', 
             errors='coerce'
         )
         
-        prospects_df['ultima_atualizacao_dt'] = pd.to_datetime(
+        ultima_atualizacao_dt = pd.to_datetime(
             prospects_df['ultima_atualizacao'], 
             format='%d-%m-%Y', 
             errors='coerce'
         )
         
         # Calculate duration in days
-        prospects_df['duration'] = (
-            prospects_df['ultima_atualizacao_dt'] - prospects_df['data_candidatura_dt']
-        ).dt.days
+        duration = (ultima_atualizacao_dt - data_candidatura_dt).dt.days
         
         # Filter valid durations
-        valid_duration = prospects_df[prospects_df['duration'] >= 0]
+        valid_duration = prospects_df[['situacao_candidado']].assign(duration=duration)[duration >= 0]
         
         if not valid_duration.empty:
             # Group by status and calculate average duration
@@ -311,14 +300,14 @@ st.sidebar.markdown("## Filtros")
 
 # Date range filter for prospects
 if not prospects_df.empty and 'data_candidatura' in prospects_df.columns:
-    prospects_df['data_candidatura_dt'] = pd.to_datetime(
+    data_candidatura_dt = pd.to_datetime(
         prospects_df['data_candidatura'], 
         format='%d-%m-%Y', 
         errors='coerce'
     )
     
-    min_date = prospects_df['data_candidatura_dt'].min().date()
-    max_date = prospects_df['data_candidatura_dt'].max().date()
+    min_date = data_candidatura_dt.min().date()
+    max_date = data_candidatura_dt.max().date()
     
     date_range = st.sidebar.date_input(
         "Período de Candidatura",
@@ -330,8 +319,8 @@ if not prospects_df.empty and 'data_candidatura' in prospects_df.columns:
     if len(date_range) == 2:
         start_date, end_date = date_range
         filtered_prospects = prospects_df[
-            (prospects_df['data_candidatura_dt'].dt.date >= start_date) & 
-            (prospects_df['data_candidatura_dt'].dt.date <= end_date)
+            (data_candidatura_dt.dt.date >= start_date) & 
+            (data_candidatura_dt.dt.date <= end_date)
         ]
         
         st.sidebar.markdown(f"**Candidaturas no período:** {len(filtered_prospects)}")
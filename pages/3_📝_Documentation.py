@@ -73,6 +73,8 @@ Compara o nível de inglês exigido pela vaga com o nível de inglês do candida
 ### 5. Match de Espanhol (10%)
 Compara o nível de espanhol exigido pela vaga com o nível de espanhol do candidato.
 
+Os percentuais acima são os pesos padrão. Na Matching Tool, os pesos podem ser ajustados em "Pesos do score geral"; o ranking é reordenado na hora, sem recalcular as métricas.
+
 ## Ferramentas Utilizadas
 
 - **Python**: Linguagem de programação principal
@@ -0,0 +1,76 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from helpers.data_loader import load_data
+
+N_APPLICANTS = 240
+N_VAGAS = 6
+
+SKILLS = ['python', 'java', 'sql', 'aws', 'docker', 'scrum', 'excel', 'power bi', 'sap', 'react', 'machine learning']
+EDUCATION = ['Ensino Médio Completo', 'Ensino Superior Completo', 'Pós Graduação Completo', 'Mestrado Completo', '']
+LANGUAGES = ['Nenhum', 'Básico', 'Intermediário', 'Avançado', 'Fluente', '']
+WORDS = 'analista desenvolvedor sênior pleno júnior sistemas dados negócio suporte infraestrutura'.split()
+
+# Text similarity of a subset of rows may differ from the full mat-vec in the last bit
+ATOL = 1e-12
+
+def make_applicant(rng: np.random.Generator, code: int) -> dict:
+    return {
+        'codigo_profissional': code,
+        'nome': f'Pessoa {code}',
+        'titulo_profissional': ' '.join(rng.choice(WORDS, 3)),
+        'area_atuacao': rng.choice(['TI - SAP', 'TI - Projetos', 'Administrativa']),
+        'conhecimentos_tecnicos': ', '.join(rng.choice(SKILLS, rng.integers(0, 5), replace=False)),
+        'certificacoes': rng.choice(['', 'AWS Certified', 'PMP']),
+        'qualificacoes': rng.choice(['', f'Experiência com {rng.choice(SKILLS)}']),
+        'nivel_academic': rng.choice(EDUCATION),
+        'nivel_ingles': rng.choice(LANGUAGES),
+        'nivel_espanhol': rng.choice(LANGUAGES),
+        'local': rng.choice(['São Paulo', 'Rio', ''])
+    }
+
+def write_corpus(directory, rng: np.random.Generator, n_applicants: int = N_APPLICANTS) -> None:
+    applicants = pd.DataFrame([make_applicant(rng, 10_000 + i) for i in range(n_applicants)])
+    applicants.to_csv(os.path.join(directory, 'applicants.csv'), encoding='utf-8')
+
+    vagas, prospects = {}, {}
+    for v in range(N_VAGAS):
+        vaga_id = str(5000 + v)
+        vagas[vaga_id] = {
+            'informacoes_basicas': {'titulo_vaga': f'Vaga {v}', 'cliente': 'Cliente', 'tipo_contratacao': 'CLT Full'},
+            'perfil_vaga': {
+                'nivel_academico': rng.choice(EDUCATION), 'nivel_ingles': rng.choice(LANGUAGES),
+                'nivel_espanhol': rng.choice(LANGUAGES), 'areas_atuacao': 'TI - Projetos',
+                'principais_atividades': ' '.join(rng.choice(WORDS, 20)),
+                'competencia_tecnicas_e_comportamentais': 'Conhecimento em ' + ', '.join(rng.choice(SKILLS, 3, replace=False))
+            }
+        }
+        codes = rng.choice(n_applicants, rng.integers(1, 15), replace=False) + 10_000
+        prospects[vaga_id] = {'titulo': f'Vaga {v}', 'modalidade': '',
+                              'prospects': [{'nome': f'Pessoa {c}', 'codigo': str(c)} for c in codes.tolist()]}
+
+    with open(os.path.join(directory, 'vagas.json'), 'w', encoding='utf-8') as file:
+        json.dump(vagas, file, ensure_ascii=False)
+    with open(os.path.join(directory, 'prospects.json'), 'w', encoding='utf-8') as file:
+        json.dump(prospects, file, ensure_ascii=False)
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    # The application reads and writes its files in the working directory
+    monkeypatch.setenv('EMBEDDING_BACKEND', 'bytes')
+    monkeypatch.chdir(tmp_path)
+    write_corpus(tmp_path, np.random.default_rng(0))
+    return load_data()
+
+@pytest.fixture
+def large_corpus(tmp_path, monkeypatch):
+    # Several SHARD_ALIGNMENT blocks, for the code paths that score blocks of rows
+    monkeypatch.setenv('EMBEDDING_BACKEND', 'bytes')
+    monkeypatch.chdir(tmp_path)
+    write_corpus(tmp_path, np.random.default_rng(0), n_applicants=3000)
+    return load_data()
+
+def jobs(vagas_df: pd.DataFrame) -> list:
+    return [row for _, row in vagas_df.iterrows()]
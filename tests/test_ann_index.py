@@ -0,0 +1,61 @@
+import threading
+import numpy as np
+import pytest
+from helpers.ann_index import IVFIndex, evaluate_recall, get_ann_index
+from helpers.batch_scorer import CandidateFeatures, top_k_indices
+
+def _clustered_vectors(rng: np.random.Generator, n: int, dim: int = 32, n_clusters: int = 20) -> np.ndarray:
+    centers = rng.standard_normal((n_clusters, dim))
+    vectors = centers[rng.integers(0, n_clusters, n)] + 0.3 * rng.standard_normal((n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+@pytest.fixture
+def vectors():
+    return _clustered_vectors(np.random.default_rng(0), 4000)
+
+def test_recall_against_exact_search(vectors):
+    index = IVFIndex(n_lists=64).fit(vectors)
+    queries = _clustered_vectors(np.random.default_rng(1), 50)
+    report = {row['n_probe']: row for row in evaluate_recall(index, queries, k=10, n_probe_values=[1, 8, 64])}
+    assert report[8]['recall'] >= 0.9
+    assert report[8]['scanned_fraction'] < 0.3
+    # Probing every list is an exact search
+    assert report[64]['recall'] == 1.0
+    for query in queries:
+        ids, scores = index.search(query, 10, n_probe=64)
+        exact = np.asarray(vectors @ query)
+        assert np.array_equal(ids, top_k_indices(exact, 10))
+        assert np.array_equal(scores, exact[ids])
+
+def test_search_returns_k_rows_from_small_lists(vectors):
+    index = IVFIndex(n_lists=400, n_probe=1).fit(vectors)
+    for query in vectors[:20]:
+        for k in [50, 500]:
+            ids, scores = index.search(query, k)
+            assert len(ids) == k and len(np.unique(ids)) == k
+            assert np.all(np.diff(scores) <= 0)
+    ids, _ = index.search(vectors[0], len(vectors) + 10)
+    assert len(ids) == len(vectors)
+
+def test_concurrent_get_ann_index_trains_once(vectors, tmp_path, monkeypatch):
+    features = CandidateFeatures(embeddings=vectors, skill_matrix=None, education_levels=None,
+                                 english_levels=None, spanish_levels=None, embedding_version='v1')
+    fits = []
+    fit = IVFIndex.fit
+
+    def counted_fit(self, *args, **kwargs):
+        fits.append(threading.get_ident())
+        return fit(self, *args, **kwargs)
+
+    monkeypatch.setattr(IVFIndex, 'fit', counted_fit)
+
+    path = str(tmp_path / 'index.npz')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_ann_index(features, path))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(fits) == 1
+    assert all(index is results[0] for index in results)
+    assert IVFIndex.load(path, vectors).version == 'v1'
@@ -0,0 +1,120 @@
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import make_applicant
+import helpers.batch_match as batch_match
+from helpers.batch_match import get_precomputed_matches, run_batch
+from helpers.data_loader import CACHE_DIR
+from helpers.similarity_calculator import find_matching_candidates, rank_vaga, select_matches
+from helpers.skill_extractor import DEFAULT_TAXONOMY_PATH
+
+TOP_K = 20
+
+def _assert_matches_on_demand(corpus, path, top_n=10):
+    vagas_df, _, applicants_df = corpus
+    for vaga_id in vagas_df['vaga_id'].tolist():
+        expected = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=top_n, workers=1, use_cache=False)
+        precomputed = get_precomputed_matches(vaga_id, top_n, path)
+        assert precomputed['codigo'].tolist() == [str(code) for code in expected['codigo']]
+        assert np.array_equal(precomputed['overall_score'], expected['overall_score'])
+
+def test_interrupted_run_resumes_finished_shards(corpus, monkeypatch):
+    ranked = []
+    rank_vagas = batch_match.rank_vagas
+
+    def interrupted(vagas_df, applicants_df, vaga_ids, top_k):
+        if len(ranked) == 2:
+            raise KeyboardInterrupt
+        ranked.append(vaga_ids)
+        return rank_vagas(vagas_df, applicants_df, vaga_ids, top_k)
+
+    monkeypatch.setattr(batch_match, 'rank_vagas', interrupted)
+    # 6 vagas in 3 shards: the run stops after two of them
+    with pytest.raises(KeyboardInterrupt):
+        run_batch('matches.parquet', TOP_K, shard_size=2, workers=0)
+    assert not os.path.exists('matches.parquet')
+
+    ranked.clear()
+    monkeypatch.setattr(batch_match, 'rank_vagas', lambda *args: ranked.append(args[2]) or rank_vagas(*args))
+    stats = run_batch('matches.parquet', TOP_K, shard_size=2, workers=0)
+    assert stats['resumed_shards'] == 2 and ranked == [corpus.vagas_df['vaga_id'].tolist()[4:]]
+    assert stats['rows'] == len(corpus.vagas_df) * TOP_K
+    # The shards are removed once the table is written
+    assert not os.path.exists(os.path.join(CACHE_DIR, 'batch_match'))
+    _assert_matches_on_demand(corpus, 'matches.parquet')
+
+def test_shards_of_other_inputs_are_not_resumed(corpus, monkeypatch):
+    rank_vagas = batch_match.rank_vagas
+
+    def interrupted(vagas_df, applicants_df, vaga_ids, top_k):
+        if vaga_ids[0] != vagas_df['vaga_id'].iloc[0]:
+            raise KeyboardInterrupt
+        return rank_vagas(vagas_df, applicants_df, vaga_ids, top_k)
+
+    monkeypatch.setattr(batch_match, 'rank_vagas', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        run_batch('matches.parquet', TOP_K, shard_size=2, workers=0)
+
+    monkeypatch.setattr(batch_match, 'rank_vagas', rank_vagas)
+    # A shard computed with other weights is not reused
+    monkeypatch.setattr(batch_match, 'SCORE_WEIGHTS', {**batch_match.SCORE_WEIGHTS, 'skill_match': 0.5})
+    assert run_batch('matches.parquet', TOP_K, shard_size=2, workers=0)['resumed_shards'] == 0
+
+def test_stale_table_is_not_served(corpus, monkeypatch):
+    run_batch('matches.parquet', TOP_K, shard_size=4, workers=0)
+    _assert_matches_on_demand(corpus, 'matches.parquet')
+    vaga_id = corpus.vagas_df['vaga_id'].iloc[0]
+    assert get_precomputed_matches(vaga_id, TOP_K + 1, 'matches.parquet') is None
+    assert get_precomputed_matches(vaga_id, TOP_K, 'missing.parquet') is None
+
+    # Other score weights
+    with monkeypatch.context() as patch:
+        patch.setattr(batch_match, 'SCORE_WEIGHTS', {**batch_match.SCORE_WEIGHTS, 'skill_match': 0.5})
+        assert get_precomputed_matches(vaga_id, TOP_K, 'matches.parquet') is None
+    assert get_precomputed_matches(vaga_id, TOP_K, 'matches.parquet') is not None
+
+    # Another embedding backend
+    with monkeypatch.context() as patch:
+        patch.setenv('EMBEDDING_BACKEND', 'hashing')
+        assert get_precomputed_matches(vaga_id, TOP_K, 'matches.parquet') is None
+
+    # New source data
+    applicants = pd.read_csv('applicants.csv', index_col=0)
+    inserted = pd.DataFrame([make_applicant(np.random.default_rng(1), 99_999)], index=[applicants.index.max() + 1])
+    pd.concat([applicants, inserted]).to_csv('applicants.csv', encoding='utf-8')
+    assert get_precomputed_matches(vaga_id, TOP_K, 'matches.parquet') is None
+
+    # A table written over the old one is reread
+    shutil.copy('matches.parquet', 'old.parquet')
+    run_batch('matches.parquet', TOP_K, shard_size=4, workers=0)
+    assert get_precomputed_matches(vaga_id, TOP_K, 'old.parquet') is None
+    assert get_precomputed_matches(vaga_id, TOP_K, 'matches.parquet') is not None
+
+def test_taxonomy_change_makes_the_table_stale(corpus, tmp_path, monkeypatch):
+    run_batch('matches.parquet', TOP_K, shard_size=4, workers=0)
+    vaga_id = corpus.vagas_df['vaga_id'].iloc[0]
+    with open(DEFAULT_TAXONOMY_PATH, encoding='utf-8') as file:
+        taxonomy = json.load(file)
+    taxonomy['python'] = taxonomy['python'] + ['pitão']
+    taxonomy_path = tmp_path / 'skills_taxonomy.json'
+    taxonomy_path.write_text(json.dumps(taxonomy, ensure_ascii=False), encoding='utf-8')
+
+    monkeypatch.setattr(batch_match, 'DEFAULT_TAXONOMY_PATH', str(taxonomy_path))
+    assert get_precomputed_matches(vaga_id, TOP_K, 'matches.parquet') is None
+
+@pytest.mark.parametrize('top_n, threshold, skill_first', [(10, 0.0, False), (10, 0.0, True), (20, 0.75, True), (5, 0.78, False)])
+def test_select_matches_agrees_with_on_demand_ranking(corpus, top_n, threshold, skill_first):
+    # The Matching Tool filters either source and must show the same list
+    vagas_df, _, applicants_df = corpus
+    run_batch('matches.parquet', TOP_K, shard_size=4, workers=0)
+    for vaga_id in vagas_df['vaga_id'].tolist():
+        precomputed = get_precomputed_matches(vaga_id, top_n, 'matches.parquet')
+        selected = select_matches(precomputed, top_n, threshold=threshold, skill_first=skill_first)
+        ranking = rank_vaga(vagas_df, applicants_df, vaga_id, workers=1, use_cache=False)
+        expected = ranking.top(top_n, threshold=threshold, skill_first=skill_first)
+        assert selected['codigo'].tolist() == [str(code) for code in expected['codigo']]
+        assert np.array_equal(selected['overall_score'], expected['overall_score'])
+        assert np.array_equal(selected['skill_match'], expected['skill_match'])
@@ -0,0 +1,14 @@
+import pytest
+from conftest import ATOL, jobs
+from helpers.batch_scorer import get_candidate_features, score_job
+from helpers.similarity_calculator import calculate_similarity
+
+def test_batch_scores_match_calculate_similarity(corpus):
+    vagas_df, _, applicants_df = corpus
+    features = get_candidate_features(applicants_df)
+    for job in jobs(vagas_df):
+        scores = score_job(job, features)
+        for row in range(0, len(applicants_df), 7):
+            expected = calculate_similarity(job, applicants_df.iloc[row])
+            for name, value in expected.items():
+                assert scores[name][row] == pytest.approx(value, abs=ATOL)
@@ -0,0 +1,44 @@
+import json
+import numpy as np
+import pandas as pd
+from helpers.data_cache import DataCache, source_fingerprint
+from helpers.data_loader import CACHE_DIR, load_data
+from helpers.data_store import normalize_keys
+
+def test_cached_frames_equal_parsed_frames(corpus):
+    cached = load_data()
+    parsed = load_data(use_cache=False)
+    assert cached.version == parsed.version
+    for cached_df, parsed_df in zip(cached, parsed):
+        pd.testing.assert_frame_equal(cached_df, parsed_df)
+
+def test_mixed_type_columns_are_cached_as_strings(tmp_path):
+    source = tmp_path / 'source.json'
+    source.write_text('{}', encoding='utf-8')
+    fingerprint = dict(source_fingerprint([str(source)]), options={})
+    df = pd.DataFrame({'codigo': [123, '456', None, 7.5], 'nome': ['a', 'b', 'c', 'd']})
+
+    cache = DataCache(str(tmp_path / 'cache'))
+    assert cache.save(fingerprint, {'prospects': df})
+    loaded = cache.load(fingerprint)['prospects']
+    assert loaded['codigo'].tolist() == ['123', '456', None, '7.5']
+    assert loaded['nome'].tolist() == df['nome'].tolist()
+    # The frame passed in is not modified
+    assert df['codigo'].tolist()[0] == 123
+
+def test_load_data_caches_mixed_prospect_codes(corpus):
+    with open('prospects.json', encoding='utf-8') as file:
+        prospects = json.load(file)
+    for prospect in prospects['5000']['prospects']:
+        prospect['codigo'] = int(prospect['codigo'])
+    with open('prospects.json', 'w', encoding='utf-8') as file:
+        json.dump(prospects, file, ensure_ascii=False)
+
+    parsed = load_data()
+    fingerprint = source_fingerprint(['vagas.json', 'prospects.json', 'applicants.csv'])
+    fingerprint['options'] = {'lean': False, 'drop_raw_text': False}
+    assert DataCache(CACHE_DIR).load(fingerprint) is not None
+
+    cached = load_data()
+    assert np.array_equal(normalize_keys(cached.prospects_df['codigo']), normalize_keys(parsed.prospects_df['codigo']))
+    assert cached.prospects('5000')['codigo'].tolist() == [str(code) for code in parsed.prospects('5000')['codigo']]
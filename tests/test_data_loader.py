@@ -0,0 +1,22 @@
+from helpers.data_loader import describe_load, load_data
+from helpers.data_refresher import DataRefresher
+
+def test_load_stats_report_the_parse(corpus):
+    parsed = load_data(use_cache=False)
+    stats = parsed.load_stats
+    assert stats['source'] == 'files' and stats['peak_rss_bytes'] > 0
+    assert stats['vagas']['rows'] == len(parsed.vagas_df)
+    assert stats['prospects']['rows'] == len(parsed.prospects_df)
+    assert f"prospects: {len(parsed.prospects_df)} linhas" in describe_load(stats)
+
+    # The corpus fixture already filled the columnar cache
+    assert load_data().load_stats['source'] == 'cache'
+
+def test_refreshed_store_reports_the_changed_files(corpus):
+    refresher = DataRefresher()
+    with open('vagas.json', 'a', encoding='utf-8') as file:
+        file.write('\n')
+    refresher.refresh()
+    stats = refresher.store.load_stats
+    assert stats['source'] == 'refresh'
+    assert stats['vagas']['rows'] == len(refresher.store.vagas_df) and 'prospects' not in stats
@@ -0,0 +1,125 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import ATOL, make_applicant
+from helpers.ann_index import get_ann_index
+from helpers.batch_scorer import build_candidate_features, cached_candidate_features, get_candidate_features
+from helpers.data_loader import load_data, read_applicants, read_prospects, read_vagas
+from helpers.data_refresher import DataRefresher, diff_frames
+from helpers.data_store import frame_version
+from helpers.embedding_store import EmbeddingStore
+
+def _sorted(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    # Row order of a refreshed frame differs from the file (appended keys go last)
+    df = df.astype(str)
+    return df.sort_values([key] + [c for c in df.columns if c != key], kind='stable').reset_index(drop=True)
+
+def _edit_sources() -> list:
+    # Two deletions, two updates and one insertion in the middle of the file
+    applicants = pd.read_csv('applicants.csv', index_col=0)
+    deleted = applicants['codigo_profissional'].iloc[[3, 50]].tolist()
+    applicants = applicants[~applicants['codigo_profissional'].isin(deleted)]
+    applicants.loc[applicants.index[0], 'conhecimentos_tecnicos'] = 'kubernetes, terraform'
+    applicants.loc[applicants.index[1], 'nivel_ingles'] = 'Fluente' if applicants['nivel_ingles'].iloc[1] != 'Fluente' else 'Básico'
+    inserted = pd.DataFrame([make_applicant(np.random.default_rng(1), 99_999)], index=[applicants.index.max() + 1])
+    inserted['local'] = 'Curitiba'
+    middle = len(applicants) // 2
+    pd.concat([applicants.iloc[:middle], inserted, applicants.iloc[middle:]]).to_csv('applicants.csv', encoding='utf-8')
+
+    with open('prospects.json', encoding='utf-8') as file:
+        prospects = json.load(file)
+    prospects['5000']['prospects'].append({'nome': 'Nova Pessoa', 'codigo': '99999'})
+    del prospects['5001']
+    with open('prospects.json', 'w', encoding='utf-8') as file:
+        json.dump(prospects, file, ensure_ascii=False)
+    return deleted
+
+def _assert_features_match(applicants_df: pd.DataFrame) -> None:
+    # Features persisted for another version (or row order) must not be served for these rows
+    features = get_candidate_features(applicants_df)
+    expected = build_candidate_features(applicants_df)
+    assert np.allclose(np.asarray(features.embeddings), expected.embeddings, rtol=0, atol=ATOL)
+    assert (features.skill_matrix.matrix != expected.skill_matrix.matrix).nnz == 0
+    assert len(get_ann_index(features)) == len(applicants_df)
+
+@pytest.mark.parametrize('lean', [False, True])
+def test_refresh_applies_diffs(corpus, lean):
+    refresher = DataRefresher(lean=lean)
+    features = get_candidate_features(refresher.store.applicants_df)
+    ann_index = get_ann_index(features)
+    old_store = refresher.store
+
+    deleted = _edit_sources()
+    stats = refresher.refresh()
+    assert stats['diffs']['applicants'] == {'inserted': 1, 'updated': 2, 'deleted': 2}
+    assert stats['diffs']['prospects'] == {'inserted': 0, 'updated': 1, 'deleted': 1}
+    assert 'vagas' not in stats['changed']
+
+    store = refresher.store
+    assert store is not old_store and store.vagas_df is old_store.vagas_df
+    fresh = {'applicants': (read_applicants('applicants.csv', lean), 'codigo_profissional'),
+             'prospects': (read_prospects('prospects.json'), 'vaga_id'),
+             'vagas': (read_vagas('vagas.json'), 'vaga_id')}
+    for name, (df, key) in fresh.items():
+        refreshed = getattr(store, f'{name}_df')
+        pd.testing.assert_frame_equal(_sorted(refreshed, key), _sorted(df, key))
+        assert diff_frames(refreshed, df, key) == {'inserted': [], 'updated': [], 'deleted': []}
+
+    # Indexes were updated along with the frames
+    assert store.applicant(99_999)['local'] == 'Curitiba'
+    assert all(store.applicant(code) is None for code in deleted)
+    assert store.prospects('5000')['codigo'].iloc[-1] == '99999'
+    assert store.prospects('5001').empty
+    for code in fresh['applicants'][0]['codigo_profissional'].tolist():
+        assert store.applicant(code)['codigo_profissional'] == code
+
+    # Features were carried over, persisted and match a full rebuild
+    refreshed = cached_candidate_features(store.applicants_df)
+    expected = build_candidate_features(store.applicants_df)
+    assert refreshed is not None and refreshed.embedding_version is not None
+    assert refreshed.embedding_version != features.embedding_version
+    assert np.allclose(np.asarray(refreshed.embeddings), expected.embeddings, rtol=0, atol=ATOL)
+    assert (refreshed.skill_matrix.matrix != expected.skill_matrix.matrix).nnz == 0
+    assert np.array_equal(refreshed.english_levels, expected.english_levels)
+
+    # The ANN index was extended, not retrained, and saved for the new version
+    updated_index = get_ann_index(refreshed)
+    assert updated_index.version == refreshed.embedding_version and len(updated_index) == len(refreshed)
+    assert np.array_equal(updated_index.centroids, ann_index.centroids)
+
+    embedding_store = EmbeddingStore()
+    embedding_store.get_embeddings(store.applicants_df['profile_text'].tolist(), store.version)
+    assert embedding_store.version == refreshed.embedding_version
+    assert embedding_store.last_stats['encoded'] == 0
+
+@pytest.mark.parametrize('lean', [False, True])
+def test_fresh_load_after_refresh(corpus, lean):
+    refresher = DataRefresher(lean=lean)
+    get_ann_index(get_candidate_features(refresher.store.applicants_df))
+    _edit_sources()
+    refresher.refresh()
+    store = refresher.store
+
+    # The refreshed frames are in another order than the files, so they never share a version with a parse
+    parsed = load_data(use_cache=False, lean=lean)
+    assert parsed.version != store.version
+    assert parsed.applicants_df['codigo_profissional'].tolist() != store.applicants_df['codigo_profissional'].tolist()
+    _assert_features_match(parsed.applicants_df)
+
+    # A new process starting from the columnar cache gets the refreshed frames with their version
+    cached = load_data(lean=lean)
+    assert cached.version == store.version == frame_version(cached.applicants_df)
+    assert cached.applicants_df['codigo_profissional'].tolist() == store.applicants_df['codigo_profissional'].tolist()
+    _assert_features_match(cached.applicants_df)
+
+def test_initial_snapshot_reads_the_given_paths(corpus, tmp_path):
+    other = tmp_path / 'other'
+    other.mkdir()
+    applicants = pd.read_csv('applicants.csv', index_col=0).head(10)
+    applicants.to_csv(other / 'applicants.csv', encoding='utf-8')
+    paths = {'vagas': 'vagas.json', 'prospects': 'prospects.json', 'applicants': str(other / 'applicants.csv')}
+
+    refresher = DataRefresher(paths=paths, lean=True)
+    assert refresher.store.applicants_df['codigo_profissional'].tolist() == applicants['codigo_profissional'].tolist()
+    assert refresher.refresh() is None
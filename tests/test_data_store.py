@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+from helpers.data_store import DataStore, KeyIndex, lookup_row, lookup_rows, normalize_key
+
+def test_lookups_match_boolean_masks(corpus):
+    vagas_df, prospects_df, applicants_df = corpus
+    store = DataStore(vagas_df, prospects_df, applicants_df)
+    for vaga_id in vagas_df['vaga_id'].tolist() + ['missing']:
+        expected = prospects_df[prospects_df['vaga_id'] == vaga_id]
+        pd.testing.assert_frame_equal(store.prospects(vaga_id), expected)
+        pd.testing.assert_frame_equal(lookup_rows(prospects_df, 'vaga_id', vaga_id), expected)
+
+    for code in applicants_df['codigo_profissional'].tolist()[::11]:
+        expected = applicants_df[applicants_df['codigo_profissional'] == code].iloc[0]
+        pd.testing.assert_series_equal(store.applicant(code), expected)
+        # '123', 123 and 123.0 are the same key
+        pd.testing.assert_series_equal(lookup_row(applicants_df, 'codigo_profissional', str(code)), expected)
+    assert store.applicant(-1) is None
+
+def test_updated_index_matches_a_rebuild():
+    rng = np.random.default_rng(0)
+    keys = pd.Series(rng.choice(['1', '2', 3, 4.0, 'x', None], 60), dtype=object)
+    index = KeyIndex(keys)
+
+    kept = np.sort(rng.choice(len(keys), 40, replace=False))
+    appended = pd.Series(['2', 'new', 4, 'new', '1'], dtype=object)
+    new_keys = pd.concat([keys.iloc[kept], appended], ignore_index=True)
+    updated = index.updated(kept, np.array([normalize_key(key) for key in appended], dtype=object))
+    expected = KeyIndex(new_keys)
+
+    for key in ['1', 2, '3', 4, 'x', '', 'new', 'missing']:
+        assert (key in updated) == (key in expected)
+        assert updated.first(key) == expected.first(key)
+        assert np.array_equal(np.arange(len(new_keys))[updated.rows(key)],
+                              np.arange(len(new_keys))[expected.rows(key)])
+    assert np.array_equal(updated.first_positions(new_keys), expected.first_positions(new_keys))
@@ -0,0 +1,16 @@
+import numpy as np
+from conftest import jobs
+from helpers.batch_scorer import get_candidate_features, score_job
+from helpers.parallel_scorer import ParallelScorer
+
+def test_parallel_scores_match_serial(large_corpus):
+    vagas_df, _, applicants_df = large_corpus
+    features = get_candidate_features(applicants_df)
+    with ParallelScorer(features, workers=2) as scorer:
+        # Several shards, so the shard boundaries are exercised
+        assert len(scorer.shards) == 2
+        for job in jobs(vagas_df):
+            expected = score_job(job, features)
+            result = scorer.score_job(job)
+            for name in expected:
+                assert np.array_equal(result[name], expected[name])
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from conftest import ATOL
+from helpers.batch_scorer import get_candidate_features
+from helpers.projection import ProjectedEmbeddings, get_projected_embeddings
+from helpers.quantization import DEFAULT_RESCORE
+from helpers.similarity_calculator import find_matching_candidates
+
+def test_pca_keeps_the_inner_products_of_its_subspace():
+    rng = np.random.default_rng(0)
+    # Embeddings spanning 16 of 128 dimensions
+    embeddings = (rng.standard_normal((1000, 16)) @ rng.standard_normal((16, 128))).astype(np.float32)
+    vector = rng.standard_normal(128).astype(np.float32)
+    exact = embeddings.astype(np.float64) @ vector
+
+    projected = ProjectedEmbeddings.fit(embeddings, 'pca', 16)
+    assert projected.dim == 16 and projected.matrix.shape == (1000, 16)
+    assert np.allclose(projected.components.T @ projected.components, np.eye(16), atol=1e-5)
+    assert np.allclose(projected.dot(vector), exact, rtol=1e-4, atol=1e-3 * np.abs(exact).max())
+
+    # The dimension is capped at the embedding dimension
+    assert ProjectedEmbeddings.fit(embeddings, 'random', 512).dim == 128
+    with pytest.raises(ValueError):
+        ProjectedEmbeddings.fit(embeddings, 'svd', 16)
+
+def test_random_projection_preserves_inner_products_on_average():
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((2000, 256)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    vector = embeddings[0]
+    projected = ProjectedEmbeddings.fit(embeddings, 'random', 128)
+    errors = projected.dot(vector) - embeddings @ vector
+    # Unbiased, with a spread of about sqrt(2 / dim)
+    assert abs(errors[1:].mean()) < 0.01
+    assert errors[1:].std() < 2 * np.sqrt(2 / 128)
+
+@pytest.mark.parametrize('method, dim, first_pass_overlap', [('pca', 64, 10), ('pca', 16, 8), ('random', 64, 5)])
+def test_rescored_top_k_is_exact(large_corpus, method, dim, first_pass_overlap):
+    vagas_df, _, applicants_df = large_corpus
+    features = get_candidate_features(applicants_df)
+    assert get_projected_embeddings(features, method, dim).dim == dim
+
+    for vaga_id in vagas_df['vaga_id'].tolist():
+        exact = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=10, use_ann=False,
+                                         workers=1, use_cache=False)
+        # The hits rescored at full dimension hold the exact top-k
+        rescored = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=10, use_ann=False,
+                                            workers=1, use_cache=False, projection_dim=dim,
+                                            projection_method=method, rescore=DEFAULT_RESCORE)
+        assert rescored['codigo'].tolist() == exact['codigo'].tolist()
+        assert np.allclose(rescored['overall_score'], exact['overall_score'], rtol=0, atol=ATOL)
+
+        # Projected scores alone: the top 10 shares at least first_pass_overlap candidates
+        first_pass = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=10, use_ann=False,
+                                              workers=1, use_cache=False, projection_dim=dim,
+                                              projection_method=method, rescore=0)
+        assert len(set(first_pass['codigo']) & set(exact['codigo'])) >= first_pass_overlap
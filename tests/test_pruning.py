@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from conftest import jobs
+from helpers.batch_scorer import get_candidate_features, score_job, top_k_indices
+from helpers.pruning import aligned_text_similarity, score_job_top_k
+from helpers.similarity_calculator import find_matching_candidates
+
+def test_aligned_text_similarity_matches_full_matvec():
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((5000, 384)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    vector = rng.standard_normal(384)
+    full = embeddings @ vector
+    samples = [np.sort(rng.choice(len(embeddings), size, replace=False)) for size in [1, 7, 300, 4999]]
+    # Rows sharing their offset within the blocks, and rows of the last partial block only
+    samples += [np.arange(3, 4800, 256), np.arange(4900, 5000, 3)]
+    for positions in samples:
+        assert np.array_equal(aligned_text_similarity(embeddings, vector, positions), full[positions])
+    assert len(aligned_text_similarity(embeddings, vector, np.zeros(0, dtype=np.int64))) == 0
+
+@pytest.mark.parametrize('weights', [None, {'skill_match': 1.0}, {'text_similarity': 0.2, 'education_match': 0.8}])
+def test_pruned_top_k_matches_full(large_corpus, weights):
+    vagas_df, _, applicants_df = large_corpus
+    features = get_candidate_features(applicants_df)
+    for job in jobs(vagas_df):
+        full = score_job(job, features, weights=weights)
+        for k in [1, 10, 50]:
+            positions, scores, stats = score_job_top_k(job, features, k, weights, seed_rows=16)
+            assert stats['scored'] + stats['pruned'] == len(features)
+            # Survivors score exactly as in the full pass, so ties break the same way too
+            for name, values in scores.items():
+                assert np.array_equal(values, full[name][positions])
+            best = top_k_indices(scores['overall_score'], k)
+            assert np.array_equal(positions[best], top_k_indices(full['overall_score'], k))
+
+    for vaga_id in vagas_df['vaga_id'].tolist():
+        expected = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=10, use_ann=False,
+                                            workers=1, use_cache=False, weights=weights)
+        pruned = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=10, use_ann=False,
+                                          workers=1, use_cache=False, weights=weights, prune=True)
+        assert pruned['codigo'].tolist() == expected['codigo'].tolist()
+        assert np.array_equal(pruned['overall_score'], expected['overall_score'])
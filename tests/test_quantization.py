@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from conftest import ATOL
+from helpers.batch_scorer import get_candidate_features
+from helpers.quantization import DEFAULT_RESCORE, QuantizedEmbeddings, get_quantized_embeddings
+from helpers.similarity_calculator import find_matching_candidates
+
+def test_dot_error_bounds():
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((2000, 384)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    vector = rng.standard_normal(384).astype(np.float32)
+    exact = embeddings.astype(np.float64) @ vector
+
+    float16 = QuantizedEmbeddings.from_matrix(embeddings, 'float16')
+    assert float16.nbytes == embeddings.nbytes // 2
+    # Rounding to float16 changes each value by at most 2^-11 of itself (unit rows)
+    assert np.all(np.abs(float16.dot(vector) - exact) <= 2 ** -11 * np.linalg.norm(vector) + 1e-5)
+
+    int8 = QuantizedEmbeddings.from_matrix(embeddings, 'int8')
+    assert int8.nbytes == embeddings.size + 4 * len(embeddings)
+    # Rounding to the int8 grid changes each value by at most half a step
+    bound = int8.scales / 2 * np.abs(vector).sum()
+    assert np.all(np.abs(int8.dot(vector) - exact) <= bound + 1e-5)
+
+    positions = np.array([0, 7, 1999])
+    for quantized in [float16, int8]:
+        assert np.allclose(quantized.dot(vector, positions), quantized.dot(vector)[positions], rtol=0, atol=1e-5)
+
+def test_zero_vectors_quantize_to_zero():
+    int8 = QuantizedEmbeddings.from_matrix(np.zeros((3, 8), dtype=np.float32), 'int8')
+    assert np.array_equal(int8.dot(np.ones(8)), np.zeros(3))
+
+@pytest.mark.parametrize('mode', ['float16', 'int8'])
+def test_rescored_top_k_is_exact(large_corpus, mode):
+    vagas_df, _, applicants_df = large_corpus
+    features = get_candidate_features(applicants_df)
+    assert get_quantized_embeddings(features, mode) is get_quantized_embeddings(features, mode)
+
+    for vaga_id in vagas_df['vaga_id'].tolist():
+        exact = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=10, use_ann=False,
+                                         workers=1, use_cache=False)
+        # The hits rescored with the full embeddings hold the exact top-k
+        rescored = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=10, use_ann=False, workers=1,
+                                            use_cache=False, quantization=mode, rescore=DEFAULT_RESCORE)
+        assert rescored['codigo'].tolist() == exact['codigo'].tolist()
+        assert np.allclose(rescored['overall_score'], exact['overall_score'], rtol=0, atol=ATOL)
+
+        # Quantized scores alone: at most one of the top 10 swapped, scores within 1e-3
+        approximate = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=10, use_ann=False,
+                                               workers=1, use_cache=False, quantization=mode, rescore=0)
+        assert len(set(approximate['codigo']) & set(exact['codigo'])) >= 9
+        assert np.allclose(approximate['overall_score'], exact['overall_score'], rtol=0, atol=1e-3)
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+import helpers.ranking_cache as ranking_cache
+from helpers.data_loader import load_data
+from helpers.ranking_cache import RankingCache, ranking_data_version
+from helpers.similarity_calculator import find_matching_candidates
+from helpers.skill_extractor import SkillExtractor, load_skill_taxonomy
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = RankingCache(directory=str(tmp_path / 'rankings'))
+    monkeypatch.setattr(ranking_cache, '_default_cache', cache)
+    return cache
+
+def _match(vagas_df, applicants_df, weights=None):
+    vaga_id = vagas_df['vaga_id'].iloc[0]
+    return find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=5, use_ann=False, workers=1,
+                                    weights=weights)
+
+def _new_hits(cache, before):
+    stats = cache.stats()
+    return {name: stats[name] - before[name] for name in ('memory_hits', 'disk_hits', 'misses')}
+
+def test_hits_survive_a_restart(corpus, cache, monkeypatch):
+    vagas_df, _, applicants_df = corpus
+    expected = _match(vagas_df, applicants_df)
+    before = cache.stats()
+    pd.testing.assert_frame_equal(_match(vagas_df, applicants_df), expected)
+    assert _new_hits(cache, before) == {'memory_hits': 1, 'disk_hits': 0, 'misses': 0}
+
+    # A new process only has the disk tier
+    restarted = RankingCache(directory=cache.directory)
+    monkeypatch.setattr(ranking_cache, '_default_cache', restarted)
+    before = restarted.stats()
+    pd.testing.assert_frame_equal(_match(vagas_df, applicants_df), expected)
+    assert _new_hits(restarted, before) == {'memory_hits': 0, 'disk_hits': 1, 'misses': 0}
+
+def test_weights_change_misses(corpus, cache):
+    vagas_df, _, applicants_df = corpus
+    _match(vagas_df, applicants_df)
+    before = cache.stats()
+    _match(vagas_df, applicants_df, weights={'skill_match': 1.0})
+    assert _new_hits(cache, before) == {'memory_hits': 0, 'disk_hits': 0, 'misses': 1}
+
+def test_data_change_misses(corpus, cache):
+    vagas_df, _, applicants_df = corpus
+    _match(vagas_df, applicants_df)
+
+    applicants = pd.read_csv('applicants.csv', index_col=0)
+    applicants.loc[applicants.index[0], 'conhecimentos_tecnicos'] = 'kubernetes'
+    applicants.to_csv('applicants.csv', encoding='utf-8')
+    vagas_df, _, new_applicants_df = load_data()
+    assert ranking_data_version(vagas_df, new_applicants_df) != ranking_data_version(vagas_df, applicants_df)
+
+    before = cache.stats()
+    _match(vagas_df, new_applicants_df)
+    assert _new_hits(cache, before) == {'memory_hits': 0, 'disk_hits': 0, 'misses': 1}
+
+def test_taxonomy_change_misses(corpus, cache, monkeypatch):
+    vagas_df, _, applicants_df = corpus
+    _match(vagas_df, applicants_df)
+    version = ranking_data_version(vagas_df, applicants_df)
+
+    # Another process whose taxonomy has one more form of a skill
+    taxonomy = load_skill_taxonomy()
+    taxonomy['python'] = taxonomy['python'] + ['pitão']
+    extractor = SkillExtractor(taxonomy)
+    monkeypatch.setattr(ranking_cache, 'get_skill_extractor', lambda: extractor)
+    assert ranking_data_version(vagas_df, applicants_df) != version
+
+    restarted = RankingCache(directory=cache.directory)
+    monkeypatch.setattr(ranking_cache, '_default_cache', restarted)
+    before = restarted.stats()
+    _match(vagas_df, applicants_df)
+    assert _new_hits(restarted, before) == {'memory_hits': 0, 'disk_hits': 0, 'misses': 1}
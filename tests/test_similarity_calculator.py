@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import ATOL
+from helpers.similarity_calculator import calculate_similarity, get_candidates_by_vaga
+
+SCORE_COLUMNS = ['overall_score', 'text_similarity', 'skill_match', 'education_match', 'english_match', 'spanish_match']
+
+def _row_by_row(vagas_df, prospects_df, applicants_df, vaga_id, include_scores=True):
+    # The implementation get_candidates_by_vaga replaced: one boolean mask and
+    # one calculate_similarity call per prospect code
+    job_data = vagas_df[vagas_df['vaga_id'] == vaga_id]
+    if job_data.empty:
+        return pd.DataFrame()
+    job_series = job_data.iloc[0]
+    job_prospects = prospects_df[prospects_df['vaga_id'] == vaga_id]
+    if job_prospects.empty:
+        return pd.DataFrame()
+
+    results = []
+    for code in list(set(job_prospects['codigo'].tolist())):
+        candidate_data = applicants_df[applicants_df['codigo_profissional'] == code]
+        prospect_dict = job_prospects[job_prospects['codigo'] == code].iloc[0].to_dict()
+        if candidate_data.empty:
+            candidate = {'codigo': code, 'nome': prospect_dict.get('nome', ''), 'area_atuacao': '',
+                         'situacao': prospect_dict.get('situacao_candidado', ''),
+                         'data_candidatura': prospect_dict.get('data_candidatura', ''),
+                         'recrutador': prospect_dict.get('recrutador', '')}
+            if include_scores:
+                candidate.update({name: 0 for name in SCORE_COLUMNS})
+        else:
+            candidate_dict = candidate_data.iloc[0].to_dict()
+            candidate = {'codigo': code, 'nome': candidate_dict.get('nome', ''),
+                         'area_atuacao': candidate_dict.get('area_atuacao', ''),
+                         'nivel_academico': candidate_dict.get('nivel_academic', ''),
+                         'nivel_ingles': candidate_dict.get('nivel_ingles', ''),
+                         'nivel_espanhol': candidate_dict.get('nivel_espanhol', ''),
+                         'situacao': prospect_dict.get('situacao_candidado', ''),
+                         'data_candidatura': prospect_dict.get('data_candidatura', ''),
+                         'recrutador': prospect_dict.get('recrutador', '')}
+            if include_scores:
+                scores = calculate_similarity(job_series, candidate_data.iloc[0])
+                candidate.update({name: scores[name] for name in SCORE_COLUMNS})
+        results.append(candidate)
+    return pd.DataFrame(results)
+
+def _by_code(df: pd.DataFrame) -> pd.DataFrame:
+    # The old column and row order depended on set iteration order
+    return df[sorted(df.columns)].sort_values('codigo').reset_index(drop=True)
+
+@pytest.mark.parametrize('include_scores', [True, False])
+def test_get_candidates_by_vaga_matches_row_by_row(corpus, include_scores):
+    vagas_df, prospects_df, applicants_df = corpus
+    # Codes of the same type as the applicants (the old masks compared them raw),
+    # plus a repeated code and prospects that are not applicants
+    prospects_df = prospects_df.assign(codigo=prospects_df['codigo'].astype(int))
+    busiest = prospects_df['vaga_id'].value_counts().index[0]
+    extra = prospects_df[prospects_df['vaga_id'] == busiest].head(2).assign(situacao_candidado='Contratado')
+    unknown = extra.assign(codigo=[1, 2], nome=['Sem Cadastro', 'Outro'])
+    prospects_df = pd.concat([prospects_df, extra, unknown], ignore_index=True)
+
+    for vaga_id in vagas_df['vaga_id'].tolist() + ['missing']:
+        result = get_candidates_by_vaga(vagas_df, prospects_df, applicants_df, vaga_id, include_scores)
+        expected = _row_by_row(vagas_df, prospects_df, applicants_df, vaga_id, include_scores)
+        if expected.empty:
+            assert result.empty
+            continue
+
+        if include_scores:
+            # Sorted by status, then by descending score
+            assert result['situacao'].is_monotonic_increasing
+            for _, group in result.groupby('situacao'):
+                assert group['overall_score'].is_monotonic_decreasing
+
+        result, expected = _by_code(result), _by_code(expected)
+        assert list(result.columns) == list(expected.columns)
+        for column in result.columns:
+            if column in SCORE_COLUMNS:
+                assert np.allclose(result[column].astype(float), expected[column].astype(float), rtol=0, atol=ATOL)
+            else:
+                pd.testing.assert_series_equal(result[column], expected[column], check_dtype=False)
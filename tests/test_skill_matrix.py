@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from conftest import SKILLS, jobs
+from helpers.batch_scorer import get_candidate_features
+from helpers.skill_extractor import SkillExtractor, load_skill_taxonomy
+from helpers.skill_matrix import load_or_build_skill_matrix
+from helpers.text_processor import extract_skills
+from helpers.similarity_calculator import calculate_skill_overlap
+
+def test_overlap_matches_calculate_skill_overlap(corpus):
+    vagas_df, _, applicants_df = corpus
+    skill_matrix = get_candidate_features(applicants_df).skill_matrix
+    texts = applicants_df['profile_text'].tolist()
+    for job in jobs(vagas_df):
+        job_text = job['descricao_completa']
+        overlap = skill_matrix.overlap(extract_skills(job_text))
+        expected = [calculate_skill_overlap(job_text, text) for text in texts]
+        assert np.allclose(overlap, expected, rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize('skills', [['python'], ['python', 'sql'], ['aws', 'docker', 'scrum'], [], ['cobol']])
+def test_candidates_with_all_matches_brute_force(corpus, skills):
+    _, _, applicants_df = corpus
+    skill_matrix = get_candidate_features(applicants_df).skill_matrix
+    candidate_skills = [set(extract_skills(text)) for text in applicants_df['profile_text'].tolist()]
+    expected = [row for row, found in enumerate(candidate_skills) if set(skills) <= found]
+    if any(skill not in skill_matrix.skill_index for skill in skills):
+        expected = []
+    assert skill_matrix.candidates_with_all(skills).tolist() == expected
+
+def test_saved_matrix_is_invalidated_by_a_new_alias(tmp_path):
+    path = str(tmp_path / 'skills.npz')
+    texts = [f'experiência com {skill} e pitão' for skill in SKILLS]
+    taxonomy = load_skill_taxonomy()
+    before = load_or_build_skill_matrix(texts, path, SkillExtractor(taxonomy), source='v1')
+
+    # Same skill list, one more form: the saved rows must not be reused, even for the same data version
+    taxonomy['python'] = taxonomy['python'] + ['pitão']
+    after = load_or_build_skill_matrix(texts, path, SkillExtractor(taxonomy), source='v1')
+    python = after.skill_index['python']
+    assert before.skills == after.skills
+    assert before.matrix[:, python].sum() == 1
+    assert after.matrix[:, python].sum() == len(texts)
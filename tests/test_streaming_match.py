@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+from conftest import ATOL
+from helpers.similarity_calculator import find_matching_candidates
+from helpers.streaming_match import cached_applicants_path, stream_top_candidates
+
+@pytest.mark.parametrize('source', ['csv', 'cache'])
+@pytest.mark.parametrize('chunk_rows', [1, 37, 1000])
+def test_streaming_matches_in_memory(corpus, chunk_rows, source):
+    vagas_df, _, applicants_df = corpus
+    assert cached_applicants_path() is not None
+    vaga_ids = vagas_df['vaga_id'].tolist()
+    results, stats = stream_top_candidates(vagas_df, vaga_ids, top_n=15, chunk_rows=chunk_rows, source=source)
+    assert stats['rows'] == len(applicants_df)
+    for vaga_id in vaga_ids:
+        expected = find_matching_candidates(vagas_df, applicants_df, vaga_id, top_n=15, use_ann=False,
+                                            workers=1, use_cache=False)
+        result = results[vaga_id]
+        assert [str(code) for code in result['codigo']] == [str(code) for code in expected['codigo']]
+        assert np.allclose(result['overall_score'], expected['overall_score'], rtol=0, atol=ATOL)
+        assert np.array_equal(result['skill_match'], expected['skill_match'])
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from collections import Counter
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from conftest import jobs
+from helpers.batch_scorer import combine_scores, get_candidate_features, score_job, top_k_indices
+from helpers.similarity_calculator import find_matching_candidates
+from helpers.text_index import BM25_B, BM25_K1, SparseTextIndex, get_text_index, load_or_build_text_index
+from helpers.text_processor import preprocess_text
+
+# The index stores float32 weights
+TOLERANCE = 1e-5
+
+def _tfidf_scores(index: SparseTextIndex, texts: list, query: str) -> np.ndarray:
+    # Cosine of TfidfVectorizer vectors over the same vocabulary
+    vectorizer = TfidfVectorizer(lowercase=False, vocabulary=index.terms)
+    documents = vectorizer.fit_transform([preprocess_text(text) for text in texts])
+    return (documents @ vectorizer.transform([preprocess_text(query)]).T).toarray().ravel()
+
+def _bm25_scores(index: SparseTextIndex, texts: list, query: str) -> np.ndarray:
+    # Okapi BM25, one document at a time, divided by the best score
+    analyzer = CountVectorizer(lowercase=False).build_analyzer()
+    vocabulary = set(index.terms)
+    documents = [Counter(term for term in analyzer(preprocess_text(text)) if term in vocabulary) for text in texts]
+    lengths = np.array([sum(document.values()) for document in documents])
+    average_length = lengths.mean()
+    frequency = Counter(term for document in documents for term in document)
+    query_terms = {term for term in analyzer(preprocess_text(query)) if term in vocabulary}
+
+    scores = np.zeros(len(documents))
+    for i, document in enumerate(documents):
+        for term in query_terms & document.keys():
+            idf = np.log(1 + (len(documents) - frequency[term] + 0.5) / (frequency[term] + 0.5))
+            tf = document[term]
+            scores[i] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths[i] / average_length))
+    return scores / scores.max() if scores.max() > 0 else scores
+
+REFERENCE = {'tfidf': _tfidf_scores, 'bm25': _bm25_scores}
+
+def _assert_same_top_k(scores: np.ndarray, expected: np.ndarray, k: int = 10) -> None:
+    # Same best scores; candidates tied within the tolerance may swap places
+    assert np.allclose(np.sort(scores[top_k_indices(scores, k)]), np.sort(expected)[-k:], rtol=0, atol=TOLERANCE)
+    assert np.allclose(expected[top_k_indices(scores, k)], scores[top_k_indices(scores, k)], rtol=0, atol=TOLERANCE)
+
+@pytest.mark.parametrize('kind', ['tfidf', 'bm25'])
+def test_scores_match_reference_implementation(corpus, kind):
+    vagas_df, _, applicants_df = corpus
+    texts = applicants_df['profile_text'].tolist()
+    index = SparseTextIndex.fit(texts, kind)
+    assert len(index) == len(texts) and index.terms
+    # Stopwords are left out of the vocabulary
+    assert 'de' not in index.terms and 'com' not in index.terms
+
+    for job in jobs(vagas_df):
+        scores = index.score(job['descricao_completa'])
+        expected = REFERENCE[kind](index, texts, job['descricao_completa'])
+        assert np.allclose(scores, expected, rtol=0, atol=TOLERANCE)
+        assert np.count_nonzero(expected) > 10 and scores.max() <= 1 + TOLERANCE and scores.min() >= 0
+        _assert_same_top_k(scores, expected)
+
+    assert np.array_equal(index.score('termo desconhecido'), np.zeros(len(texts)))
+    assert np.array_equal(SparseTextIndex.fit(['', 'de com'], kind).score('python'), np.zeros(2))
+
+@pytest.mark.parametrize('kind', ['tfidf', 'bm25'])
+def test_saved_index_is_reused_until_texts_change(corpus, tmp_path, kind):
+    texts = corpus.applicants_df['profile_text'].tolist()
+    path = str(tmp_path / 'index.npz')
+    built = load_or_build_text_index(texts, kind, path)
+    loaded = load_or_build_text_index(texts, kind, path)
+    assert loaded is not built and loaded.terms == built.terms
+    assert (loaded.matrix != built.matrix).nnz == 0
+
+    changed = load_or_build_text_index(texts[:-1] + ['python kubernetes'], kind, path)
+    assert len(changed) == len(texts) and 'kubernetes' in changed.terms
+    assert load_or_build_text_index(texts, 'bm25' if kind == 'tfidf' else 'tfidf', path).kind != kind
+
+@pytest.mark.parametrize('kind', ['tfidf', 'bm25'])
+def test_ranking_with_sparse_backend_matches_reference(corpus, kind):
+    vagas_df, _, applicants_df = corpus
+    texts = applicants_df['profile_text'].tolist()
+    features = get_candidate_features(applicants_df)
+    index = get_text_index(applicants_df, kind)
+    assert get_text_index(applicants_df, kind) is index
+
+    position_of = {code: i for i, code in enumerate(applicants_df['codigo_profissional'])}
+    for job in jobs(vagas_df):
+        # The other components do not depend on the text backend
+        scores = score_job(job, features)
+        scores['text_similarity'] = REFERENCE[kind](index, texts, job['descricao_completa'])
+        expected = combine_scores(scores)
+
+        ranking = find_matching_candidates(vagas_df, applicants_df, job['vaga_id'], top_n=10, use_ann=False,
+                                           workers=1, use_cache=False, text_backend=kind)
+        positions = [position_of[code] for code in ranking['codigo']]
+        assert np.allclose(ranking['overall_score'], np.sort(expected)[::-1][:10], rtol=0, atol=TOLERANCE)
+        assert np.allclose(ranking['overall_score'], expected[positions], rtol=0, atol=TOLERANCE)
+        assert np.allclose(ranking['text_similarity'], scores['text_similarity'][positions], rtol=0, atol=TOLERANCE)